@@ -3,6 +3,10 @@ import streamlit as st
 from streamlit.logger import get_logger
 from analytics.query import *
 from visuals.graphs import *
+from analytics.warmup import start_cache_warmer
+from analytics.pipeline import prepare_overview_frames
+from analytics.kpi import display_kpis
+from utils.data_grid import display_data_grid
 
 LOGGER = get_logger(__name__)
 
@@ -81,51 +85,53 @@ def get_sidebar_inputs():
 
     return timeframe, start_str, end_str, report_type, custom_adjustment, split_office_cost, search_btn
 
-def display_performance_overview(df, department_name):
+def display_performance_overview(frames, department_name):
     st.subheader(f'Performance Analysis{" - " + department_name if department_name else ""}')
     po_fig_tab, po_data_tab = st.tabs(["Figure", "Data"])
-    po_df = prepare_performance_overview_data(df, denominator="sales")
+    po_df = frames['po_df']
     with po_fig_tab:
-        st.plotly_chart(make_performance_overview_graph(po_df), use_container_width=True)
+        st.plotly_chart(make_performance_overview_graph(po_df, forecast_df=frames['forecast_df']), use_container_width=True)
     with po_data_tab:
         st.dataframe(po_df, use_container_width=True, hide_index=True)
 
-def display_turnover_breakdown(df, department_name):
+def display_turnover_breakdown(frames, department_name):
     st.subheader(f'Turnover Breakdown{" - " + department_name if department_name else ""}')
     ts_fig_tab, ts_data_tab = st.tabs(["Figure", "Data"])
-    ts_df = prepare_turnover_structure_data(df, department_name=department_name)
+    ts_df = frames['ts_df']
     with ts_fig_tab:
         st.plotly_chart(make_turnover_structure_graph(ts_df, department_name=department_name), use_container_width=True)
     with ts_data_tab:
         st.dataframe(ts_df, use_container_width=True, hide_index=True)
 
-def display_cost_structure(df, department_name):
+def display_cost_structure(frames, department_name):
     st.subheader(f'Cost Structure{" - " + department_name if department_name else ""}')
     cs_fig1_tab, cs_fig2_tab, cs_data_tab = st.tabs(["Cost to Sales Ratio", "Cost to Total Cost Ratio", "Data"])
     with cs_fig1_tab:
-        cs_df = prepare_performance_overview_data(df, denominator="sales")
+        cs_df = frames['po_df']
         st.plotly_chart(make_cost_structure_graph(cs_df, denominator="sales"), use_container_width=True)
     with cs_fig2_tab:
-        cs_df = prepare_performance_overview_data(df, denominator="costs")
+        cs_df = frames['cs_costs_df']
         st.plotly_chart(make_cost_structure_graph(cs_df, denominator="costs"), use_container_width=True)
     with cs_data_tab:
         st.dataframe(cs_df, use_container_width=True, hide_index=True)
 
-def display_cost_details(df, department_name):
+def display_cost_details(frames, department_name):
     st.subheader(f'Cost Details{" - " + department_name if department_name else ""}')
     cdd_fig1_tab, cdd_fig2_tab, cdd_fig3_tab, cdd_data_tab = st.tabs(["Cost Breakdown by Department", "Cumulative Cost Percentage", "Cumulative Cost Details Breakdown", "Data"])
     with cdd_fig1_tab:
-        st.plotly_chart(make_cost_structure_breakdown_by_department_graph(df), use_container_width=True)
+        bd_df = frames['bd_df']
+        st.plotly_chart(make_cost_structure_breakdown_by_department_graph(bd_df), use_container_width=True)
     with cdd_fig2_tab:
-        results = prepare_cost_structure_cumulative(df)
+        results = frames['cumulative']
         st.plotly_chart(make_cost_structure_cumulative_by_department_graph(results), use_container_width=True)
     with cdd_fig3_tab:
-        processed_df = prepare_cost_structure_cumulative_icicle(df)
+        processed_df = frames['icicle_df']
         st.plotly_chart(make_cost_structure_cumulative_icicle_graph(processed_df), use_container_width=True)
     with cdd_data_tab:
-        st.dataframe(df, use_container_width=True, hide_index=True)
+        display_data_grid(frames['df'], "cost_details", key="cdd_data")
 
 def main():
+    start_cache_warmer()
     DEPARTMENT_NAME = None
     timeframe, start_str, end_str, report_type, custom_adjustment, split_office_cost, search_btn = get_sidebar_inputs()
 
@@ -139,11 +145,20 @@ def main():
             custom_adjustment=custom_adjustment,
             split_office_cost=split_office_cost,
         )
-        
-        display_performance_overview(df, DEPARTMENT_NAME)
-        display_turnover_breakdown(df, DEPARTMENT_NAME)
-        display_cost_structure(df, DEPARTMENT_NAME)
-        display_cost_details(df, DEPARTMENT_NAME)
+        # Every frame is prepared concurrently before the first section renders
+        frames = prepare_overview_frames(
+            df,
+            DEPARTMENT_NAME,
+            report_type=report_type,
+            custom_adjustment=custom_adjustment,
+            split_office_cost=split_office_cost,
+        )
+
+        display_performance_overview(frames, DEPARTMENT_NAME)
+        display_kpis(DEPARTMENT_NAME, report_type, start_str, end_str, timeframe, custom_adjustment, split_office_cost, by_department=True)
+        display_turnover_breakdown(frames, DEPARTMENT_NAME)
+        display_cost_structure(frames, DEPARTMENT_NAME)
+        display_cost_details(frames, DEPARTMENT_NAME)
 
 if __name__ == "__main__":
     st.set_page_config(
@@ -0,0 +1,6 @@
+import pandas as pd
+
+# Analytics and visuals treat input frames as read-only and derive new columns
+# with `assign` instead of mutating them, so with copy-on-write the derived
+# frames share memory with the query result until something is written.
+pd.set_option("mode.copy_on_write", True)
@@ -0,0 +1,79 @@
+"""Outlier scan of monthly account amounts.
+
+Every (location, account) monthly series of `financial_data` is scored with a
+robust z-score, 0.6745 * (amount - median) / MAD, computed for all series at
+once with grouped transforms. Only closed months (before the current one) are
+scanned; the result is cached per last closed month and data version.
+"""
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from analytics.data_version import data_version
+from analytics.dimensions import attach_location_attributes
+from analytics.query import CACHE_MAX_ENTRIES, query_unique_timeframes
+from analytics.slices import financial_month_rows
+from utils.cache import cache_data
+
+# Iglewicz and Hoaglin's cut-off for modified z-scores
+ANOMALY_Z_THRESHOLD = 3.5
+# Series with fewer months are not scored
+ANOMALY_MIN_MONTHS = 6
+SERIES_KEYS = ['location_id', 'account_id']
+# MAD is scaled by 0.6745; mean absolute deviation by 0.7979 when MAD is zero
+MAD_SCALE = 0.6745
+MEAN_AD_SCALE = 0.7979
+
+
+def last_closed_month(today=None):
+    today = today or date.today()
+    index = today.year * 12 + today.month - 2
+    return f"{index // 12}-M{index % 12 + 1:02d}"
+
+
+def robust_z_scores(df, keys=SERIES_KEYS, value='amount'):
+    """Modified z-score of `value` within each group of `keys`; NaN for short or constant series."""
+    grouped = df.groupby(keys, sort=False)[value]
+    median = grouped.transform('median')
+    deviation = (df[value] - median).abs()
+    by_deviation = deviation.groupby([df[key] for key in keys], sort=False)
+    mad = by_deviation.transform('median')
+    mean_ad = by_deviation.transform('mean')
+    z = MAD_SCALE * (df[value] - median) / mad.where(mad != 0)
+    z = z.fillna(MEAN_AD_SCALE * (df[value] - median) / mean_ad.where(mean_ad != 0))
+    months = grouped.transform('size')
+    return median, z.where(months >= ANOMALY_MIN_MONTHS)
+
+
+@cache_data(max_entries=CACHE_MAX_ENTRIES)
+def fetch_anomaly_scores(start_month, end_month, version=None):
+    rows = financial_month_rows(start_month, end_month)
+    monthly = rows.groupby(['year', 'month'] + SERIES_KEYS, as_index=False, sort=False).agg(
+        amount=('amount', 'sum'),
+        account_name=('account_name', 'first'),
+        account_type=('account_type', 'first'),
+    )
+    monthly = monthly.assign(amount=monthly['amount'].astype(float))
+    median, z = robust_z_scores(monthly)
+    scored = monthly.assign(
+        year_month=monthly['year'].astype(str) + '-M' + monthly['month'].astype(str).str.zfill(2),
+        median=median,
+        z_score=z,
+    )
+    scored = attach_location_attributes(scored, ['location_name', 'department_name'])
+    return scored[['year_month', 'location_id', 'location_name', 'department_name', 'account_id', 'account_name', 'account_type', 'amount', 'median', 'z_score']]
+
+
+def query_anomalies(threshold=ANOMALY_Z_THRESHOLD, department_name=None):
+    """Monthly (location, account) amounts whose robust z-score exceeds `threshold`, largest first."""
+    months = query_unique_timeframes('month')
+    end_month = min(months[-1], last_closed_month()) if months else None
+    if end_month is None or end_month < months[0]:
+        return pd.DataFrame()
+    scores = fetch_anomaly_scores(months[0], end_month, version=data_version('financial_data', months[0], end_month))
+    anomalies = scores.loc[scores['z_score'].abs() > threshold]
+    if department_name is not None:
+        anomalies = anomalies.loc[anomalies['department_name'] == department_name]
+    order = np.argsort(-anomalies['z_score'].abs().to_numpy(), kind='stable')
+    return anomalies.iloc[order].reset_index(drop=True)
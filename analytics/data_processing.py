@@ -1,54 +1,87 @@
+import logging
+import threading
+from concurrent.futures import as_completed
 import streamlit as st
 import pandas as pd
 from utils.netsuite_api import run_suiteql
+from utils.suiteql import (
+    BALANCE_SHEET_ACCOUNT_TYPES,
+    INCOME_STATEMENT_ACCOUNT_TYPES,
+    OPEN_PERIODS,
+    normalize_periods,
+    run_statement_query,
+)
+from utils.netsuite_sync import aggregate_statement, mirror_is_stale, mirror_version, sync_mirror
+from utils.concurrency import script_run_executor
+from utils.export import display_export_controls
 
 @st.cache_data
+def get_mirrored_statement_data(account_types, periods, by_period, version):
+    # `version` only keys the cache, so a new sync invalidates it
+    return aggregate_statement(account_types, periods, by_period=by_period)
+
+
+@st.cache_resource
+def mirror_sync_lock():
+    return threading.Lock()
+
+
+def refresh_stale_mirror():
+    """Sync the mirror again if it is older than MIRROR_MAX_AGE_SECONDS; one session syncs at a time."""
+    lock = mirror_sync_lock()
+    if not mirror_is_stale() or not lock.acquire(blocking=False):
+        return
+    try:
+        sync_mirror()
+    except Exception as e:
+        logging.warning(f"NetSuite mirror sync failed, reading the previous sync: {e}")
+    finally:
+        lock.release()
+
+
+def get_statement_data(account_types, periods, by_period=False):
+    """Aggregate from the local mirror when it has been synced, otherwise through
+    SuiteQL with a disk cache whose TTL depends on whether the periods are closed.
+    Open periods (CURRENT_ACCOUNTING_PERIOD) are always queried through SuiteQL."""
+    periods = normalize_periods(periods)
+    if any(period in OPEN_PERIODS for period in periods):
+        return run_statement_query(account_types, periods, by_period=by_period)
+    refresh_stale_mirror()
+    version = mirror_version()
+    if version is not None:
+        return get_mirrored_statement_data(tuple(sorted(set(account_types))), periods, by_period, version)
+    return run_statement_query(account_types, periods, by_period=by_period)
+
 def get_balance_sheet_data(period):
-    query = f"""
-    SELECT
-        acct.name AS account_name,
-        acct.number AS account_number,
-        SUM(trx.amount) AS amount
-    FROM
-        transaction trx
-    JOIN
-        account acct ON (trx.account = acct.id)
-    WHERE
-        acct.type IN (
-            'Bank', 'AccountsReceivable', 'OtherCurrentAsset', 'FixedAsset',
-            'OtherAsset', 'AccountsPayable', 'CreditCard', 'OtherCurrentLiability',
-            'LongTermLiability', 'Equity'
-        )
-        AND trx.postingperiod = '{period}'
-    GROUP BY
-        acct.name, acct.number
-    ORDER BY
-        acct.number
-    """
-    return run_suiteql(query)
+    return get_statement_data(BALANCE_SHEET_ACCOUNT_TYPES, period)
 
-@st.cache_data
 def get_income_statement_data(period):
-    query = f"""
-    SELECT
-        acct.name AS account_name,
-        acct.number AS account_number,
-        SUM(trx.amount) AS amount
-    FROM
-        transaction trx
-    JOIN
-        account acct ON (trx.account = acct.id)
-    WHERE
-        acct.type IN (
-            'Income', 'Expense', 'OtherIncome', 'OtherExpense'
-        )
-        AND trx.postingperiod = '{period}'
-    GROUP BY
-        acct.name, acct.number
-    ORDER BY
-        acct.number
-    """
-    return run_suiteql(query)
+    return get_statement_data(INCOME_STATEMENT_ACCOUNT_TYPES, period)
+
+# Statements shown on the Netsuite page, in display order.
+STATEMENT_LOADERS = {
+    "Balance Sheet": get_balance_sheet_data,
+    "Income Statement": get_income_statement_data,
+}
+
+def get_comparative_balance_sheet_data(periods):
+    return get_statement_data(BALANCE_SHEET_ACCOUNT_TYPES, periods, by_period=True)
+
+def get_comparative_income_statement_data(periods):
+    return get_statement_data(INCOME_STATEMENT_ACCOUNT_TYPES, periods, by_period=True)
+
+COMPARATIVE_STATEMENT_LOADERS = {
+    "Balance Sheet": get_comparative_balance_sheet_data,
+    "Income Statement": get_comparative_income_statement_data,
+}
+
+def load_statements_concurrently(period, loaders=STATEMENT_LOADERS):
+    """Fetch all statements at once and yield (title, data) as each one arrives.
+    `period` is passed through to the loaders, so comparative loaders take a tuple of periods."""
+    with script_run_executor(max_workers=len(loaders)) as executor:
+        futures = {executor.submit(loader, period): title for title, loader in loaders.items()}
+        for future in as_completed(futures):
+            yield futures[future], future.result()
 
 def data_to_dataframe(data):
     if data and "items" in data:
@@ -64,13 +97,36 @@ def display_financial_statement(df, title):
         st.subheader(f"{title} (Total: ${total:,.2f})")
         st.dataframe(df.style.format({"amount": "${:,.2f}"}))
 
-        # Add export button to download as CSV
-        st.download_button(
-            label="Download as CSV",
-            data=df.to_csv().encode("utf-8"),
-            file_name=f'{title.lower().replace(" ", "_")}.csv',
-            mime="text/csv",
+        # Exports are written to a temp file in chunks instead of built in memory
+        name = title.lower().replace(" ", "_")
+        display_export_controls(df, name, key=f"{name}_export")
+    else:
+        st.warning(f"No data available for {title}.")
+
+def pivot_statement_by_period(df, periods):
+    """Turn grouped (postingperiod, account) rows into an account-by-period matrix."""
+    if df.empty:
+        return df
+    matrix = df.assign(amount=df["amount"].astype(float)).pivot_table(
+        index=["account_number", "account_name"],
+        columns="postingperiod",
+        values="amount",
+        aggfunc="sum",
+        fill_value=0,
+    )
+    matrix = matrix.reindex(columns=[period for period in periods if period in matrix.columns])
+    matrix.columns.name = None
+    return matrix.reset_index()
+
+def display_comparative_statement(df, title, periods):
+    if not df.empty:
+        st.subheader(f"{title} ({periods[0]} – {periods[-1]})")
+        st.dataframe(
+            df.style.format({period: "${:,.2f}" for period in periods if period in df.columns}),
+            hide_index=True,
         )
+        name = f'{title.lower().replace(" ", "_")}_comparison'
+        display_export_controls(df, name, key=f"{name}_export")
     else:
         st.warning(f"No data available for {title}.")
 
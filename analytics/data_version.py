@@ -0,0 +1,108 @@
+"""Data versions used in cache keys.
+
+`database.ingest` bumps a version per (table, year, month) in `data.data_version`.
+Cached queries take a token built from the versions of the months they read, so
+they stay cached until one of those months is reloaded and refresh on the next
+poll after it is. Rows written by other loaders do not bump a version, so each
+month's version also carries the MAX(id) and row count of that month's rows,
+and a write only invalidates the months it touched. Tables without a month
+column (the salmon tables) are probed as a whole. Tokens of `financial_data`
+also carry a hash of `master.financial_account`, whose rates are cached with
+the facts.
+"""
+import hashlib
+
+from sqlalchemy import func, extract
+
+from database.session import session_scope
+from database.models import DataVersion, FinancialAccount, FinancialData, SalesData, SalmonOrders, SalmonOrderWeight
+from utils.cache import cache_data
+
+# How long a probe result is reused before `data.data_version` is read again.
+VERSION_POLL_SECONDS = 10
+
+FACT_TABLES = {
+    'financial_data': FinancialData,
+    'sales_data': SalesData,
+    'salmon_orders': SalmonOrders,
+    'salmon_order_weight': SalmonOrderWeight,
+}
+
+# Master tables joined into the cached rows of a fact table
+MASTER_TABLES = {
+    'financial_account': FinancialAccount,
+}
+TABLE_DEPENDENCIES = {
+    'financial_data': ['financial_account'],
+}
+
+
+def month_columns(table_name):
+    """(year, month) expressions of a fact table's rows, or None if it has no month."""
+    if table_name == 'financial_data':
+        return FinancialData.year, FinancialData.month
+    if table_name == 'sales_data':
+        return extract('year', SalesData.date), extract('month', SalesData.date)
+    return None
+
+
+@cache_data(ttl=VERSION_POLL_SECONDS)
+def probe_data_versions(table_name):
+    """{(year, month): (version, max_id, rows)} of a fact table, or {None: (None, max_id, rows)}
+    for a table without a month column."""
+    model = FACT_TABLES[table_name]
+    columns = month_columns(table_name)
+    with session_scope() as session:
+        if columns is None:
+            return {None: (None,) + tuple(session.query(func.max(model.id), func.count(model.id)).one())}
+        versions = session.query(DataVersion.year, DataVersion.month, DataVersion.version).filter(
+            DataVersion.table_name == table_name
+        ).all()
+        stats = session.query(*columns, func.max(model.id), func.count(model.id)).group_by(*columns).all()
+    probes = {(int(year), int(month)): (None, max_id, rows) for year, month, max_id, rows in stats if year is not None}
+    for year, month, version in versions:
+        probes[(year, month)] = (version,) + probes.get((year, month), (None, None, 0))[1:]
+    return probes
+
+
+@cache_data(ttl=VERSION_POLL_SECONDS)
+def probe_master_version(table_name):
+    """Hash of every row of a master table, so edits such as rate changes are picked up."""
+    model = MASTER_TABLES[table_name]
+    with session_scope() as session:
+        rows = session.query(*model.__table__.columns).order_by(model.id).all()
+    return hashlib.sha256(repr([tuple(row) for row in rows]).encode("utf-8")).hexdigest()[:16]
+
+
+def master_versions(table_name):
+    """Versions of the master tables whose columns are cached with a fact table's rows."""
+    return tuple(probe_master_version(name) for name in TABLE_DEPENDENCIES.get(table_name, ()))
+
+
+def month_bounds(period_str, end=False):
+    """First (or last) (year, month) of a "YYYY", "YYYY-QX" or "YYYY-MXX" period."""
+    if '-Q' in period_str:
+        year, quarter = map(int, period_str.split('-Q'))
+        return year, quarter * 3 if end else quarter * 3 - 2
+    if '-M' in period_str:
+        year, month = map(int, period_str.split('-M'))
+        return year, month
+    return int(period_str), 12 if end else 1
+
+
+def data_version(table_name, start_str=None, end_str=None):
+    """Token that changes when any month between `start_str` and `end_str` is reloaded or written to."""
+    probes = probe_data_versions(table_name)
+    if None not in probes:
+        first = month_bounds(start_str) if start_str else (0, 0)
+        last = month_bounds(end_str, end=True) if end_str else (9999, 12)
+        probes = {month: probe for month, probe in probes.items() if first <= month <= last}
+    token = (sorted(probes.items(), key=str), master_versions(table_name))
+    return hashlib.sha256(repr(token).encode("utf-8")).hexdigest()[:16]
+
+
+def month_versions(table_name, months):
+    """Version of each (year, month) in `months`; None for a month without rows or versions."""
+    probes = probe_data_versions(table_name)
+    masters = master_versions(table_name)
+    return {month: (probes.get(month), masters) for month in months}
@@ -0,0 +1,99 @@
+"""In-process cache of the location dimension.
+
+`master.location` with its department, class and operations manager is a few
+hundred rows, so it is loaded once into a frame indexed by `location.id` and
+fact queries fetch only `location_id`. Names and attributes are attached with a
+vectorized index lookup. The rows are re-read every VERSION_POLL_SECONDS and the
+lookup frame is rebuilt only when their content changed.
+"""
+import numpy as np
+import pandas as pd
+
+from database.session import session_scope
+from database.models import Location, Department, Class, Manager, SokLocation
+from analytics.data_version import VERSION_POLL_SECONDS
+from utils.cache import cache_data
+
+LOCATION_ATTRIBUTES = ['location_name', 'department_name', 'class_name', 'manager', 'city', 'country', 'status']
+SOK_ATTRIBUTES = ['sok_region', 'sok_type', 'sok_commission']
+# SOK attribute value of locations that are not SOK sites
+NON_SOK = "Non-SOK"
+
+
+@cache_data(ttl=VERSION_POLL_SECONDS)
+def fetch_location_rows():
+    with session_scope() as session:
+        results = session.query(
+            Location.id,
+            Location.short_name,
+            Department.name,
+            Class.name,
+            Manager.name,
+            Location.city,
+            Location.country,
+            Location.status,
+        ).outerjoin(
+            Department, Location.department_id == Department.id
+        ).outerjoin(
+            Class, Location.class_id == Class.id
+        ).outerjoin(
+            Manager, Location.op_manager_id == Manager.id
+        ).all()
+    return pd.DataFrame(results, columns=['id'] + LOCATION_ATTRIBUTES)
+
+
+@cache_data(ttl=VERSION_POLL_SECONDS)
+def fetch_sok_rows():
+    with session_scope() as session:
+        results = session.query(
+            SokLocation.location_id,
+            SokLocation.region,
+            SokLocation.type,
+            SokLocation.is_commision,
+        ).order_by(SokLocation.id).all()
+    return pd.DataFrame(results, columns=['location_id', 'region', 'type', 'is_commision'])
+
+
+def sok_attributes(sok_rows):
+    """SOK region, type and commission label per location; the first SOK site of a location wins."""
+    sok = sok_rows.drop_duplicates('location_id').set_index('location_id')
+    return pd.DataFrame({
+        'sok_region': sok['region'].fillna("No region"),
+        'sok_type': sok['type'],
+        'sok_commission': sok['is_commision'].map({True: "Commission", False: "No commission"}),
+    }, index=sok.index)
+
+
+@cache_data
+def build_location_dimension(rows, sok_rows):
+    # keyed by the rows' content, so this only reruns when a location changed
+    dimension = rows.set_index('id').join(sok_attributes(sok_rows))
+    dimension[SOK_ATTRIBUTES] = dimension[SOK_ATTRIBUTES].fillna(NON_SOK)
+    return dimension.astype('category')
+
+
+def location_dimension():
+    """Location and SOK attributes indexed by `location.id`, one categorical column per attribute."""
+    return build_location_dimension(fetch_location_rows(), fetch_sok_rows())
+
+
+def location_ids(department_name):
+    """Ids of the locations of a department, for filtering fact tables without a join."""
+    dimension = location_dimension()
+    return dimension.index[dimension['department_name'] == department_name].tolist()
+
+
+def attach_location_attributes(df, attributes, key='location_id', required=()):
+    """Add `attributes` of each row's location to `df`.
+
+    Rows whose location is unknown or lacks one of the `required` attributes are
+    dropped, as an inner join would.
+    """
+    dimension = location_dimension()
+    positions = dimension.index.get_indexer(df[key])
+    keep = positions >= 0
+    for attribute in required:
+        keep &= dimension[attribute].notna().to_numpy()[np.maximum(positions, 0)]
+    if not keep.all():
+        df, positions = df.loc[keep], positions[keep]
+    return df.assign(**{attribute: np.asarray(dimension[attribute], dtype=object)[positions] for attribute in attributes})
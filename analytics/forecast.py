@@ -0,0 +1,295 @@
+"""Batched additive Holt-Winters forecasting with a damped trend.
+
+All series are fitted at once: the smoothing recursions run over a
+(series x parameter-grid) matrix, and each series keeps the parameter set with
+the lowest one-step-ahead squared error. The trend is damped by phi < 1, so
+long horizons level off instead of extrapolating a noisy slope. Large batches
+are split across a process pool.
+"""
+import os
+import itertools
+from datetime import date
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from utils.cache import cache_data
+
+SEASON_LENGTH = {
+    'month': 12,
+    'quarter': 4,
+    'year': 0,
+    'day': 7,
+}
+SMOOTHING_GRID = (0.1, 0.3, 0.5, 0.8)
+TREND_GRID = (0.0, 0.1, 0.3)
+# Trend damping; the h-step trend contribution is (phi + ... + phi^h) * trend
+DAMPING_GRID = (0.8, 0.9, 0.98)
+# Batches larger than this are fitted in a process pool.
+PARALLEL_MIN_SERIES = 2000
+# Written by `python -m analytics.forecast_job`, read by the pages.
+FORECAST_STORE_PATH = os.getenv("FORECAST_STORE_PATH", "forecast_store.parquet")
+# Options of `query_performance_overview_data` the department projections are stored with
+FORECAST_OPTION_COLUMNS = ['report_type', 'custom_adjustment', 'split_office_cost']
+MONTHS_PER_PERIOD = {
+    'month': 1,
+    'quarter': 3,
+    'year': 12,
+}
+
+
+def parameter_grid(seasonal):
+    gammas = SMOOTHING_GRID if seasonal else (0.0,)
+    return np.array(list(itertools.product(SMOOTHING_GRID, TREND_GRID, gammas, DAMPING_GRID)))
+
+
+def initial_states(Y, season_length):
+    if season_length:
+        first = Y[:, :season_length]
+        level = first.mean(axis=1)
+        if Y.shape[1] >= 2 * season_length:
+            trend = (Y[:, season_length:2 * season_length].mean(axis=1) - level) / season_length
+        else:
+            trend = np.zeros(len(Y))
+        season = first - level[:, None]
+    else:
+        level = Y[:, 0].copy()
+        trend = Y[:, 1] - Y[:, 0] if Y.shape[1] > 1 else np.zeros(len(Y))
+        season = np.zeros((len(Y), 1))
+    return level, trend, season
+
+
+def fit_ets(Y, season_length=0):
+    """Fit additive Holt-Winters to every row of `Y` (n_series x n_periods).
+
+    Returns a dict of per-series parameters and final states for `forecast_ets`.
+    Seasonality is dropped when there are fewer than two full seasons.
+    """
+    Y = np.nan_to_num(np.asarray(Y, dtype=float))
+    n_series, n_periods = Y.shape
+    if season_length and n_periods < 2 * season_length:
+        season_length = 0
+    grid = parameter_grid(bool(season_length))
+    alpha, beta, gamma, phi = (grid[:, i][None, :] for i in range(4))
+
+    level0, trend0, season0 = initial_states(Y, season_length)
+    m = max(season_length, 1)
+    # states are (n_series, n_params); the seasonal state is a ring buffer of length m
+    level = np.repeat(level0[:, None], len(grid), axis=1)
+    trend = np.repeat(trend0[:, None], len(grid), axis=1)
+    season = np.repeat(season0[:, :, None], len(grid), axis=2)
+    sse = np.zeros((n_series, len(grid)))
+
+    start = season_length if season_length else 1
+    for t in range(start, n_periods):
+        y = Y[:, t][:, None]
+        s = season[:, t % m, :] if season_length else 0.0
+        error = y - (level + phi * trend + s)
+        sse += error ** 2
+        new_level = alpha * (y - s) + (1 - alpha) * (level + phi * trend)
+        trend = beta * (new_level - level) + (1 - beta) * phi * trend
+        if season_length:
+            season[:, t % m, :] = gamma * (y - new_level) + (1 - gamma) * s
+        level = new_level
+
+    best = sse.argmin(axis=1)
+    rows = np.arange(n_series)
+    return {
+        'season_length': season_length,
+        'n_periods': n_periods,
+        'alpha': grid[best, 0],
+        'beta': grid[best, 1],
+        'gamma': grid[best, 2],
+        'phi': grid[best, 3],
+        'level': level[rows, best],
+        'trend': trend[rows, best],
+        'season': season[rows, :, best],
+        'rmse': np.sqrt(sse[rows, best] / max(n_periods - start, 1)),
+    }
+
+
+def forecast_ets(model, horizon):
+    """(n_series x horizon) point forecasts from a fitted model."""
+    steps = np.arange(1, horizon + 1)
+    # phi + phi^2 + ... + phi^h for every series and step
+    damping = np.cumsum(model['phi'][:, None] ** steps[None, :], axis=1)
+    forecast = model['level'][:, None] + damping * model['trend'][:, None]
+    if model['season_length']:
+        m = model['season_length']
+        forecast += model['season'][:, (model['n_periods'] + steps - 1) % m]
+    return forecast
+
+
+def period_timeframe(period):
+    if '-Q' in period:
+        return 'quarter'
+    if '-M' in period:
+        return 'month'
+    return 'year'
+
+
+def next_periods(last_period, horizon):
+    """Period labels following `last_period` ("2024", "2024-Q3" or "2024-M07")."""
+    timeframe = period_timeframe(last_period)
+    if timeframe == 'year':
+        return [str(int(last_period) + h) for h in range(1, horizon + 1)]
+    year, index = last_period.replace('Q', 'M').split('-M')
+    per_year = 4 if timeframe == 'quarter' else 12
+    position = int(year) * per_year + int(index) - 1
+    labels = []
+    for h in range(1, horizon + 1):
+        y, i = divmod(position + h, per_year)
+        labels.append(f"{y}-Q{i + 1}" if timeframe == 'quarter' else f"{y}-M{i + 1:02d}")
+    return labels
+
+
+def current_period(timeframe):
+    today = date.today()
+    if timeframe == 'quarter':
+        return f"{today.year}-Q{(today.month - 1) // 3 + 1}"
+    if timeframe == 'month':
+        return f"{today.year}-M{today.month:02d}"
+    return str(today.year)
+
+
+PERFORMANCE_SERIES = {
+    'amount_calc_sales': 'Sales',
+    'amount_calc': 'Profit',
+    'amount_calc_material': 'Material cost',
+    'amount_calc_staff': 'Staff cost',
+    'amount_calc_other': 'Other cost',
+}
+
+
+@cache_data
+def fit_batch(Y, season_length, workers=None):
+    """Fit all rows of `Y`, splitting very large batches across a process pool.
+
+    Callers pass closed-period history only; it no longer changes, so the fitted
+    parameters stay cached while the current period is still receiving postings.
+    """
+    Y = np.asarray(Y, dtype=float)
+    workers = workers or os.cpu_count() or 1
+    if len(Y) < PARALLEL_MIN_SERIES or workers == 1:
+        return fit_ets(Y, season_length)
+    chunks = np.array_split(Y, workers)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        models = list(executor.map(fit_ets, chunks, [season_length] * len(chunks)))
+    return {
+        key: models[0][key] if key in ('season_length', 'n_periods') else np.concatenate([m[key] for m in models])
+        for key in models[0]
+    }
+
+
+def daily_location_matrix(ss_df):
+    """(location x day) sales matrix of closed months; missing days count as zero sales."""
+    dates = pd.to_datetime(ss_df['date'])
+    closed = dates < pd.Timestamp(date.today().replace(day=1))
+    daily = pd.DataFrame({
+        'location_name': ss_df['location_name'].to_numpy()[closed],
+        'date': dates[closed].to_numpy(),
+        'amount': ss_df['amount'].to_numpy()[closed].astype(float),
+    }).pivot_table(index='location_name', columns='date', values='amount', aggfunc='sum', fill_value=0)
+    if daily.empty:
+        return daily
+    return daily.reindex(columns=pd.date_range(daily.columns.min(), daily.columns.max(), freq='D'), fill_value=0)
+
+
+def forecast_location_sales(ss_df, horizon_days=92):
+    """Daily sales projection for every location from `query_sales_data` rows, fitted
+    as one batch with weekly seasonality. Returns one row per (location_name, date)."""
+    daily = daily_location_matrix(ss_df) if not ss_df.empty else pd.DataFrame()
+    if daily.empty:
+        return pd.DataFrame(columns=['location_name', 'date', 'forecast'])
+    model = fit_batch(daily.to_numpy(), SEASON_LENGTH['day'])
+    forecast = np.clip(forecast_ets(model, horizon_days), 0, None)
+    future_dates = pd.date_range(daily.columns.max() + pd.Timedelta(days=1), periods=horizon_days, freq='D')
+    return pd.DataFrame({
+        'location_name': np.repeat(daily.index.to_numpy(), horizon_days),
+        'date': np.tile(future_dates.to_numpy(), len(daily)),
+        'forecast': forecast.ravel(),
+    })
+
+
+def month_to_period(months, timeframe):
+    """Convert "YYYY-MXX" labels to the page's timeframe."""
+    if timeframe == 'month':
+        return months
+    year = months.str[:4]
+    if timeframe == 'quarter':
+        return year + '-Q' + ((months.str[-2:].astype(int) - 1) // 3 + 1).astype(str)
+    return year
+
+
+def month_days(months):
+    """Number of days of each "YYYY-MXX" label."""
+    return pd.to_datetime(months.str.replace('-M', '-', regex=False), format='%Y-%m').dt.days_in_month.to_numpy()
+
+
+@cache_data
+def read_forecast_store(path, mtime):
+    # `mtime` is only part of the cache key, so a refreshed store is picked up
+    return pd.read_parquet(path)
+
+
+def load_forecast_store(path=FORECAST_STORE_PATH):
+    """The precomputed forecasts, or None when the forecast job has not run yet."""
+    if not os.path.exists(path):
+        return None
+    return read_forecast_store(path, os.path.getmtime(path))
+
+
+def stored_forecast(scope, department_name, timeframe, path=FORECAST_STORE_PATH, options=None):
+    """Stored monthly rows of one scope summed into complete periods of `timeframe`.
+    `options` ({column: value} of FORECAST_OPTION_COLUMNS) selects the rows fitted with them."""
+    store = load_forecast_store(path)
+    if store is None:
+        return None
+    rows = store.loc[store['scope'] == scope]
+    if options:
+        if not set(options) <= set(store.columns):
+            # written before projections were stored per option set
+            return None
+        for column, value in options.items():
+            rows = rows.loc[rows[column] == value]
+    if department_name is None:
+        if scope == 'department':
+            rows = rows.loc[rows['department_name'].isna()]
+    else:
+        rows = rows.loc[rows['department_name'] == department_name]
+    if 'days' in rows.columns:
+        # a month the horizon ends in is only partly projected
+        rows = rows.loc[rows['days'].to_numpy() == month_days(rows['month'])]
+    rows = rows.assign(period=month_to_period(rows['month'], timeframe))
+    keys = ['location_name', 'metric', 'period'] if scope == 'location' else ['metric', 'period']
+    grouped = rows.groupby(keys)['forecast'].agg(['sum', 'count']).reset_index()
+    # Drop periods the forecast horizon only partly covers
+    return grouped.loc[grouped['count'] == MONTHS_PER_PERIOD[timeframe]].drop(columns='count').rename(columns={'sum': 'forecast'})
+
+
+def get_performance_forecast(po_df, department_name=None, report_type='standard', custom_adjustment=True, split_office_cost=False, path=FORECAST_STORE_PATH):
+    """Projected sales, profit and costs for the periods after `po_df`, in the column
+    layout of `prepare_performance_overview_data`. None without a store, when no
+    projection was fitted with the same options, or when it does not start at the
+    period right after `po_df` (a historical range)."""
+    if po_df.empty:
+        return None
+    last_period = po_df['period'].max()
+    options = dict(zip(FORECAST_OPTION_COLUMNS, (report_type.lower(), custom_adjustment, split_office_cost)))
+    rows = stored_forecast('department', department_name, period_timeframe(last_period), path, options)
+    if rows is None or rows.empty:
+        return None
+    result = rows.pivot(index='period', columns='metric', values='forecast').reset_index().rename_axis(columns=None)
+    result = result.loc[result['period'] > last_period]
+    if result.empty or result['period'].min() != next_periods(last_period, 1)[0]:
+        return None
+    return result
+
+
+def get_location_forecast(department_name=None, timeframe='quarter', path=FORECAST_STORE_PATH):
+    """Projected sales per location (location x period) from the forecast store."""
+    rows = stored_forecast('location', department_name, timeframe.lower(), path)
+    if rows is None:
+        return None
+    return rows.pivot(index='location_name', columns='period', values='forecast').reset_index().rename_axis(columns=None)
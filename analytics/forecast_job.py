@@ -0,0 +1,142 @@
+"""Refresh the precomputed forecast store.
+
+Fits monthly P&L projections for the company and every department from
+`data.financial_data`, for every report type with and without custom
+adjustment, and sales projections for every location from `data.sales_data`,
+then writes them to one Parquet file that the pages only read. Run it after
+each data upload:
+    python -m analytics.forecast_job
+"""
+import os
+import logging
+import argparse
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import func
+
+from database.session import session_scope
+from database.models import Department, Location, SalesData
+from analytics.query import REPORT_TYPE, query_unique_timeframes, query_performance_overview_data, aggregate_performance
+from analytics.forecast import (
+    FORECAST_STORE_PATH, FORECAST_OPTION_COLUMNS, PERFORMANCE_SERIES, SEASON_LENGTH,
+    fit_batch, forecast_ets, current_period, next_periods, month_days, forecast_location_sales,
+)
+from utils.export import write_parquet
+
+logger = logging.getLogger(__name__)
+
+FORECAST_HORIZON_MONTHS = 12
+LOCATION_HORIZON_DAYS = 184
+# Stand-in department name for the company total while grouping; stored as null.
+TOTAL = ''
+STORE_COLUMNS = ['scope', 'department_name', 'location_name', 'metric', 'month', 'forecast', 'days'] + FORECAST_OPTION_COLUMNS + ['fitted_at']
+# (report_type, custom_adjustment, split_office_cost) the department projections are fitted
+# with; views that split office cost are shown without a projection.
+FORECAST_OPTION_SETS = [
+    (report_type, custom_adjustment, False) for report_type in REPORT_TYPE for custom_adjustment in (True, False)
+]
+
+
+def forecast_departments(horizon=FORECAST_HORIZON_MONTHS, option_sets=FORECAST_OPTION_SETS):
+    """Monthly P&L projections for the company total (department_name None) and each
+    department, for every option set, fitted as one batch."""
+    months = query_unique_timeframes('month')
+    if not months:
+        return pd.DataFrame(columns=STORE_COLUMNS[:-1])
+    performance = []
+    for report_type, custom_adjustment, split_office_cost in option_sets:
+        df = query_performance_overview_data(
+            department_name=None, report_type=report_type, start_str=months[0], end_str=months[-1], timeframe='month',
+            custom_adjustment=custom_adjustment, split_office_cost=split_office_cost,
+        )
+        df = df.loc[df['period'] < current_period('month')]
+        options = dict(zip(FORECAST_OPTION_COLUMNS, (report_type, custom_adjustment, split_office_cost)))
+        performance += [
+            aggregate_performance(df, ['period']).assign(department_name=TOTAL, **options),
+            aggregate_performance(df, ['department_name', 'period']).assign(**options),
+        ]
+    performance = pd.concat(performance, ignore_index=True)
+
+    # One row per (option set, department, metric), one column per closed month
+    keys = FORECAST_OPTION_COLUMNS + ['department_name']
+    series = performance.melt(
+        id_vars=keys + ['period'], value_vars=list(PERFORMANCE_SERIES), var_name='metric',
+    ).pivot_table(
+        index=keys + ['metric'], columns='period', values='value', aggfunc='sum', fill_value=0, dropna=False,
+    )
+    series = series.loc[:, sorted(series.columns)]
+    model = fit_batch(series.to_numpy(dtype=float), SEASON_LENGTH['month'])
+    forecast = forecast_ets(model, horizon)
+
+    future = next_periods(series.columns[-1], horizon)
+    index = series.index.to_frame(index=False)
+    return pd.DataFrame({
+        'scope': 'department',
+        'department_name': np.repeat(index['department_name'].replace({TOTAL: None}).to_numpy(), horizon),
+        'location_name': None,
+        'metric': np.repeat(index['metric'].to_numpy(), horizon),
+        'month': np.tile(future, len(series)),
+        'forecast': forecast.ravel(),
+        'days': np.tile(month_days(pd.Series(future)), len(series)),
+        **{column: np.repeat(index[column].to_numpy(), horizon) for column in FORECAST_OPTION_COLUMNS},
+    })
+
+
+def query_daily_location_sales():
+    """Daily sales per location, summed in the database."""
+    with session_scope() as session:
+        results = session.query(
+            SalesData.date,
+            Location.short_name.label('location_name'),
+            Department.name.label('department_name'),
+            func.sum(SalesData.amount),
+        ).join(
+            Location, SalesData.location_internal_id == Location.id
+        ).join(
+            Department, Location.department_id == Department.id
+        ).group_by(
+            SalesData.date, Location.short_name, Department.name
+        ).all()
+    return pd.DataFrame(results, columns=['date', 'location_name', 'department_name', 'amount'])
+
+
+def forecast_locations(horizon_days=LOCATION_HORIZON_DAYS):
+    """Monthly sales projections per location."""
+    sales = query_daily_location_sales()
+    if sales.empty:
+        return pd.DataFrame(columns=STORE_COLUMNS[:-1])
+    daily = forecast_location_sales(sales, horizon_days)
+    dates = pd.to_datetime(daily['date'])
+    monthly = daily.assign(
+        month=dates.dt.year.astype(str) + '-M' + dates.dt.month.astype(str).str.zfill(2),
+    ).groupby(['location_name', 'month'], as_index=False).agg(forecast=('forecast', 'sum'), days=('forecast', 'size'))
+    departments = sales.drop_duplicates('location_name').set_index('location_name')['department_name']
+    return monthly.assign(
+        scope='location',
+        department_name=monthly['location_name'].map(departments),
+        metric='amount_calc_sales',
+    )
+
+
+def refresh_forecast_store(path=FORECAST_STORE_PATH):
+    """Fit all forecasts and atomically replace the store at `path`. Returns the row count."""
+    started = datetime.now()
+    store = pd.concat([forecast_departments(), forecast_locations()], ignore_index=True)
+    store = store.assign(fitted_at=started)[STORE_COLUMNS]
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    write_parquet(store, tmp_path)
+    os.replace(tmp_path, path)
+    logger.info(f"Wrote {len(store)} forecast rows to {path} in {(datetime.now() - started).total_seconds():.1f}s")
+    return len(store)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fit department and location forecasts and write the forecast store.")
+    parser.add_argument("--path", default=FORECAST_STORE_PATH, help="Parquet forecast store")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    print(refresh_forecast_store(args.path))
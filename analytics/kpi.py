@@ -0,0 +1,170 @@
+"""Year-over-year and trailing-twelve-month KPIs.
+
+The KPIs come from one monthly aggregate of the financial frame, laid out with
+one row per month of a dense index and one column per (group, measure), so the
+windows are a single `shift` / `rolling` over the whole cube. The frame is read
+from twelve months before the selected start; those months come out of the same
+month slices the page query uses.
+"""
+import pandas as pd
+
+from analytics.data_version import month_bounds
+from analytics.query import CACHE_MAX_ENTRIES, aggregate_performance, period_labels, query_performance_overview_data
+from utils.cache import cache_data
+
+KPI_WINDOW_MONTHS = 12
+
+# aggregate_performance column of each monthly measure
+KPI_MEASURES = {
+    'profit': 'amount_calc',
+    'sales': 'amount_calc_sales',
+    'material': 'amount_calc_material',
+    'staff': 'amount_calc_staff',
+    'other': 'amount_calc_other',
+}
+COST_MEASURES = ['material', 'staff', 'other']
+
+
+def month_str(year, month):
+    return f"{year}-M{month:02d}"
+
+
+def history_start(start_str, months=KPI_WINDOW_MONTHS):
+    """Month `months` before the first month of `start_str`."""
+    year, month = month_bounds(start_str)
+    index = year * 12 + month - 1 - months
+    return month_str(index // 12, index % 12 + 1)
+
+
+def query_kpi_data(department_name=None, report_type='standard', start_str=None, end_str=None, custom_adjustment=True, split_office_cost=False):
+    """Monthly financial rows from KPI_WINDOW_MONTHS before `start_str` to `end_str`."""
+    return query_performance_overview_data(
+        department_name=department_name,
+        report_type=report_type,
+        start_str=history_start(start_str),
+        end_str=month_str(*month_bounds(end_str, end=True)),
+        timeframe="month",
+        custom_adjustment=custom_adjustment,
+        split_office_cost=split_office_cost,
+    )
+
+
+def monthly_cube(df, keys=()):
+    """Measures per month (rows, dense from first to last month) and group of `keys` (columns).
+
+    Months in which a group has no rows are NaN, so windows over them are not
+    taken for complete.
+    """
+    keys = list(keys)
+    monthly = aggregate_performance(df, keys + ['year_month'])
+    monthly = monthly.assign(month=pd.PeriodIndex(monthly['year_month'].str.replace('-M', '-'), freq='M'))
+    monthly = monthly.assign(**{measure: monthly[column].astype(float) for measure, column in KPI_MEASURES.items()})
+    cube = monthly.pivot_table(index='month', columns=keys or None, values=list(KPI_MEASURES), aggfunc='sum')
+    if not keys:
+        cube.columns = pd.MultiIndex.from_product([cube.columns, ['']])
+    months = pd.period_range(monthly['month'].min(), monthly['month'].max(), freq='M')
+    return cube.reindex(months)
+
+
+@cache_data(max_entries=CACHE_MAX_ENTRIES)
+def prepare_kpi_data(df, timeframe, start_str, keys=()):
+    """YoY growth and trailing-twelve-month profit and cost ratios per period from `start_str` on.
+
+    Sales and profit are the period's totals and are compared with the same
+    months a year earlier; TTM figures are as of the period's last month. A
+    comparison or TTM figure is NaN unless every month it covers has rows.
+    """
+    if df.empty:
+        return pd.DataFrame()
+    keys = list(keys)
+    cube = monthly_cube(df, keys)
+    last_year = cube.shift(KPI_WINDOW_MONTHS)
+    # NaN unless all twelve months of the window have rows
+    ttm = cube.rolling(KPI_WINDOW_MONTHS, min_periods=KPI_WINDOW_MONTHS).sum()
+
+    names = ['measure'] + (keys or ['group'])
+    frame = pd.concat({'value': cube, 'last_year': last_year, 'ttm': ttm}, axis=1, names=['window'] + names)
+    frame = frame.stack(names[1:], future_stack=True)
+    frame.columns = [f'{measure}_{window}' for window, measure in frame.columns]
+    frame = frame.reset_index(names=['month'] + names[1:])
+    # the months before `start_str` only feed the windows
+    year, month = month_bounds(start_str)
+    frame = frame.loc[frame['month'] >= pd.Period(year=year, month=month, freq='M')]
+
+    months = frame['month']
+    frame['period'] = period_labels(months.dt.year, months.dt.month, timeframe.lower())
+    group_keys = keys + ['period']
+    grouped = frame.sort_values('month', kind='mergesort').groupby(group_keys, sort=True)
+    flows = grouped[[f'{measure}_value' for measure in ['sales', 'profit']]].sum(min_count=1)
+    # last year's totals only where every month of the period has one
+    last_year_columns = [f'{measure}_last_year' for measure in ['sales', 'profit']]
+    last_year = grouped[last_year_columns].sum().where(grouped[last_year_columns].count().eq(grouped.size(), axis=0))
+    closing = grouped[[f'{measure}_ttm' for measure in KPI_MEASURES]].last(skipna=False)
+    kpi = flows.join(last_year).join(closing).reset_index()
+
+    ttm_sales = kpi['sales_ttm'].where(kpi['sales_ttm'] != 0)
+    result = kpi[group_keys].assign(
+        sales=kpi['sales_value'],
+        sales_last_year=kpi['sales_last_year'],
+        sales_yoy=kpi['sales_value'] / kpi['sales_last_year'].where(kpi['sales_last_year'] != 0) - 1,
+        profit=kpi['profit_value'],
+        profit_last_year=kpi['profit_last_year'],
+        profit_yoy=(kpi['profit_value'] - kpi['profit_last_year']) / kpi['profit_last_year'].abs().where(kpi['profit_last_year'] != 0),
+        ttm_sales=kpi['sales_ttm'],
+        ttm_profit=kpi['profit_ttm'],
+        ttm_profit_rate=kpi['profit_ttm'] / ttm_sales,
+        **{f'ttm_{measure}_rate': (kpi[f'{measure}_ttm'] / ttm_sales).abs() for measure in COST_MEASURES},
+    )
+    return result.reset_index(drop=True)
+
+
+def kpi_column_config():
+    """Column labels and formats of the KPI table."""
+    import streamlit as st
+
+    return {
+        'sales': st.column_config.NumberColumn("Sales", format="%.0f"),
+        'sales_last_year': st.column_config.NumberColumn("Sales LY", format="%.0f"),
+        'sales_yoy': st.column_config.NumberColumn("Sales YoY", format="%.1f%%"),
+        'profit': st.column_config.NumberColumn("Profit", format="%.0f"),
+        'profit_last_year': st.column_config.NumberColumn("Profit LY", format="%.0f"),
+        'profit_yoy': st.column_config.NumberColumn("Profit YoY", format="%.1f%%"),
+        'ttm_sales': st.column_config.NumberColumn("TTM sales", format="%.0f"),
+        'ttm_profit': st.column_config.NumberColumn("TTM profit", format="%.0f"),
+        'ttm_profit_rate': st.column_config.NumberColumn("TTM profit rate", format="%.1f%%"),
+        'ttm_material_rate': st.column_config.NumberColumn("TTM material rate", format="%.1f%%"),
+        'ttm_staff_rate': st.column_config.NumberColumn("TTM staff rate", format="%.1f%%"),
+        'ttm_other_rate': st.column_config.NumberColumn("TTM other cost rate", format="%.1f%%"),
+    }
+
+
+PERCENT_COLUMNS = ['sales_yoy', 'profit_yoy', 'ttm_profit_rate'] + [f'ttm_{measure}_rate' for measure in COST_MEASURES]
+
+
+def display_kpi_table(kpi_df):
+    import streamlit as st
+
+    if kpi_df.empty:
+        st.warning("No data available for the selected period.")
+        return
+    st.dataframe(
+        kpi_df.assign(**{column: kpi_df[column] * 100 for column in PERCENT_COLUMNS}),
+        column_config=kpi_column_config(),
+        use_container_width=True,
+        hide_index=True,
+    )
+
+
+def display_kpis(department_name, report_type, start_str, end_str, timeframe, custom_adjustment=True, split_office_cost=False, by_department=False):
+    import streamlit as st
+
+    st.subheader(f'Key Figures{" - " + department_name if department_name else ""}')
+    df = query_kpi_data(department_name, report_type, start_str, end_str, custom_adjustment, split_office_cost)
+    if not by_department:
+        display_kpi_table(prepare_kpi_data(df, timeframe, start_str))
+        return
+    kpi_total_tab, kpi_department_tab = st.tabs(["Total", "By Department"])
+    with kpi_total_tab:
+        display_kpi_table(prepare_kpi_data(df, timeframe, start_str))
+    with kpi_department_tab:
+        display_kpi_table(prepare_kpi_data(df, timeframe, start_str, keys=('department_name',)))
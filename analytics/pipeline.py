@@ -0,0 +1,64 @@
+"""Concurrent preparation of the frames a page displays.
+
+A pipeline is a dict of steps, `name -> (func, requires, kwargs)`. A step is
+called with the results named in `requires` as positional arguments and runs
+as soon as all of them are available, so independent steps run side by side.
+The pool shares the script context, so the cached `prepare_*` functions keep
+their cache entries.
+"""
+from concurrent.futures import wait, FIRST_COMPLETED
+
+from analytics.query import (
+    prepare_performance_overview_data,
+    prepare_performance_by_department_data,
+    prepare_turnover_structure_data,
+    prepare_cost_structure_cumulative,
+    prepare_cost_structure_cumulative_icicle,
+)
+from analytics.forecast import get_performance_forecast
+from utils.concurrency import script_run_executor
+
+PIPELINE_MAX_WORKERS = 4
+
+
+def run_pipeline(steps, inputs, max_workers=PIPELINE_MAX_WORKERS):
+    """Run `steps` on `inputs` and return every input and step result by name."""
+    results = dict(inputs)
+    pending = dict(steps)
+    with script_run_executor(max_workers=max_workers) as executor:
+        futures = {}
+        while pending or futures:
+            ready = [name for name, (_, requires, _) in pending.items() if all(r in results for r in requires)]
+            for name in ready:
+                func, requires, kwargs = pending.pop(name)
+                futures[executor.submit(func, *[results[r] for r in requires], **kwargs)] = name
+            if not futures:
+                raise ValueError(f"Steps with unknown requirements: {sorted(pending)}")
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                results[futures.pop(future)] = future.result()
+    return results
+
+
+def overview_steps(department_name=None, pivot_by='department_name', report_type='standard', custom_adjustment=True, split_office_cost=False):
+    """Frames shown on the Overview page, all derived from the financial frame `df`; the
+    query options select the matching projection."""
+    forecast_options = {
+        'department_name': department_name,
+        'report_type': report_type,
+        'custom_adjustment': custom_adjustment,
+        'split_office_cost': split_office_cost,
+    }
+    return {
+        'po_df': (prepare_performance_overview_data, ('df',), {'denominator': "sales"}),
+        'forecast_df': (get_performance_forecast, ('po_df',), forecast_options),
+        'cs_costs_df': (prepare_performance_overview_data, ('df',), {'denominator': "costs"}),
+        'ts_df': (prepare_turnover_structure_data, ('df',), {'department_name': department_name, 'pivot_by': pivot_by}),
+        'bd_df': (prepare_performance_by_department_data, ('df',), {'denominator': "sales"}),
+        'cumulative': (prepare_cost_structure_cumulative, ('df',), {}),
+        'icicle_df': (prepare_cost_structure_cumulative_icicle, ('df',), {}),
+    }
+
+
+def prepare_overview_frames(df, department_name=None, pivot_by='department_name', report_type='standard', custom_adjustment=True, split_office_cost=False):
+    return run_pipeline(overview_steps(department_name, pivot_by, report_type, custom_adjustment, split_office_cost), {'df': df})
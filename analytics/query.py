@@ -1,11 +1,25 @@
 import pandas as pd
-import streamlit as st
 from sqlalchemy import create_engine, and_, or_, func, extract, desc, distinct, case
 from sqlalchemy.orm import aliased
 
 from datetime import datetime
 from database.session import session_scope
 from database.models import Department, Location, FinancialAccount, FinancialData, SalesData, Manager, Class
+from analytics.data_version import data_version
+from analytics.dimensions import SOK_ATTRIBUTES, location_ids, attach_location_attributes
+from analytics.slices import RATE_COLUMNS, financial_month_rows
+from utils.cache import cache_data
+
+# Cached results are keyed by data version (queries) or content (transforms), so they
+# never expire; chained transforms each keep their own frames, so only a few are kept.
+CACHE_MAX_ENTRIES = 32
+
+# Location attributes attached to fact rows by `location_id`, and the resulting column order
+FINANCIAL_LOCATION_ATTRIBUTES = ['location_name', 'department_name', 'class_name']
+FINANCIAL_COLUMNS = ['year', 'month', 'location_id', 'location_name', 'department_name', 'class_name', 'account_id', 'amount', 'account_name', 'account_type', 'rate']
+SALES_LOCATION_ATTRIBUTES = ['location_name', 'manager', 'city', 'country', 'status'] + SOK_ATTRIBUTES
+FACTORY_SALES_COLUMNS = ['date', 'location_name', 'product_category', 'unit', 'amount', 'quantity', 'manager', 'city', 'country', 'status']
+SALES_COLUMNS = FACTORY_SALES_COLUMNS + SOK_ATTRIBUTES + ['period']
 
 REPORT_TYPE = {
     'standard': 'std_rate',
@@ -23,8 +37,23 @@ def get_period(date, timeframe):
         return str(date.year)
 
 
-@st.cache_data(ttl=600)
+def period_labels(years, months, timeframe):
+    """Vectorized `get_period` over year and month columns."""
+    years = years.astype(str)
+    if timeframe == 'quarter':
+        return years + '-Q' + ((months - 1) // 3 + 1).astype(str)
+    elif timeframe == 'month':
+        return years + '-M' + months.astype(str).str.zfill(2)
+    else:
+        return years
+
+
 def query_unique_timeframes(timeframe='quarter'):
+    return fetch_unique_timeframes(timeframe, version=data_version('financial_data'))
+
+
+@cache_data(max_entries=CACHE_MAX_ENTRIES)
+def fetch_unique_timeframes(timeframe='quarter', version=None):
     timeframe = timeframe.lower()
     with session_scope() as session:
         if timeframe == 'quarter':
@@ -42,22 +71,23 @@ def query_unique_timeframes(timeframe='quarter'):
             return [str(i[0]) for i in sorted(years)]
 
 
-@st.cache_data(ttl=600)
+@cache_data(max_entries=CACHE_MAX_ENTRIES)
 def generate_period_str(df, timeframe):
+    year_str = df['year'].astype(str)
+    month_str = df['month'].astype(str).str.zfill(2)
     if timeframe == 'year':
         # Convert year to string directly.
-        df['period'] = df['year'].astype(str)
+        period = year_str
     elif timeframe == 'quarter':
         # Calculate quarter from month and format.
-        df['period'] = df['year'].astype(str) + '-Q' + ((df['month'] - 1) // 3 + 1).astype(str)
+        period = year_str + '-Q' + ((df['month'] - 1) // 3 + 1).astype(str)
     elif timeframe == 'month':
         # Format as year-month with zero-filled month.
-        df['period'] = df['year'].astype(str) + '-M' + df['month'].apply(lambda x: f'{x:02d}')
+        period = year_str + '-M' + month_str
     else:
         raise ValueError("Invalid timeframe specified. Use 'year', 'quarter', or 'month'.")
-    df['year_month'] = df['year'].astype(str) + '-M' + df['month'].apply(lambda x: f'{x:02d}')
-    df = df.drop(columns=['year', 'month'])
-    return df
+    # Derive new columns instead of mutating the (read-only) input frame
+    return df.assign(period=period, year_month=year_str + '-M' + month_str).drop(columns=['year', 'month'])
 
 
 def format_date_by_timeframe(timeframe):
@@ -78,117 +108,45 @@ def format_date_by_timeframe(timeframe):
         raise ValueError("Unsupported timeframe specified.")
 
 
-@st.cache_data(ttl=600)
-def query_performance_overview_data(department_name=None, report_type='standard', start_str=None, end_str=None, timeframe="quarter", custom_adjustment=True, split_office_cost=False):
-    report_type = report_type.lower()
-    timeframe = timeframe.lower()
-    if 'q' in start_str.lower() or 'q' in end_str.lower():
-        timeframe = 'quarter'
-    elif 'm' in start_str.lower() or 'm' in end_str.lower():
-        timeframe = 'month'
-    else:
-        timeframe = 'year'
-    with session_scope() as session:
-        query = session.query(
-            FinancialData.year, 
-            FinancialData.month, 
-            FinancialData.location_id,
-            Location.short_name.label('location_name'),
-            Department.name.label('department_name'),
-            Class.name.label('class_name'),
-            FinancialData.account_id, 
-            FinancialData.amount,
-            FinancialAccount.account_name,
-            FinancialAccount.account_type
-        ).join(
-            FinancialAccount, FinancialData.account_id == FinancialAccount.account_id
-        ).join(
-            Location, FinancialData.location_id == Location.id
-        ).join(
-            Department, Location.department_id == Department.id
-        ).join(
-            Class, Location.class_id == Class.id
-        )
-        if report_type is not None:
-            ratio_column = REPORT_TYPE[report_type]
-            additional_column = getattr(FinancialAccount, ratio_column, None)
-            if additional_column is not None:
-                query = query.add_columns(additional_column)
-            else:
-                raise ValueError(f"Column '{ratio_column}' not found in FinancialAccount model.")
-        
-        if department_name is not None:
-            if not split_office_cost:
-                query = query.filter(Location.department.has(name=department_name))
-            else:
-                # don't filter the department here
-                pass
-        
-        if start_str is not None:
-            if timeframe == "quarter":
-                year, quarter = map(int, start_str.split('-Q'))
-                query = query.filter(
-                    (FinancialData.year > year) | 
-                    ((FinancialData.year == year) & 
-                    (((FinancialData.month - 1) // 3 + 1) >= quarter))
-                )
-            elif timeframe == "month":
-                year, month = map(int, start_str.split('-M'))
-                query = query.filter(
-                    (FinancialData.year > year) | 
-                    ((FinancialData.year == year) & 
-                    (FinancialData.month >= month))
-                )
-            else:  # Assuming start_str is just a year here
-                query = query.filter(FinancialData.year >= int(start_str))
-        
-        if end_str is not None:
-            if timeframe == "quarter":
-                year, quarter = map(int, end_str.split('-Q'))
-                query = query.filter(
-                    (FinancialData.year < year) | 
-                    ((FinancialData.year == year) & 
-                    (((FinancialData.month - 1) // 3 + 1) <= quarter))
-                )
-            elif timeframe == "month":
-                year, month = map(int, end_str.split('-M'))
-                query = query.filter(
-                    (FinancialData.year < year) | 
-                    ((FinancialData.year == year) & 
-                    (FinancialData.month <= month))
-                )
-            else:  # Assuming end_str is just a year here
-                query = query.filter(FinancialData.year <= int(end_str))
-        results = query.all()
-
-
-        results_data = [{
-            'year': year,
-            'month': month,
-            'location_id': location_id,
-            'location_name': location_name,
-            'department_name': department_name,
-            'class_name': class_name,
-            'account_id': account_id,
-            'amount': amount,
-            'account_name': account_name,
-            'account_type': account_type,
-            'rate': ratio_column,
-        } for year, month, location_id, location_name, department_name, class_name, account_id, amount, account_name, account_type, ratio_column in results]
-
-    df = pd.DataFrame(results_data)
+def finalize_financial_data(df, timeframe, custom_adjustment=True, split_office_cost=False):
+    """Period columns, adjustments and `amount_calc` for raw financial rows."""
     result_df = generate_period_str(df, timeframe)
     if custom_adjustment:
         result_df = financial_data_custom_adjustment(result_df)
     if split_office_cost:
         result_df = office_cost_adjustment(result_df)
     result_df = result_df[result_df['rate'] != 0]
-    result_df['amount_calc'] = result_df['amount'] * result_df['rate']
-    return result_df
+    return result_df.assign(amount_calc=result_df['amount'] * result_df['rate'])
+
+
+def query_performance_overview_data(department_name=None, report_type='standard', start_str=None, end_str=None, timeframe="quarter", custom_adjustment=True, split_office_cost=False):
+    return fetch_performance_overview_data(department_name, report_type, start_str, end_str, timeframe, custom_adjustment, split_office_cost, version=data_version('financial_data', start_str, end_str))
+
+
+@cache_data(max_entries=CACHE_MAX_ENTRIES)
+def fetch_performance_overview_data(department_name=None, report_type='standard', start_str=None, end_str=None, timeframe="quarter", custom_adjustment=True, split_office_cost=False, version=None):
+    report_type = report_type.lower()
+    # The range strings only bound the months; `timeframe` sets the period grain
+    timeframe = timeframe.lower()
+    ratio_column = REPORT_TYPE[report_type]
+    if ratio_column not in RATE_COLUMNS:
+        raise ValueError(f"Column '{ratio_column}' not found in FinancialAccount model.")
+
+    # Assembled from cached month slices; only months not loaded yet are queried
+    rows = financial_month_rows(start_str, end_str)
+    if department_name is not None and not split_office_cost:
+        rows = rows.loc[rows['location_id'].isin(location_ids(department_name))]
+    df = rows.drop(columns=RATE_COLUMNS).assign(rate=rows[ratio_column])
+    df = attach_location_attributes(df, FINANCIAL_LOCATION_ATTRIBUTES, required=FINANCIAL_LOCATION_ATTRIBUTES)
+    return finalize_financial_data(df[FINANCIAL_COLUMNS], timeframe, custom_adjustment, split_office_cost)
 
 
-@st.cache_data(ttl=600)
 def query_sales_data(department_name=None, start_str=None, end_str=None, timeframe="quarter"):
+    return fetch_sales_data(department_name, start_str, end_str, timeframe, version=data_version('sales_data', start_str, end_str))
+
+
+@cache_data(max_entries=CACHE_MAX_ENTRIES)
+def fetch_sales_data(department_name=None, start_str=None, end_str=None, timeframe="quarter", version=None):
     timeframe = timeframe.lower()
     if 'q' in start_str.lower() or 'q' in end_str.lower():
         timeframe = 'quarter'
@@ -200,24 +158,14 @@ def query_sales_data(department_name=None, start_str=None, end_str=None, timefra
     with session_scope() as session:
         query = session.query(
             SalesData.date, 
-            Location.short_name.label('location_name'),
+            SalesData.location_internal_id,
             SalesData.product_catagory,
             SalesData.unit,
             SalesData.amount,
             SalesData.quantity,
-            Manager.name.label('manager'),
-            Location.city,
-            Location.country,
-            Location.status,
-        ).join(
-            Location, SalesData.location_internal_id == Location.id
-        ).join(
-            Manager, Location.op_manager_id == Manager.id
-        ).join(
-            Department, Location.department_id == Department.id
         )
         if department_name is not None:
-            query = query.filter(Location.department.has(name=department_name))
+            query = query.filter(SalesData.location_internal_id.in_(location_ids(department_name)))
 
         # Assuming start_str and end_str are provided in the format "YYYY" for year, "YYYY-QX" for quarters,
         # and "YYYY-MM" for months, you can split these strings to extract the numerical values for year, quarter, and month.
@@ -239,7 +187,7 @@ def query_sales_data(department_name=None, start_str=None, end_str=None, timefra
             else:  # Assuming start_str is just a year here
                 query = query.filter(extract('year', SalesData.date) >= int(start_str))
         if department_name is not None:
-            query = query.filter(Location.department.has(name=department_name))
+            query = query.filter(SalesData.location_internal_id.in_(location_ids(department_name)))
             
         if end_str is not None:
             if timeframe == "quarter":
@@ -259,57 +207,21 @@ def query_sales_data(department_name=None, start_str=None, end_str=None, timefra
             else:  # Assuming end_str is just a year here
                 query = query.filter(extract('year', SalesData.date) <= int(end_str))
         results = query.all()
-        
-        results_data = [{
-            'date': date,
-            'location_name': location_name,
-            'product_category': product_category,
-            'unit': unit,
-            'amount': amount,
-            'quantity': quantity,
-            'manager': manager,
-            'city': city,
-            'country':country,
-            'status': status,
-        }
-        for date,
-            location_name,
-            product_category,
-            unit,
-            amount,
-            quantity,
-            manager,
-            city,
-            country,
-            status,
-        in results]
-
-    # After fetching results from the database...
-    results_data = []
-    for date, location_name, product_category, unit, amount, quantity, manager, city, country, status in results:
-        period = get_period(date, timeframe)
-        results_data.append({
-            'date': date,
-            'location_name': location_name,
-            'product_category': product_category,
-            'unit': unit,
-            'amount': amount,
-            'quantity': quantity,
-            'manager': manager,
-            'city': city,
-            'country': country,
-            'status': status,
-            'period': period,  # Add the dynamically generated period here
-        })
-
-    df = pd.DataFrame(results_data)    
-    return df
+
+    df = pd.DataFrame(results, columns=['date', 'location_id', 'product_category', 'unit', 'amount', 'quantity'])
+    df = attach_location_attributes(df, SALES_LOCATION_ATTRIBUTES, required=['manager', 'department_name'])
+    dates = pd.to_datetime(df['date'])
+    return df.assign(period=period_labels(dates.dt.year, dates.dt.month, timeframe))[SALES_COLUMNS]
 
 
 
 
-@st.cache_data(ttl=600)
 def query_factory_sales_data(department_name=None, start_str=None, end_str=None, timeframe="quarter"):
+    return fetch_factory_sales_data(department_name, start_str, end_str, timeframe, version=data_version('sales_data', start_str, end_str))
+
+
+@cache_data(max_entries=CACHE_MAX_ENTRIES)
+def fetch_factory_sales_data(department_name=None, start_str=None, end_str=None, timeframe="quarter", version=None):
     timeframe = timeframe.lower()
     if 'q' in start_str.lower() or 'q' in end_str.lower():
         timeframe = 'quarter'
@@ -321,24 +233,14 @@ def query_factory_sales_data(department_name=None, start_str=None, end_str=None,
     with session_scope() as session:
         query = session.query(
             SalesData.date, 
-            Location.short_name.label('location_name'),
+            SalesData.location_internal_id,
             SalesData.product_catagory,
             SalesData.unit,
             SalesData.amount,
             SalesData.quantity,
-            Manager.name.label('manager'),
-            Location.city,
-            Location.country,
-            Location.status,
-        ).join(
-            Location, SalesData.location_internal_id == Location.id
-        ).join(
-            Manager, Location.op_manager_id == Manager.id
-        ).join(
-            Department, Location.department_id == Department.id
         )
         if department_name is not None:
-            query = query.filter(Location.department.has(name=department_name))
+            query = query.filter(SalesData.location_internal_id.in_(location_ids(department_name)))
 
         # Assuming start_str and end_str are provided in the format "YYYY" for year, "YYYY-QX" for quarters,
         # and "YYYY-MM" for months, you can split these strings to extract the numerical values for year, quarter, and month.
@@ -360,7 +262,7 @@ def query_factory_sales_data(department_name=None, start_str=None, end_str=None,
             else:  # Assuming start_str is just a year here
                 query = query.filter(extract('year', SalesData.date) >= int(start_str))
         if department_name is not None:
-            query = query.filter(Location.department.has(name=department_name))
+            query = query.filter(SalesData.location_internal_id.in_(location_ids(department_name)))
             
         if end_str is not None:
             if timeframe == "quarter":
@@ -380,53 +282,68 @@ def query_factory_sales_data(department_name=None, start_str=None, end_str=None,
             else:  # Assuming end_str is just a year here
                 query = query.filter(extract('year', SalesData.date) <= int(end_str))
         results = query.all()
-        
 
-    return results
+    df = pd.DataFrame(results, columns=['date', 'location_id', 'product_category', 'unit', 'amount', 'quantity'])
+    df = attach_location_attributes(df, SALES_LOCATION_ATTRIBUTES, required=['manager', 'department_name'])
+    return list(df[FACTORY_SALES_COLUMNS].itertuples(index=False, name=None))
 
 
 
 
-@st.cache_data(ttl=600)
+@cache_data(max_entries=CACHE_MAX_ENTRIES)
 def financial_data_custom_adjustment(df):
-    df = df.copy()
     return df
 
 
-@st.cache_data(ttl=600)
+@cache_data(max_entries=CACHE_MAX_ENTRIES)
 def office_cost_adjustment(df):
-    df = df.copy()
     return df
 
 
-@st.cache_data(ttl=600)
-def prepare_performance_overview_data(df, denominator="sales"):
-    df = df.copy()
-    df_grouped = df.groupby(['period'])['amount_calc'].sum().reset_index().sort_values(by=['period'], kind='mergesort', ascending=[True])
-    df_grouped_sales = df.loc[df['account_type'].isin(["sales", "other income"])].groupby(['period'])['amount_calc'].sum().reset_index().sort_values(by=['period'], kind='mergesort', ascending=[True])
-    df_grouped_material = df.loc[df['account_type']=="material"].groupby(['period'])['amount_calc'].sum().reset_index().sort_values(by=['period'], kind='mergesort', ascending=[True])
-    df_grouped_staff = df.loc[df['account_type']=="staff"].groupby(['period'])['amount_calc'].sum().reset_index().sort_values(by=['period'], kind='mergesort', ascending=[True])
-    df_grouped_other = df.loc[df['account_type']=="other cost"].groupby(['period'])['amount_calc'].sum().reset_index().sort_values(by=['period'], kind='mergesort', ascending=[True])
-    df_grouped = pd.merge(df_grouped, df_grouped_sales, on="period", validate="1:1",suffixes=(None,'_sales'),how='left')
-    df_grouped = pd.merge(df_grouped, df_grouped_material, on="period", validate="1:1",how='left',suffixes=(None,'_material'))
-    df_grouped = pd.merge(df_grouped, df_grouped_staff, on="period", validate="1:1",how='left',suffixes=(None,'_staff'))
-    df_grouped = pd.merge(df_grouped, df_grouped_other, on="period", validate="1:1",how='left',suffixes=(None,'_other'))
+# Suffix of the amount column each account type is summed into.
+ACCOUNT_TYPE_COLUMNS = {
+    'sales': 'sales',
+    'other income': 'sales',
+    'material': 'material',
+    'staff': 'staff',
+    'other cost': 'other',
+}
+
+
+def aggregate_performance(df, keys, denominator="sales"):
+    """Profit, sales and cost totals plus cost rates per `keys` in a single pass over the frame."""
+    totals = df.groupby(keys)['amount_calc'].sum().rename('amount_calc')
+    account_group = df['account_type'].map(ACCOUNT_TYPE_COLUMNS).rename('account_group')
+    by_type = df.groupby(keys + [account_group])['amount_calc'].sum().unstack('account_group')
+    by_type = by_type.reindex(columns=['sales', 'material', 'staff', 'other']).add_prefix('amount_calc_')
+    df_grouped = totals.to_frame().join(by_type, how='left').sort_index(kind='mergesort').reset_index()
     if denominator == "sales":
         df_grouped['material_rate'] = (df_grouped['amount_calc_material']/df_grouped['amount_calc_sales']).abs()
         df_grouped['staff_rate']= (df_grouped['amount_calc_staff']/df_grouped['amount_calc_sales']).abs()
         df_grouped['other_rate']= (df_grouped['amount_calc_other']/df_grouped['amount_calc_sales']).abs()
     elif denominator == "costs":
-        df_grouped['material_rate'] = (df_grouped['amount_calc_material']/(df_grouped['amount_calc_material']+df_grouped['amount_calc_staff']+df_grouped['amount_calc_other'])).abs()
-        df_grouped['staff_rate']= (df_grouped['amount_calc_staff']/(df_grouped['amount_calc_material']+df_grouped['amount_calc_staff']+df_grouped['amount_calc_other'])).abs()
-        df_grouped['other_rate']= (df_grouped['amount_calc_other']/(df_grouped['amount_calc_material']+df_grouped['amount_calc_staff']+df_grouped['amount_calc_other'])).abs()
+        total_costs = df_grouped['amount_calc_material']+df_grouped['amount_calc_staff']+df_grouped['amount_calc_other']
+        df_grouped['material_rate'] = (df_grouped['amount_calc_material']/total_costs).abs()
+        df_grouped['staff_rate']= (df_grouped['amount_calc_staff']/total_costs).abs()
+        df_grouped['other_rate']= (df_grouped['amount_calc_other']/total_costs).abs()
     df_grouped['profit_rate']= (df_grouped['amount_calc']/df_grouped['amount_calc_sales'])
     df_grouped.fillna(0,inplace=True)
     return df_grouped
 
 
-@st.cache_data(ttl=600)
+@cache_data(max_entries=CACHE_MAX_ENTRIES)
+def prepare_performance_overview_data(df, denominator="sales"):
+    return aggregate_performance(df, ['period'], denominator=denominator)
+
+
+@cache_data(max_entries=CACHE_MAX_ENTRIES)
+def prepare_performance_by_department_data(df, denominator="sales", group_by="period"):
+    """Performance series of every department at once, one row per (department_name, group_by)."""
+    return aggregate_performance(df, ['department_name', group_by], denominator=denominator)
+
+
+@cache_data(max_entries=CACHE_MAX_ENTRIES)
 def prepare_turnover_structure_data(df, department_name=None, pivot_by='department_name'):
-    df = df.copy()
     if department_name is None and pivot_by == 'department_name':
         df_grouped_sales = df.loc[df['account_type'].isin(["sales", "other income"])]\
             .groupby(['period', pivot_by])['amount_calc']\
@@ -435,7 +352,10 @@ def prepare_turnover_structure_data(df, department_name=None, pivot_by='departme
             .sort_values(by=['period','amount_calc'], kind='mergesort', ascending=[True, False])
         pivot_df = df_grouped_sales.pivot_table(index='period', columns=pivot_by, values='amount_calc', aggfunc='sum')
     else:
-        df_grouped_sales = df.loc[df['account_type'].isin(["sales", "other income"])]\
+        # sales_data rows are all turnover; financial rows are limited to sales accounts
+        if 'account_type' in df.columns:
+            df = df.loc[df['account_type'].isin(["sales", "other income"])]
+        df_grouped_sales = df\
             .groupby(['period', pivot_by])['amount'].sum()\
             .reset_index()\
             .sort_values(by=['period','amount'], kind='mergesort', ascending=[True, False])
@@ -446,15 +366,13 @@ def prepare_turnover_structure_data(df, department_name=None, pivot_by='departme
     return pivot_df
 
 
-@st.cache_data(ttl=600)
+@cache_data(max_entries=CACHE_MAX_ENTRIES)
 def prepare_sales_data(df):
-    df = df.copy()
+    return df
 
 
-@st.cache_data(ttl=600)
+@cache_data(max_entries=CACHE_MAX_ENTRIES)
 def prepare_avg_sales_data(df):
-    df = df.copy()
-
     # Filter DataFrame for sushi sales in kilograms
     sushi_sales_kg = df[(df['product_category'] == 'Sushi') & (df['unit'] == 'KG')]
     
@@ -479,19 +397,9 @@ def prepare_avg_sales_data(df):
 
     return result
 
-@st.cache_data(ttl=600)
-def prepare_cost_structure_breakdown(df, department_name=None):
-    df = df.copy()
-    if department_name is not None:
-        df = df.loc[df['department_name']==department_name]
-    result_df = prepare_performance_overview_data(df, denominator="sales")
-    return result_df
-
-
-@st.cache_data(ttl=600)
+@cache_data(max_entries=CACHE_MAX_ENTRIES)
 def prepare_cost_structure_cumulative(df, department_name=None):
     results = {}
-    df = df.copy()
     results['departments'] = sorted(df['department_name'].unique().tolist())
     if department_name is None:
         df_costs = df.loc[~df['account_type'].isin(["sales", "other income"])]
@@ -527,10 +435,9 @@ def prepare_cost_structure_cumulative(df, department_name=None):
 
 
 
-@st.cache_data(ttl=600)
+@cache_data(max_entries=CACHE_MAX_ENTRIES)
 def prepare_cost_structure_cumulative_icicle(df):
-    df = df.copy()
-    df['amount_calc'] = df['amount']
+    df = df.assign(amount_calc=df['amount'])
     df_costs = df.loc[~df['account_type'].isin(["sales", "other income"])]
     df_costs = df_costs.loc[df_costs['amount_calc']>=0]
     # Function to extract initials
@@ -563,9 +470,9 @@ def prepare_cost_structure_cumulative_icicle(df):
             df_tree = pd.DataFrame(columns=['id', 'parent', 'value', 'color'])
             dfg = df.groupby(levels[i:]).sum()
             dfg = dfg.reset_index()
-            df_tree['id'] = dfg[level].copy()
+            df_tree['id'] = dfg[level]
             if i < len(levels) - 1:
-                df_tree['parent'] = dfg[levels[i+1]].copy()
+                df_tree['parent'] = dfg[levels[i+1]]
             else:
                 df_tree['parent'] = 'total'
             df_tree['value'] = dfg[value_column]
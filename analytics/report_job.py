@@ -0,0 +1,153 @@
+"""Render the management pack without the app.
+
+For a period range, writes the performance, turnover and cost figures of the
+company and every department as Plotly JSON, and the frames behind them as
+Parquet, one directory per department plus a manifest:
+    python -m analytics.report_job 2025-Q1 2025-Q4 --out reports
+Departments are rendered in parallel worker processes, one per core by default.
+Caching goes through `utils.cache`, so the analytics functions run unchanged
+outside Streamlit.
+"""
+import os
+import json
+import logging
+import argparse
+import multiprocessing
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+
+from analytics.dimensions import location_dimension
+from analytics.query import REPORT_TYPE, query_performance_overview_data
+from analytics.pipeline import prepare_overview_frames
+from analytics.kpi import query_kpi_data, prepare_kpi_data
+from visuals.graphs import (
+    make_performance_overview_graph,
+    make_turnover_structure_graph,
+    make_cost_structure_graph,
+    make_cost_structure_breakdown_by_department_graph,
+    make_cost_structure_cumulative_by_department_graph,
+    make_cost_structure_cumulative_icicle_graph,
+)
+from utils.export import write_parquet
+
+logger = logging.getLogger(__name__)
+
+REPORT_DIR = "reports"
+# Directory of the company-wide pack
+COMPANY_SLUG = "company"
+
+
+def report_departments():
+    """None (the company) followed by every department with locations."""
+    return [None] + sorted(location_dimension()['department_name'].dropna().unique().tolist())
+
+
+def department_slug(department_name):
+    return COMPANY_SLUG if department_name is None else department_name.lower().replace(" ", "_")
+
+
+def write_figure(fig, path):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(fig.to_json())
+
+
+def render_department(department_name, start_str, end_str, timeframe="quarter", report_type="standard", out_dir=REPORT_DIR, custom_adjustment=True, split_office_cost=False):
+    """Write one department's figures and tables to `out_dir`/<slug>; returns its manifest entry."""
+    slug = department_slug(department_name)
+    directory = os.path.join(out_dir, slug)
+    os.makedirs(directory, exist_ok=True)
+    df = query_performance_overview_data(department_name, report_type, start_str, end_str, timeframe, custom_adjustment, split_office_cost)
+    entry = {'department_name': department_name, 'directory': slug, 'rows': len(df), 'figures': [], 'tables': []}
+    if df.empty:
+        return entry
+
+    # the company pack breaks turnover down by department, department packs by location
+    frames = prepare_overview_frames(
+        df,
+        department_name,
+        pivot_by='department_name' if department_name is None else 'location_name',
+        report_type=report_type,
+        custom_adjustment=custom_adjustment,
+        split_office_cost=split_office_cost,
+    )
+    kpi_df = prepare_kpi_data(query_kpi_data(department_name, report_type, start_str, end_str, custom_adjustment, split_office_cost), timeframe, start_str)
+    figures = {
+        'performance': make_performance_overview_graph(frames['po_df'], forecast_df=frames['forecast_df']),
+        'turnover': make_turnover_structure_graph(frames['ts_df'], department_name=department_name),
+        'cost_to_sales': make_cost_structure_graph(frames['po_df'], denominator="sales"),
+        'cost_to_total_cost': make_cost_structure_graph(frames['cs_costs_df'], denominator="costs"),
+        'cost_details': make_cost_structure_cumulative_icicle_graph(frames['icicle_df']),
+    }
+    if department_name is None:
+        # department comparisons, as on the Overview page
+        figures['cost_by_department'] = make_cost_structure_breakdown_by_department_graph(frames['bd_df'])
+        figures['cumulative_cost'] = make_cost_structure_cumulative_by_department_graph(frames['cumulative'])
+    tables = {
+        'performance': frames['po_df'],
+        'cost_structure': frames['cs_costs_df'],
+        'turnover': frames['ts_df'],
+        'performance_by_department': frames['bd_df'],
+        'cost_details': frames['icicle_df'],
+        'kpi': kpi_df,
+    }
+    for name, fig in figures.items():
+        write_figure(fig, os.path.join(directory, f"{name}.json"))
+        entry['figures'].append(f"{name}.json")
+    for name, table in tables.items():
+        # Parquet needs string column names; the turnover pivot is keyed by location or department
+        write_parquet(table.rename(columns=str), os.path.join(directory, f"{name}.parquet"))
+        entry['tables'].append(f"{name}.parquet")
+    return entry
+
+
+def render_reports(start_str, end_str, timeframe="quarter", report_type="standard", out_dir=REPORT_DIR, custom_adjustment=True, split_office_cost=False, workers=None):
+    """Render every department in parallel and write `manifest.json`; returns the manifest."""
+    started = datetime.now()
+    os.makedirs(out_dir, exist_ok=True)
+    departments = report_departments()
+    workers = min(workers or os.cpu_count() or 1, len(departments))
+    options = dict(timeframe=timeframe, report_type=report_type, out_dir=out_dir, custom_adjustment=custom_adjustment, split_office_cost=split_office_cost)
+    # spawned workers open their own database connections
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+        futures = [executor.submit(render_department, department_name, start_str, end_str, **options) for department_name in departments]
+        entries = [future.result() for future in futures]
+
+    manifest = {
+        'start': start_str,
+        'end': end_str,
+        'timeframe': timeframe,
+        'report_type': report_type,
+        'custom_adjustment': custom_adjustment,
+        'split_office_cost': split_office_cost,
+        'generated_at': started.isoformat(timespec='seconds'),
+        'departments': entries,
+    }
+    with open(os.path.join(out_dir, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    logger.info(f"Rendered {len(entries)} reports to {out_dir} with {workers} workers in {(datetime.now() - started).total_seconds():.1f}s")
+    return manifest
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Render every department's figures and tables for a period range.")
+    parser.add_argument("start", help='First period, e.g. "2025-Q1", "2025-M01" or "2025"')
+    parser.add_argument("end", help="Last period, in the same format as start")
+    parser.add_argument("--timeframe", choices=["month", "quarter", "year"], default="quarter")
+    parser.add_argument("--report-type", choices=sorted(REPORT_TYPE), default="standard")
+    parser.add_argument("--out", default=REPORT_DIR, help="Output directory")
+    parser.add_argument("--no-custom-adjustment", dest="custom_adjustment", action="store_false")
+    parser.add_argument("--split-office-cost", action="store_true")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: one per core)")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    manifest = render_reports(
+        args.start,
+        args.end,
+        timeframe=args.timeframe,
+        report_type=args.report_type,
+        out_dir=args.out,
+        custom_adjustment=args.custom_adjustment,
+        split_office_cost=args.split_office_cost,
+        workers=args.workers,
+    )
+    print(os.path.join(args.out, "manifest.json"))
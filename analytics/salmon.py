@@ -0,0 +1,129 @@
+"""Salmon procurement analytics for the Food Plant.
+
+Orders (`data.salmon_orders`) are aggregated in the database, filtered on the
+indexed (date, customer) path. The weighed quantity comes from
+`data.salmon_order_weight` through a per-order subquery. Order dates are Excel
+serial day numbers.
+"""
+import pandas as pd
+from sqlalchemy import func, distinct, true
+
+from database.session import session_scope
+from database.models import engine, SalmonOrders, SalmonOrderWeight
+from analytics.data_version import data_version
+from analytics.query import CACHE_MAX_ENTRIES
+from utils.cache import cache_data, cache_resource
+
+EXCEL_EPOCH = pd.Timestamp('1899-12-30')
+
+# Monday of the order's week: Excel serial 2 (1900-01-01) is a Monday
+ORDER_WEEK = func.floor((SalmonOrders.date - 2) / 7) * 7 + 2
+
+SALMON_DIMENSIONS = {
+    'customer': SalmonOrders.customer,
+    'fish_size': SalmonOrders.fish_size,
+    'week': ORDER_WEEK,
+    'batch': SalmonOrderWeight.batch_number,
+}
+
+
+def to_excel_serial(date):
+    return (pd.Timestamp(date) - EXCEL_EPOCH).days
+
+
+def from_excel_serial(serials):
+    return EXCEL_EPOCH + pd.to_timedelta(pd.to_numeric(serials).astype(float), unit='D')
+
+
+@cache_resource
+def ensure_salmon_index():
+    """Create the (date, customer) index on databases created before it was modelled."""
+    for index in SalmonOrders.__table__.indexes:
+        index.create(engine, checkfirst=True)
+
+
+def salmon_version():
+    return data_version('salmon_orders') + data_version('salmon_order_weight')
+
+
+@cache_data(max_entries=CACHE_MAX_ENTRIES)
+def fetch_salmon_customers(version=None):
+    with session_scope() as session:
+        return [customer for customer, in session.query(distinct(SalmonOrders.customer)).order_by(SalmonOrders.customer).all()]
+
+
+def query_salmon_customers():
+    return fetch_salmon_customers(version=salmon_version())
+
+
+@cache_data(max_entries=CACHE_MAX_ENTRIES)
+def fetch_salmon_summary(group_by, start_date, end_date, customers=None, version=None):
+    # Serials carry the time of day as a fraction, so the end date runs to the next midnight
+    period_filter = (SalmonOrders.date >= to_excel_serial(start_date)) & (SalmonOrders.date < to_excel_serial(end_date) + 1)
+    customer_filter = SalmonOrders.customer.in_(customers) if customers else true()
+    with session_scope() as session:
+        if 'batch' in group_by:
+            # An order can be packed in several batches: its ordered quantity and value
+            # are split over them in proportion to the weight packed in each batch, or
+            # evenly when nothing was weighed. Orders not packed yet have no batch.
+            share = func.coalesce(
+                SalmonOrderWeight.quantity / func.nullif(func.sum(SalmonOrderWeight.quantity).over(partition_by=SalmonOrders.id), 0),
+                1.0 / func.count().over(partition_by=SalmonOrders.id),
+            )
+            packed = session.query(
+                *[expression.label(dimension) for dimension, expression in SALMON_DIMENSIONS.items()],
+                SalmonOrders.id.label('order_id'),
+                (SalmonOrders.quantity * share).label('ordered'),
+                (SalmonOrders.price * SalmonOrders.quantity * share).label('value'),
+                SalmonOrderWeight.quantity.label('weighed'),
+            ).select_from(SalmonOrders).outerjoin(
+                SalmonOrderWeight, SalmonOrderWeight.order_id == SalmonOrders.id
+            ).filter(period_filter, customer_filter).subquery()
+            group_columns = [packed.c[dimension] for dimension in group_by]
+            query = session.query(
+                *group_columns,
+                func.count(distinct(packed.c.order_id)),
+                func.sum(packed.c.ordered),
+                func.sum(packed.c.value),
+                func.sum(packed.c.weighed),
+            )
+        else:
+            # Weighed quantity per order
+            order_weight = session.query(
+                SalmonOrderWeight.order_id,
+                func.sum(SalmonOrderWeight.quantity).label('weighed'),
+            ).group_by(SalmonOrderWeight.order_id).subquery()
+            group_columns = [SALMON_DIMENSIONS[dimension] for dimension in group_by]
+            query = session.query(
+                *group_columns,
+                func.count(SalmonOrders.id),
+                func.sum(SalmonOrders.quantity),
+                func.sum(SalmonOrders.price * SalmonOrders.quantity),
+                func.sum(order_weight.c.weighed),
+            ).outerjoin(
+                order_weight, order_weight.c.order_id == SalmonOrders.id
+            ).filter(period_filter, customer_filter)
+        results = query.group_by(*group_columns).all()
+
+    df = pd.DataFrame(results, columns=list(group_by) + ['orders', 'ordered_quantity', 'order_value', 'weighed_quantity'])
+    return finalize_salmon_summary(df, group_by)
+
+
+def finalize_salmon_summary(df, group_by):
+    """Float measures, week dates, and average price and yield computed column-wise."""
+    measures = ['ordered_quantity', 'order_value', 'weighed_quantity']
+    df = df.assign(**{col: pd.to_numeric(df[col]).astype(float) for col in measures})
+    if 'week' in df.columns:
+        df = df.assign(week=from_excel_serial(df['week']).dt.date)
+    ordered = df['ordered_quantity'].where(df['ordered_quantity'] != 0)
+    df = df.assign(
+        avg_price=df['order_value'] / ordered,
+        yield_rate=df['weighed_quantity'].fillna(0) / ordered,
+    )
+    return df.sort_values(list(group_by), kind='mergesort', ignore_index=True)
+
+
+def query_salmon_summary(group_by, start_date, end_date, customers=None):
+    """Orders, ordered and weighed quantity, value, average price and yield per
+    combination of `group_by` dimensions (customer, fish_size, week, batch)."""
+    return fetch_salmon_summary(tuple(group_by), start_date, end_date, tuple(customers or ()), version=salmon_version())
@@ -0,0 +1,115 @@
+"""Location league table.
+
+One `aggregate_performance` pass over (location, period) gives every location's
+sales, profit and cost totals per period. Ranks and percentiles are taken over
+the selected range, deltas compare the last period with the one before, and
+the sales series per period feeds a sparkline column.
+"""
+import numpy as np
+import pandas as pd
+
+from analytics.query import CACHE_MAX_ENTRIES, aggregate_performance
+from utils.cache import cache_data
+
+SCORE_MEASURES = ['amount_calc', 'amount_calc_sales', 'amount_calc_material', 'amount_calc_staff', 'amount_calc_other']
+COST_RATES = ['material_rate', 'staff_rate', 'other_rate']
+
+
+def performance_rates(totals):
+    """Profit and cost rates of `totals` (columns of SCORE_MEASURES); NaN without sales."""
+    sales = totals['amount_calc_sales'].where(totals['amount_calc_sales'] != 0)
+    return pd.DataFrame({
+        'profit_rate': totals['amount_calc'] / sales,
+        'material_rate': (totals['amount_calc_material'] / sales).abs(),
+        'staff_rate': (totals['amount_calc_staff'] / sales).abs(),
+        'other_rate': (totals['amount_calc_other'] / sales).abs(),
+    }, index=totals.index)
+
+
+@cache_data(max_entries=CACHE_MAX_ENTRIES)
+def prepare_location_scorecard(df):
+    """One row per location with range totals, rates, ranks, percentiles, last-period deltas and sales trend."""
+    if df.empty:
+        return pd.DataFrame()
+    by_period = aggregate_performance(df, ['location_id', 'period'])
+    by_period = by_period.assign(**{column: by_period[column].astype(float) for column in SCORE_MEASURES})
+    # location x period, dense over the periods of the range
+    cube = by_period.pivot_table(index='location_id', columns='period', values=SCORE_MEASURES, aggfunc='sum', fill_value=0)
+    periods = sorted(by_period['period'].unique())
+
+    totals = pd.DataFrame({measure: cube[measure].sum(axis=1) for measure in SCORE_MEASURES})
+    rates = performance_rates(totals)
+    scorecard = pd.DataFrame({
+        'sales': totals['amount_calc_sales'],
+        'profit': totals['amount_calc'],
+    }).join(rates)
+
+    scorecard['sales_rank'] = scorecard['sales'].rank(ascending=False, method='min')
+    scorecard['profit_rate_rank'] = scorecard['profit_rate'].rank(ascending=False, method='min')
+    scorecard['sales_percentile'] = scorecard['sales'].rank(pct=True)
+    scorecard['profit_rate_percentile'] = scorecard['profit_rate'].rank(pct=True)
+    for rate in COST_RATES:
+        # lower cost ratios rank first
+        scorecard[f'{rate}_rank'] = scorecard[rate].rank(method='min')
+
+    if len(periods) > 1:
+        last, previous = periods[-1], periods[-2]
+        last_sales, previous_sales = cube['amount_calc_sales'][last], cube['amount_calc_sales'][previous]
+        last_rates = performance_rates(pd.DataFrame({measure: cube[measure][last] for measure in SCORE_MEASURES}))
+        previous_rates = performance_rates(pd.DataFrame({measure: cube[measure][previous] for measure in SCORE_MEASURES}))
+        scorecard['sales_change'] = last_sales / previous_sales.where(previous_sales != 0) - 1
+        scorecard['profit_rate_change'] = last_rates['profit_rate'] - previous_rates['profit_rate']
+    else:
+        scorecard['sales_change'] = np.nan
+        scorecard['profit_rate_change'] = np.nan
+    scorecard['sales_trend'] = cube['amount_calc_sales'][periods].to_numpy().tolist()
+
+    names = df.drop_duplicates('location_id').set_index('location_id')[['location_name', 'department_name']]
+    scorecard = names.join(scorecard, how='right')
+    return scorecard.sort_values(['sales_rank', 'location_name'], kind='mergesort').reset_index()
+
+
+def scorecard_column_config():
+    """Column labels and formats of the scorecard; built on each draw, as only the app loads Streamlit."""
+    import streamlit as st
+
+    return {
+        'location_id': None,
+        'location_name': st.column_config.TextColumn("Location"),
+        'department_name': st.column_config.TextColumn("Department"),
+        'sales': st.column_config.NumberColumn("Sales", format="%.0f"),
+        'profit': st.column_config.NumberColumn("Profit", format="%.0f"),
+        'profit_rate': st.column_config.NumberColumn("Profit rate", format="%.1f%%"),
+        'material_rate': st.column_config.NumberColumn("Material rate", format="%.1f%%"),
+        'staff_rate': st.column_config.NumberColumn("Staff rate", format="%.1f%%"),
+        'other_rate': st.column_config.NumberColumn("Other cost rate", format="%.1f%%"),
+        'sales_rank': st.column_config.NumberColumn("Sales rank", format="%d"),
+        'profit_rate_rank': st.column_config.NumberColumn("Profit rate rank", format="%d"),
+        'sales_percentile': st.column_config.ProgressColumn("Sales percentile", format="%.0f%%", min_value=0, max_value=100),
+        'profit_rate_percentile': st.column_config.ProgressColumn("Profit rate percentile", format="%.0f%%", min_value=0, max_value=100),
+        'material_rate_rank': st.column_config.NumberColumn("Material rate rank", format="%d"),
+        'staff_rate_rank': st.column_config.NumberColumn("Staff rate rank", format="%d"),
+        'other_rate_rank': st.column_config.NumberColumn("Other cost rate rank", format="%d"),
+        'sales_change': st.column_config.NumberColumn("Sales vs. previous period", format="%.1f%%"),
+        'profit_rate_change': st.column_config.NumberColumn("Profit rate vs. previous period (pp)", format="%.1f"),
+        'sales_trend': st.column_config.LineChartColumn("Sales trend"),
+    }
+
+
+PERCENT_COLUMNS = ['profit_rate', 'sales_percentile', 'profit_rate_percentile', 'sales_change', 'profit_rate_change'] + COST_RATES
+
+
+def display_location_scorecard(df, department_name=None):
+    import streamlit as st
+
+    st.subheader(f'Location Scorecard{" - " + department_name if department_name else ""}')
+    scorecard = prepare_location_scorecard(df)
+    if scorecard.empty:
+        st.warning("No data available for the selected period.")
+        return
+    st.dataframe(
+        scorecard.assign(**{column: scorecard[column] * 100 for column in PERCENT_COLUMNS}),
+        column_config=scorecard_column_config(),
+        use_container_width=True,
+        hide_index=True,
+    )
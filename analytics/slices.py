@@ -0,0 +1,121 @@
+"""Month slices of `data.financial_data`.
+
+Range queries are assembled from one cached frame per (year, month) holding the
+rows of every location with all rate columns, so a department or report type
+filter is applied in memory and never splits the cache. A month is re-read when
+its data version changes; the months a range is missing are fetched together in
+one query, so moving the End selector forward costs one period's rows. Fetches
+run outside the store's lock, and a month already being fetched by another
+session is waited for instead of fetched again.
+"""
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+from sqlalchemy import and_, or_
+
+from database.session import session_scope
+from database.models import FinancialData, FinancialAccount
+from analytics.data_version import month_bounds, month_versions
+from utils.cache import cache_resource
+
+# Enough for ten years of months; the least recently used month is dropped beyond it
+SLICE_MAX_MONTHS = 120
+
+RATE_COLUMNS = ['std_rate', 'adj_rate', 'adj_coef_rate']
+SLICE_COLUMNS = ['year', 'month', 'location_id', 'account_id', 'amount', 'account_name', 'account_type'] + RATE_COLUMNS
+
+
+@cache_resource
+def financial_slice_store():
+    """{(year, month): (version, frame)} shared by every session of the server process, and
+    {(year, month): Event} of the months being fetched."""
+    return {'lock': threading.Lock(), 'slices': OrderedDict(), 'loading': {}}
+
+
+def months_between(start_str, end_str):
+    """Every (year, month) from the first month of `start_str` to the last month of `end_str`."""
+    (first_year, first_month), (last_year, last_month) = month_bounds(start_str), month_bounds(end_str, end=True)
+    return [(index // 12, index % 12 + 1) for index in range(first_year * 12 + first_month - 1, last_year * 12 + last_month)]
+
+
+def fetch_financial_months(months):
+    """Rows of `months` in one query, split into a frame per month."""
+    by_year = {}
+    for year, month in months:
+        by_year.setdefault(year, []).append(month)
+    with session_scope() as session:
+        results = session.query(
+            FinancialData.year,
+            FinancialData.month,
+            FinancialData.location_id,
+            FinancialData.account_id,
+            FinancialData.amount,
+            FinancialAccount.account_name,
+            FinancialAccount.account_type,
+            *[getattr(FinancialAccount, column) for column in RATE_COLUMNS],
+        ).join(
+            FinancialAccount, FinancialData.account_id == FinancialAccount.account_id
+        ).filter(
+            or_(*[and_(FinancialData.year == year, FinancialData.month.in_(year_months)) for year, year_months in by_year.items()])
+        ).all()
+    df = pd.DataFrame(results, columns=SLICE_COLUMNS)
+    groups = dict(iter(df.groupby(['year', 'month'], sort=False)))
+    return {month: groups.get(month, df.iloc[:0]).reset_index(drop=True) for month in months}
+
+
+def install_slices(store, frames, versions):
+    """Store fetched frames; the caller holds the store's lock."""
+    for month, frame in frames.items():
+        store['slices'][month] = (versions[month], frame)
+
+
+def financial_month_rows(start_str, end_str):
+    """Rows from `start_str` to `end_str`, fetching only the months not cached at their current version."""
+    months = months_between(start_str, end_str)
+    versions = month_versions('financial_data', months)
+    store = financial_slice_store()
+    frames = {}
+
+    def cached(month):
+        entry = store['slices'].get(month)
+        if entry is not None and entry[0] == versions[month]:
+            frames[month] = entry[1]
+        return month in frames
+
+    with store['lock']:
+        pending = [month for month in months if not cached(month)]
+        waits = {store['loading'][month] for month in pending if month in store['loading']}
+        owned = [month for month in pending if month not in store['loading']]
+        done = threading.Event()
+        for month in owned:
+            store['loading'][month] = done
+    try:
+        if owned:
+            frames.update(fetch_financial_months(owned))
+    finally:
+        with store['lock']:
+            install_slices(store, {month: frames[month] for month in owned if month in frames}, versions)
+            for month in owned:
+                store['loading'].pop(month, None)
+        done.set()
+
+    for event in waits:
+        event.wait()
+    with store['lock']:
+        rest = [month for month in pending if month not in frames and not cached(month)]
+    if rest:
+        # the other fetch failed, or loaded another version
+        fetched = fetch_financial_months(rest)
+        frames.update(fetched)
+        with store['lock']:
+            install_slices(store, fetched, versions)
+
+    with store['lock']:
+        slices = store['slices']
+        for month in months:
+            if month in slices:
+                slices.move_to_end(month)
+        while len(slices) > max(SLICE_MAX_MONTHS, len(months)):
+            slices.popitem(last=False)
+    return pd.concat([frames[month] for month in months], ignore_index=True) if months else pd.DataFrame(columns=SLICE_COLUMNS)
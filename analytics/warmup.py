@@ -0,0 +1,160 @@
+"""Background warming of the default page views.
+
+Every page opens on the last five quarters of the Standard report with custom
+adjustment on, so that is what most first clicks on Search ask for. A daemon
+thread makes the cached calls those Searches make, with the same arguments so
+they land on the same cache keys, once per server process and again whenever
+the data behind them changes (e.g. after `python -m database.ingest`), so the
+first Search is served from the cache.
+"""
+import time
+import logging
+import threading
+
+import streamlit as st
+from streamlit import runtime
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+
+from analytics.data_version import data_version
+from analytics.kpi import query_kpi_data, prepare_kpi_data
+from analytics.scorecard import prepare_location_scorecard
+from analytics.pipeline import prepare_overview_frames
+from analytics.query import (
+    query_unique_timeframes,
+    query_performance_overview_data,
+    query_sales_data,
+    prepare_avg_sales_data,
+    prepare_performance_overview_data,
+)
+from utils.concurrency import detached_script_run_ctx
+
+logger = logging.getLogger(__name__)
+
+WARM_POLL_SECONDS = 30
+
+# Sidebar defaults shared by the pages
+DEFAULT_TIMEFRAME = "Quarter"
+DEFAULT_REPORT_TYPE = "Standard"
+DEFAULT_PERIODS = 5
+
+# Set after every completed warm pass
+WARMED = threading.Event()
+
+# Department of each page and what its Search shows besides the financial rows and KPIs:
+# the Overview frames, `prepare_performance_overview_data` denominators (None when the
+# page passes none), sales rows, the location scorecard and KPIs by department
+DEFAULT_VIEWS = {
+    None: {'overview_frames': True, 'kpis_by_department': True},
+    'Food Kiosk Sushibar': {'denominators': ("sales", "costs"), 'sales': True, 'scorecard': True},
+    'Restaurant': {'denominators': ("sales", "costs"), 'scorecard': True},
+    'Food Plant': {'denominators': ("sales", "costs")},
+    'Head Office': {'denominators': (None,)},
+}
+
+
+def default_range(timeframe=DEFAULT_TIMEFRAME, periods=DEFAULT_PERIODS):
+    period_str_list = query_unique_timeframes(timeframe)
+    if not period_str_list:
+        return None, None
+    return period_str_list[max(len(period_str_list) - periods, 0)], period_str_list[-1]
+
+
+def warm_view(department_name, start_str, end_str, overview_frames=False, denominators=(), sales=False, scorecard=False, kpis_by_department=False):
+    """Make the cached calls the page of `department_name` makes on its default Search."""
+    df = query_performance_overview_data(
+        department_name=department_name,
+        report_type=DEFAULT_REPORT_TYPE,
+        start_str=start_str,
+        end_str=end_str,
+        timeframe=DEFAULT_TIMEFRAME,
+        custom_adjustment=True,
+        split_office_cost=False,
+    )
+    if overview_frames:
+        prepare_overview_frames(
+            df,
+            department_name,
+            report_type=DEFAULT_REPORT_TYPE,
+            custom_adjustment=True,
+            split_office_cost=False,
+        )
+    for denominator in denominators:
+        if denominator is None:
+            prepare_performance_overview_data(df)
+        else:
+            prepare_performance_overview_data(df, denominator=denominator)
+    if sales:
+        ss_df = query_sales_data(
+            department_name=department_name,
+            start_str=start_str,
+            end_str=end_str,
+            timeframe=DEFAULT_TIMEFRAME,
+        )
+        prepare_avg_sales_data(ss_df)
+    # As `display_kpis` and `display_location_scorecard` call them
+    kpi_df = query_kpi_data(department_name, DEFAULT_REPORT_TYPE, start_str, end_str, True, False)
+    prepare_kpi_data(kpi_df, DEFAULT_TIMEFRAME, start_str)
+    if kpis_by_department:
+        prepare_kpi_data(kpi_df, DEFAULT_TIMEFRAME, start_str, keys=('department_name',))
+    if scorecard:
+        prepare_location_scorecard(df)
+
+
+def warm_default_views():
+    """Run the default Search of every page; returns the number of views warmed."""
+    start_str, end_str = default_range()
+    if start_str is None:
+        return 0
+    warmed = 0
+    for department_name, view in DEFAULT_VIEWS.items():
+        try:
+            warm_view(department_name, start_str, end_str, **view)
+            warmed += 1
+        except Exception as e:
+            logger.warning(f"Could not warm the default view of {department_name or 'Overview'}: {e}")
+    return warmed
+
+
+def default_views_state():
+    """Changes whenever a default view would return different data."""
+    start_str, end_str = default_range()
+    return (
+        start_str,
+        end_str,
+        data_version('financial_data', start_str, end_str),
+        data_version('sales_data', start_str, end_str),
+    )
+
+
+def run_cache_warmer(poll_seconds=WARM_POLL_SECONDS):
+    state = None
+    while True:
+        try:
+            current = default_views_state()
+            if current != state:
+                started = time.perf_counter()
+                warmed = warm_default_views()
+                logger.info(f"Warmed {warmed} default views in {time.perf_counter() - started:.1f}s")
+                state = current
+                WARMED.set()
+        except Exception as e:
+            logger.warning(f"Cache warmer failed: {e}")
+        time.sleep(poll_seconds)
+
+
+@st.cache_resource
+def start_cache_warmer(poll_seconds=WARM_POLL_SECONDS):
+    """Start the warmer thread; cached as a resource so each server process runs one.
+
+    In the app the thread runs in a detached copy of the starting script's context,
+    without which Streamlit's caches would not keep its results.
+    """
+    ctx = detached_script_run_ctx(get_script_run_ctx())
+    if ctx is None and runtime.exists():
+        logger.warning(f"Cache warmer disabled: no detached script context on Streamlit {st.__version__}")
+        return None
+    thread = threading.Thread(target=run_cache_warmer, args=(poll_seconds,), name="cache-warmer", daemon=True)
+    if ctx is not None:
+        add_script_run_ctx(thread, ctx)
+    thread.start()
+    return thread
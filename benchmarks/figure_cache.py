@@ -0,0 +1,101 @@
+"""Time of the Overview figures built from scratch and served by `cache_figure`.
+
+For each figure of an Overview search on a synthetic frame, reports the time of
+the uncached builder, of a cache hit, and of the two parts of a hit: the
+fingerprint of the arguments and the figure rebuilt from the cached entry, both
+from the cached dict (`go.Figure`) and from JSON (`pio.from_json`). Builders
+the app does not cache are wrapped here to show why.
+
+    MYSQL_URL=sqlite:// python benchmarks/figure_cache.py --months 36 --locations 120
+"""
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('MYSQL_URL', 'sqlite://')
+
+import plotly.io as pio
+import plotly.graph_objects as go
+
+from overview_memory import make_raw_frame
+
+
+def best_ms(func, repeat):
+    """Best of `repeat` calls, in milliseconds."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times) * 1000
+
+
+def overview_figures(raw_df, timeframe='quarter'):
+    """(name, cached builder, arguments) of each figure on the Overview page."""
+    from analytics.query import (
+        finalize_financial_data,
+        prepare_performance_overview_data,
+        prepare_performance_by_department_data,
+        prepare_turnover_structure_data,
+        prepare_cost_structure_cumulative,
+        prepare_cost_structure_cumulative_icicle,
+    )
+    from visuals.graphs import (
+        make_performance_overview_graph,
+        make_turnover_structure_graph,
+        make_cost_structure_graph,
+        make_cost_structure_breakdown_by_department_graph,
+        make_cost_structure_cumulative_by_department_graph,
+        make_cost_structure_cumulative_icicle_graph,
+    )
+    df = finalize_financial_data(raw_df, timeframe)
+    po_df = prepare_performance_overview_data(df, denominator="sales")
+    return [
+        ('performance', make_performance_overview_graph, (po_df,), {}),
+        ('turnover', make_turnover_structure_graph, (prepare_turnover_structure_data(df),), {}),
+        ('cost_to_sales', make_cost_structure_graph, (po_df,), {'denominator': "sales"}),
+        ('cost_to_total_cost', make_cost_structure_graph, (prepare_performance_overview_data(df, denominator="costs"),), {'denominator': "costs"}),
+        ('cost_by_department', make_cost_structure_breakdown_by_department_graph, (prepare_performance_by_department_data(df),), {}),
+        ('cumulative_cost', make_cost_structure_cumulative_by_department_graph, (prepare_cost_structure_cumulative(df),), {}),
+        ('cost_details', make_cost_structure_cumulative_icicle_graph, (prepare_cost_structure_cumulative_icicle(df),), {}),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--months', type=int, default=36)
+    parser.add_argument('--locations', type=int, default=120)
+    parser.add_argument('--accounts-per-type', type=int, default=8)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    import analytics  # enables copy-on-write
+    from utils.fingerprint import fingerprint
+    from visuals.figure_cache import cache_figure
+
+    raw_df = make_raw_frame(args.months, args.locations, args.accounts_per_type)
+    print(f"{'figure':<20}{'build':>8}{'hit':>8}{'fingerprint':>13}{'from dict':>11}{'from json':>11}  (ms, best of {args.repeat}; * not cached by the app)")
+    totals = [0.0] * 5
+    for name, builder, call_args, call_kwargs in overview_figures(raw_df):
+        build = getattr(builder, '__wrapped__', None)
+        if build is None:
+            build, builder, name = builder, cache_figure(builder), name + '*'
+        fig = build(*call_args, **call_kwargs)
+        figure_dict, figure_json = fig.to_dict(), fig.to_json()
+        builder(*call_args, **call_kwargs)  # fill the cache
+        row = [
+            best_ms(lambda: build(*call_args, **call_kwargs), args.repeat),
+            best_ms(lambda: builder(*call_args, **call_kwargs), args.repeat),
+            best_ms(lambda: [fingerprint(value) for value in [*call_args, *call_kwargs.values()]], args.repeat),
+            best_ms(lambda: go.Figure(figure_dict), args.repeat),
+            best_ms(lambda: pio.from_json(figure_json), args.repeat),
+        ]
+        totals = [total + value for total, value in zip(totals, row)]
+        print(f"{name:<20}" + "".join(f"{value:>{width}.1f}" for value, width in zip(row, [8, 8, 13, 11, 11])))
+    print(f"{'total':<20}" + "".join(f"{value:>{width}.1f}" for value, width in zip(totals, [8, 8, 13, 11, 11])))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+"""Peak memory of one Overview search on a synthetic row-level frame.
+
+Runs the same post-query and preparation steps as the Overview page
+(period columns, adjustments, performance/turnover/cost preparation and the
+figures) and reports the peak RSS of the process.
+
+    MYSQL_URL=sqlite:// python benchmarks/overview_memory.py --months 36 --locations 120
+    MYSQL_URL=sqlite:// python benchmarks/overview_memory.py --months 36 --locations 120 --no-cow
+
+Run each configuration in its own process: peak RSS never goes down.
+"""
+import os
+import sys
+import time
+import argparse
+import resource
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('MYSQL_URL', 'sqlite://')
+
+import numpy as np
+import pandas as pd
+
+DEPARTMENTS = ['Food Kiosk Sushibar', 'Food Plant', 'Restaurant', 'Head Office']
+ACCOUNTS = [
+    ('3000', 'Sales', 'sales', 10000),
+    ('3900', 'Other income', 'other income', 500),
+    ('4000', 'Material', 'material', -3500),
+    ('5000', 'Salaries', 'staff', -3000),
+    ('6000', 'Rent', 'other cost', -1200),
+    ('6900', 'Other expenses', 'other cost', -300),
+]
+
+
+def peak_rss_mb():
+    # ru_maxrss is in KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def make_raw_frame(months, locations, accounts_per_type, seed=0):
+    """Rows shaped like the result of the financial query, amounts as Decimal like the DB driver returns."""
+    rng = np.random.default_rng(seed)
+    n_accounts = len(ACCOUNTS) * accounts_per_type
+    n_rows = months * locations * n_accounts
+    month_index = np.repeat(np.arange(months), locations * n_accounts)
+    location_id = np.tile(np.repeat(np.arange(locations), n_accounts), months)
+    account_index = np.tile(np.arange(n_accounts), months * locations) // accounts_per_type
+    base = np.array([account[3] for account in ACCOUNTS])[account_index]
+    amounts = np.round(base * rng.uniform(0.8, 1.2, n_rows), 2)
+    return pd.DataFrame({
+        'year': 2020 + month_index // 12,
+        'month': month_index % 12 + 1,
+        'location_id': location_id,
+        'location_name': pd.Series(location_id).map(lambda i: f'Location {i}'),
+        'department_name': pd.Series(location_id % len(DEPARTMENTS)).map(DEPARTMENTS.__getitem__),
+        'class_name': pd.Series(location_id % 3).map(lambda i: f'Class {i}'),
+        'account_id': pd.Series(account_index).map(lambda i: ACCOUNTS[i][0]),
+        'amount': [Decimal(str(amount)) for amount in amounts],
+        'account_name': pd.Series(account_index).map(lambda i: ACCOUNTS[i][1]),
+        'account_type': pd.Series(account_index).map(lambda i: ACCOUNTS[i][2]),
+        'rate': Decimal('1.00'),
+    })
+
+
+def run_overview_search(raw_df, timeframe='quarter'):
+    from analytics.query import (
+        finalize_financial_data,
+        prepare_performance_overview_data,
+        prepare_performance_by_department_data,
+        prepare_turnover_structure_data,
+        prepare_cost_structure_cumulative,
+        prepare_cost_structure_cumulative_icicle,
+    )
+    from visuals.graphs import (
+        make_performance_overview_graph,
+        make_turnover_structure_graph,
+        make_cost_structure_graph,
+        make_cost_structure_breakdown_by_department_graph,
+        make_cost_structure_cumulative_by_department_graph,
+        make_cost_structure_cumulative_icicle_graph,
+    )
+    df = finalize_financial_data(raw_df, timeframe)
+    po_df = prepare_performance_overview_data(df, denominator="sales")
+    make_performance_overview_graph(po_df)
+    make_turnover_structure_graph(prepare_turnover_structure_data(df))
+    make_cost_structure_graph(po_df, denominator="sales")
+    make_cost_structure_graph(prepare_performance_overview_data(df, denominator="costs"), denominator="costs")
+    make_cost_structure_breakdown_by_department_graph(prepare_performance_by_department_data(df))
+    make_cost_structure_cumulative_by_department_graph(prepare_cost_structure_cumulative(df))
+    make_cost_structure_cumulative_icicle_graph(prepare_cost_structure_cumulative_icicle(df))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--months', type=int, default=36)
+    parser.add_argument('--locations', type=int, default=120)
+    parser.add_argument('--accounts-per-type', type=int, default=8)
+    parser.add_argument('--no-cow', action='store_true', help='disable pandas copy-on-write')
+    args = parser.parse_args()
+
+    import analytics  # enables copy-on-write
+    if args.no_cow:
+        pd.set_option('mode.copy_on_write', False)
+
+    raw_df = make_raw_frame(args.months, args.locations, args.accounts_per_type)
+    frame_mb = raw_df.memory_usage(deep=True).sum() / 2**20
+    before = peak_rss_mb()
+    start = time.perf_counter()
+    run_overview_search(raw_df)
+    elapsed = time.perf_counter() - start
+    after = peak_rss_mb()
+
+    print(f"rows={len(raw_df):,} frame={frame_mb:.1f} MiB copy_on_write={pd.get_option('mode.copy_on_write')}")
+    print(f"peak RSS before search={before:.1f} MiB after={after:.1f} MiB growth={after - before:.1f} MiB time={elapsed:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,201 @@
+"""Bulk loader for `data.financial_data` and `data.sales_data` exports.
+
+Rows are deduplicated on the table's natural key, both within the file and
+against the rows already stored, and inserted in large executemany batches in a
+single transaction. Rows stored with the same values are left alone, and every
+(year, month) that gained or changed rows gets its version bumped in
+`data.data_version`, so caches keyed on it refresh for exactly those periods.
+
+Load a monthly close with:
+    python -m database.ingest financial_data path/to/export.csv
+"""
+import os
+import time
+import logging
+import argparse
+from datetime import datetime
+
+import pandas as pd
+from sqlalchemy import select, and_, or_, tuple_
+
+from database.models import engine, FinancialData, SalesData, DataVersion
+
+logger = logging.getLogger(__name__)
+
+INGEST_BATCH_ROWS = 10_000
+
+TABLES = {
+    'financial_data': FinancialData.__table__,
+    'sales_data': SalesData.__table__,
+}
+
+# Columns that identify a row; a reloaded row with the same key replaces (or is skipped for) the stored one.
+NATURAL_KEYS = {
+    'financial_data': ['account_id', 'location_id', 'year', 'month'],
+    'sales_data': ['date', 'location_internal_id', 'product_internal_id', 'unit'],
+}
+
+
+def read_export(path):
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.parquet':
+        return pd.read_parquet(path)
+    if extension == '.csv':
+        return pd.read_csv(path)
+    raise ValueError(f"Unsupported export format '{extension}', expected .csv or .parquet")
+
+
+def prepare_rows(df, table_name, upload_time):
+    """Keep the table's columns, normalize types and drop duplicate natural keys (last row wins)."""
+    table = TABLES[table_name]
+    keys = NATURAL_KEYS[table_name]
+    missing = [key for key in keys if key not in df.columns]
+    if missing:
+        raise ValueError(f"{table_name} export is missing key columns: {', '.join(missing)}")
+    columns = [col.name for col in table.columns if col.name != 'id' and col.name in df.columns]
+    rows = df[columns]
+    if 'date' in rows.columns:
+        rows = rows.assign(date=pd.to_datetime(rows['date']).dt.date)
+    if 'account_id' in rows.columns:
+        rows = rows.assign(account_id=rows['account_id'].astype(str))
+    if 'upload_time' in table.columns:
+        rows = rows.assign(upload_time=upload_time)
+    return rows.drop_duplicates(subset=keys, keep='last', ignore_index=True)
+
+
+def loaded_months(rows, table_name):
+    if table_name == 'financial_data':
+        months = rows[['year', 'month']]
+    else:
+        dates = pd.to_datetime(rows['date'])
+        months = pd.DataFrame({'year': dates.dt.year, 'month': dates.dt.month})
+    return sorted(set(months.itertuples(index=False, name=None)))
+
+
+def value_columns(rows, table_name):
+    """Columns of `rows` compared with the stored row of the same natural key."""
+    return [col for col in rows.columns if col not in NATURAL_KEYS[table_name] and col != 'upload_time']
+
+
+def find_existing(connection, table_name, rows):
+    """Ids, natural keys and values of stored rows in the periods covered by `rows`."""
+    table = TABLES[table_name]
+    keys = NATURAL_KEYS[table_name]
+    values = value_columns(rows, table_name)
+    query = select(table.c.id, *[table.c[col] for col in keys + values])
+    if table_name == 'financial_data':
+        query = query.where(tuple_(table.c.year, table.c.month).in_(loaded_months(rows, table_name)))
+    else:
+        query = query.where(and_(table.c.date >= rows['date'].min(), table.c.date <= rows['date'].max()))
+    existing = pd.DataFrame(connection.execute(query).all(), columns=['id'] + keys + values)
+    if existing.empty:
+        return existing
+    return existing.merge(rows[keys], on=keys)
+
+
+def same_values(incoming, stored):
+    """Element-wise equality that treats two missing values as equal and Decimal as float."""
+    try:
+        incoming, stored = pd.to_numeric(incoming).astype(float), pd.to_numeric(stored).astype(float)
+    except (TypeError, ValueError):
+        pass
+    return incoming.eq(stored) | (incoming.isna() & stored.isna())
+
+
+def unchanged_rows(rows, existing, table_name):
+    """Mask of `rows` stored once with the same values."""
+    keys = NATURAL_KEYS[table_name]
+    stored = existing.drop(columns='id').drop_duplicates(subset=keys, keep=False)
+    merged = rows.drop(columns='upload_time', errors='ignore').merge(stored, on=keys, how='left', suffixes=('', '_stored'), indicator=True)
+    unchanged = merged['_merge'] == 'both'
+    for col in value_columns(rows, table_name):
+        unchanged &= same_values(merged[col], merged[f'{col}_stored'])
+    return unchanged.to_numpy()
+
+
+def iter_batches(rows, batch_rows=INGEST_BATCH_ROWS):
+    for start in range(0, len(rows), batch_rows):
+        chunk = rows.iloc[start:start + batch_rows]
+        yield chunk.astype(object).where(chunk.notna(), None).to_dict('records')
+
+
+def bump_data_version(connection, table_name, months, updated_at):
+    """Increment the version of every (year, month) of `table_name` that was loaded."""
+    version = DataVersion.__table__
+    stored = set(connection.execute(
+        select(version.c.year, version.c.month).where(and_(
+            version.c.table_name == table_name,
+            or_(*[and_(version.c.year == year, version.c.month == month) for year, month in months]),
+        ))
+    ).all()) if months else set()
+    for year, month in months:
+        if (year, month) in stored:
+            connection.execute(version.update().where(and_(
+                version.c.table_name == table_name, version.c.year == year, version.c.month == month,
+            )).values(version=version.c.version + 1, updated_at=updated_at))
+        else:
+            connection.execute(version.insert().values(
+                table_name=table_name, year=year, month=month, version=1, updated_at=updated_at,
+            ))
+
+
+def ingest(df, table_name, on_conflict='replace', batch_rows=INGEST_BATCH_ROWS):
+    """Load `df` into `table_name`; returns counts and throughput.
+
+    With on_conflict='replace' stored rows sharing a natural key are deleted and
+    reloaded, with 'skip' incoming rows that already exist are dropped. Either
+    way rows stored with the same values are neither written nor counted as new.
+    """
+    started = time.perf_counter()
+    upload_time = datetime.now()
+    table = TABLES[table_name]
+    rows = prepare_rows(df, table_name, upload_time)
+    replaced = skipped = unchanged = 0
+    with engine.begin() as connection:
+        existing = find_existing(connection, table_name, rows) if not rows.empty else pd.DataFrame()
+        if not existing.empty:
+            same = unchanged_rows(rows, existing, table_name)
+            unchanged = int(same.sum())
+            keys = NATURAL_KEYS[table_name]
+            existing = existing.merge(rows.loc[~same, keys], on=keys)
+            rows = rows.loc[~same]
+        if not existing.empty and on_conflict == 'replace':
+            ids = existing['id'].tolist()
+            for start in range(0, len(ids), batch_rows):
+                connection.execute(table.delete().where(table.c.id.in_(ids[start:start + batch_rows])))
+            replaced = len(ids)
+        elif not existing.empty and on_conflict == 'skip':
+            matched = rows.merge(existing[NATURAL_KEYS[table_name]], how='left', indicator=True)['_merge'] == 'both'
+            skipped = int(matched.sum())
+            rows = rows.loc[~matched.to_numpy()]
+        for batch in iter_batches(rows, batch_rows):
+            connection.execute(table.insert(), batch)
+        bump_data_version(connection, table_name, loaded_months(rows, table_name) if not rows.empty else [], upload_time)
+    seconds = time.perf_counter() - started
+    return {
+        'table': table_name,
+        'inserted': len(rows),
+        'replaced': replaced,
+        'skipped': skipped,
+        'unchanged': unchanged,
+        'seconds': round(seconds, 2),
+        'rows_per_second': round(len(rows) / seconds) if seconds else len(rows),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk-load a CSV or Parquet export into the data schema.")
+    parser.add_argument("table", choices=sorted(TABLES))
+    parser.add_argument("paths", nargs="+", help="CSV or Parquet exports")
+    parser.add_argument("--on-conflict", choices=["replace", "skip"], default="replace")
+    parser.add_argument("--batch-rows", type=int, default=INGEST_BATCH_ROWS)
+    parser.add_argument("--refresh-forecasts", action="store_true", help="Refit the forecast store afterwards")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    for path in args.paths:
+        stats = ingest(read_export(path), args.table, args.on_conflict, args.batch_rows)
+        logger.info(f"{path}: {stats['inserted']} rows inserted ({stats['replaced']} replaced, {stats['skipped']} skipped, {stats['unchanged']} unchanged) "
+                    f"in {stats['seconds']}s, {stats['rows_per_second']} rows/s")
+    if args.refresh_forecasts:
+        from analytics.forecast_job import refresh_forecast_store
+        refresh_forecast_store()
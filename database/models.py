@@ -3,7 +3,7 @@ from dotenv import load_dotenv
 
 from sqlalchemy.orm import relationship, sessionmaker, declarative_base
 from sqlalchemy import (
-    Column, Integer, String, DECIMAL, Boolean, ForeignKey, create_engine, DATE, DATETIME
+    Column, Integer, String, DECIMAL, Boolean, ForeignKey, create_engine, DATE, DATETIME, event, UniqueConstraint, Index
 )
 load_dotenv()
 
@@ -49,6 +49,7 @@ class Location(Base):
     email = Column(String(45))
     phone = Column(String(45))
     address = Column(String(45))
+    city = Column(String(45))
     country = Column(String(45))
     maraplan_location_name = Column(String(45), nullable=True)
     smp_path = Column(String(120), nullable=True)  # New field
@@ -129,7 +130,10 @@ class FinancialData(Base):
 
 class SalmonOrders(Base):
     __tablename__ = 'salmon_orders'
-    __table_args__ = {'schema': 'data'}
+    __table_args__ = (
+        Index('ix_salmon_orders_date_customer', 'date', 'customer'),
+        {'schema': 'data'},
+    )
 
     id = Column(Integer, primary_key=True)
     customer = Column(String(45))
@@ -153,10 +157,37 @@ class SalmonOrderWeight(Base):
     batch_number = Column(Integer)
 
 
+class DataVersion(Base):
+    __tablename__ = 'data_version'
+    __table_args__ = (
+        UniqueConstraint('table_name', 'year', 'month'),
+        {'schema': 'data'},
+    )
+
+    id = Column(Integer, primary_key=True)
+    table_name = Column(String(45), nullable=False)
+    year = Column(Integer, nullable=False)
+    month = Column(Integer, nullable=False)
+    version = Column(Integer, default=0, nullable=False)
+    updated_at = Column(DATETIME)
+
 
 # Create an engine using the environment variable 'MYSQL_URL'
 engine = create_engine(os.getenv('MYSQL_URL', None))
 
+# SQLite has no schemas: attach one database per schema so the models also work
+# against a local SQLite URL (offline benchmarks and tests).
+if engine.dialect.name == 'sqlite':
+    @event.listens_for(engine, 'connect')
+    def attach_sqlite_schemas(dbapi_connection, connection_record):
+        database = engine.url.database
+        for schema in ('data', 'master'):
+            if not database or database == ':memory:':
+                path = ':memory:'
+            else:
+                path = f"{os.path.splitext(database)[0]}_{schema}.db"
+            dbapi_connection.execute(f"ATTACH DATABASE '{path}' AS {schema}")
+
 # Create all tables in the Base metadata if they do not exist
 Base.metadata.create_all(engine)
 
@@ -3,6 +3,11 @@ from PIL import Image
 import streamlit as st
 from analytics.query import *
 from visuals.graphs import *
+from analytics.warmup import start_cache_warmer
+from utils.data_grid import display_data_grid
+from analytics.forecast import get_performance_forecast, get_location_forecast
+from analytics.kpi import display_kpis
+from analytics.scorecard import display_location_scorecard
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -14,7 +19,7 @@ PAGE_TITLE = "Sushibar"
 PAGE_ICON = "assets/logo.ico"
 TIMEFRAME_OPTIONS = ["Month", "Quarter", "Year"]
 REPORT_TYPE_OPTIONS = ["Standard", "Adjusted_coef"]
-TURNOVER_FILTER_OPTIONS = ["Manager", "Product category", "Location name", "City", "Country", "Status"]
+TURNOVER_FILTER_OPTIONS = ["Manager", "Product category", "Location name", "City", "Country", "Status", "SOK region", "SOK type", "SOK commission"]
 
 # Page Configuration
 st.set_page_config(
@@ -112,6 +117,7 @@ def create_sidebar_widgets():
 # Main Function
 def main():
     logger.info("Starting main function")
+    start_cache_warmer()
     timeframe, start_str, end_str, report_type, custom_adjustment, split_office_cost = create_sidebar_widgets()
     
     if st.sidebar.button("Search"):
@@ -134,8 +140,10 @@ def main():
             )
             ss_avg_df = prepare_avg_sales_data(ss_df)
 
-            display_performance_analysis(df)
-            display_turnover_breakdown(ss_df, ss_avg_df)
+            display_performance_analysis(df, report_type, custom_adjustment, split_office_cost)
+            display_kpis(DEPARTMENT_NAME, report_type, start_str, end_str, timeframe, custom_adjustment, split_office_cost)
+            display_location_scorecard(df, DEPARTMENT_NAME)
+            display_turnover_breakdown(ss_df, ss_avg_df, timeframe)
             display_cost_structure(df)
             display_cost_details(df)
             logger.info("All data displayed successfully")
@@ -143,20 +151,20 @@ def main():
             logger.error(f"Error occurred while processing data: {str(e)}")
             st.error("An error occurred while processing the data. Please try again.")
 
-def display_performance_analysis(df):
+def display_performance_analysis(df, report_type, custom_adjustment, split_office_cost):
     logger.info("Displaying performance analysis")
     st.subheader(f'Performance Analysis{" - " + DEPARTMENT_NAME if DEPARTMENT_NAME else ""}')
     po_fig_tab, po_data_tab = st.tabs(["Figure", "Data"])
     po_df = prepare_performance_overview_data(df, denominator="sales")
     with po_fig_tab:
-        st.plotly_chart(make_performance_overview_graph(po_df), use_container_width=True)
+        st.plotly_chart(make_performance_overview_graph(po_df, forecast_df=get_performance_forecast(po_df, DEPARTMENT_NAME, report_type, custom_adjustment, split_office_cost)), use_container_width=True)
     with po_data_tab:
         st.dataframe(po_df, use_container_width=True, hide_index=True)
 
-def display_turnover_breakdown(ss_df, ss_avg_df):
+def display_turnover_breakdown(ss_df, ss_avg_df, timeframe):
     logger.info("Displaying turnover breakdown")
     st.subheader(f'Turnover Breakdown{" - " + DEPARTMENT_NAME if DEPARTMENT_NAME else ""}')
-    ts_fig1_tab, ts_fig2_tab, ts_data_tab = st.tabs(["Turnover", "Average sales", "Data"])
+    ts_fig1_tab, ts_fig2_tab, ts_data_tab, ts_proj_tab = st.tabs(["Turnover", "Average sales", "Data", "Projection"])
     ts_df = prepare_turnover_structure_data(df=ss_df, department_name=DEPARTMENT_NAME, pivot_by=st.session_state['pivot_by'].lower().replace(" ", "_"))
     with ts_fig1_tab:
         st.plotly_chart(make_turnover_structure_graph(ts_df, department_name=DEPARTMENT_NAME), use_container_width=True)
@@ -164,6 +172,12 @@ def display_turnover_breakdown(ss_df, ss_avg_df):
         st.plotly_chart(make_avg_sales_graph(ss_avg_df), use_container_width=True)
     with ts_data_tab:
         st.dataframe(ts_df, use_container_width=True, hide_index=True)
+    with ts_proj_tab:
+        proj_df = get_location_forecast(DEPARTMENT_NAME, timeframe)
+        if proj_df is None:
+            st.info("No projections yet. Run `python -m analytics.forecast_job` after uploading data.")
+        else:
+            st.dataframe(proj_df, use_container_width=True, hide_index=True)
 
 def display_cost_structure(df):
     logger.info("Displaying cost structure")
@@ -182,12 +196,12 @@ def display_cost_details(df):
     logger.info("Displaying cost details")
     st.subheader(f'Cost Details{" - " + DEPARTMENT_NAME if DEPARTMENT_NAME else ""}')
     cdd_fig_tab, cdd_data_tab = st.tabs(["Cumulative Cost Details Breakdown", "Data"])
-    cdd_df = df.copy()
+    cdd_df = df
     with cdd_fig_tab:
         processed_df = prepare_cost_structure_cumulative_icicle(cdd_df)
         st.plotly_chart(make_cost_structure_cumulative_icicle_graph(processed_df), use_container_width=True)
     with cdd_data_tab:
-        st.dataframe(cdd_df, use_container_width=True, hide_index=True)
+        display_data_grid(cdd_df, "cost_details", key="cdd_data")
 
 if __name__ == "__main__":
     logger.info("Starting Sushibar application")
@@ -7,6 +7,11 @@ import pydeck as pdk
 import streamlit as st
 from analytics.query import *
 from visuals.graphs import *
+from analytics.warmup import start_cache_warmer
+from analytics.forecast import get_performance_forecast
+from analytics.kpi import display_kpis
+from analytics.scorecard import display_location_scorecard
+from utils.data_grid import display_data_grid
 
 
 st.set_page_config(
@@ -16,6 +21,7 @@ st.set_page_config(
     initial_sidebar_state='auto')
 
 DEPARTMENT_NAME = "Restaurant"
+start_cache_warmer()
 
 st.markdown("# Restaurant Project")
 
@@ -113,10 +119,13 @@ if search_btn:
     po_fig_tab, po_data_tab = st.tabs(["Figure", "Data"])
     po_df = prepare_performance_overview_data(df, denominator="sales")
     with po_fig_tab:
-        st.plotly_chart(make_performance_overview_graph(po_df), use_container_width=True)
+        st.plotly_chart(make_performance_overview_graph(po_df, forecast_df=get_performance_forecast(po_df, DEPARTMENT_NAME, report_type, custom_adjustment, split_office_cost)), use_container_width=True)
     with po_data_tab:
         st.dataframe(po_df, use_container_width=True, hide_index=True)
 
+    display_kpis(DEPARTMENT_NAME, report_type, start_str, end_str, timeframe, custom_adjustment, split_office_cost)
+    display_location_scorecard(df, DEPARTMENT_NAME)
+
     st.subheader(f'Turnover Breakdown{" - " + DEPARTMENT_NAME if DEPARTMENT_NAME is not None else ""}')
     ts_fig_tab, ts_data_tab = st.tabs(["Figure", "Data"])
     ts_df = prepare_turnover_structure_data(df, department_name=DEPARTMENT_NAME, pivot_by=st.session_state['pivot_by'].lower().replace(" ", "_"))
@@ -139,9 +148,9 @@ if search_btn:
 
     st.subheader(f'Cost Details{" - " + DEPARTMENT_NAME if DEPARTMENT_NAME is not None else ""}')
     cdd_fig_tab, cdd_data_tab = st.tabs([ "Cumulative Cost Details Breakdown", "Data"])
-    cdd_df = df.copy()
+    cdd_df = df
     with cdd_fig_tab:
         processed_df = prepare_cost_structure_cumulative_icicle(cdd_df)
         st.plotly_chart(make_cost_structure_cumulative_icicle_graph(processed_df), use_container_width=True)
     with cdd_data_tab:
-        st.dataframe(cdd_df, use_container_width=True, hide_index=True)
+        display_data_grid(cdd_df, "cost_details", key="cdd_data")
@@ -3,6 +3,8 @@ from PIL import Image
 import streamlit as st
 from analytics.query import *
 from visuals.graphs import *
+from analytics.warmup import start_cache_warmer
+from analytics.kpi import display_kpis
 
 
 st.set_page_config(
@@ -12,6 +14,7 @@ st.set_page_config(
     initial_sidebar_state='auto')
 
 DEPARTMENT_NAME = "Head Office"
+start_cache_warmer()
 
 st.markdown("# Head Office")
 st.sidebar.header("Head Office")
@@ -68,4 +71,6 @@ if search_btn:
     with po_tab1:
         st.plotly_chart(make_performance_overview_graph(df), use_container_width=True)
     with po_tab2:
-        st.dataframe(df, use_container_width=True, hide_index=True)
\ No newline at end of file
+        st.dataframe(df, use_container_width=True, hide_index=True)
+
+    display_kpis(DEPARTMENT_NAME, report_type, start_str, end_str, timeframe, custom_adjustment)
@@ -3,12 +3,16 @@ import pandas as pd
 from dotenv import load_dotenv
 import logging
 from analytics.data_processing import (
-    get_balance_sheet_data,
-    get_income_statement_data,
+    STATEMENT_LOADERS,
+    COMPARATIVE_STATEMENT_LOADERS,
+    load_statements_concurrently,
+    pivot_statement_by_period,
+    display_comparative_statement,
     data_to_dataframe,
     display_financial_statement,
     display_charts,
 )
+from utils.netsuite_sync import mirror_synced_at
 
 # Load environment variables from .env file
 load_dotenv()
@@ -21,6 +25,9 @@ def main():
     st.set_page_config(page_title="Company Financial Dashboard", layout="wide")
     st.title("Company Financial Situation")
     st.write("Data pulled from NetSuite")
+    synced_at = mirror_synced_at()
+    if synced_at is not None:
+        st.caption(f"Closed periods are read from the local mirror, last synced {synced_at:%Y-%m-%d %H:%M}. The current period is queried live.")
 
     # Improve the UI by using a dropdown for selecting periods
     periods = [
@@ -30,21 +37,38 @@ def main():
         "Q4 FY2023",
         "CURRENT_ACCOUNTING_PERIOD",
     ]
-    selected_period = st.selectbox("Select Accounting Period", periods)
-
-    # Add a loading indicator
-    with st.spinner("Fetching data..."):
-        st.header("Balance Sheet")
-        balance_data = get_balance_sheet_data(selected_period)
-        balance_df = data_to_dataframe(balance_data)
-        display_financial_statement(balance_df, "Balance Sheet")
-        display_charts(balance_df, "Balance Sheet")
-
-        st.header("Income Statement")
-        income_data = get_income_statement_data(selected_period)
-        income_df = data_to_dataframe(income_data)
-        display_financial_statement(income_df, "Income Statement")
-        display_charts(income_df, "Income Statement")
+    mode = st.radio("Mode", ["Single period", "Comparative"], horizontal=True)
+
+    if mode == "Single period":
+        selected_period = st.selectbox("Select Accounting Period", periods)
+
+        # Reserve a section per statement so each renders as soon as its data arrives
+        sections = {}
+        for title in STATEMENT_LOADERS:
+            sections[title] = st.container()
+            sections[title].header(title)
+
+        with st.spinner("Fetching data..."):
+            for title, data in load_statements_concurrently(selected_period):
+                with sections[title]:
+                    statement_df = data_to_dataframe(data)
+                    display_financial_statement(statement_df, title)
+                    display_charts(statement_df, title)
+    else:
+        selected_periods = st.multiselect("Select Accounting Periods", periods, default=periods[:4])
+        if selected_periods:
+            # Keep the columns in calendar order regardless of selection order
+            selected_periods = tuple(period for period in periods if period in selected_periods)
+            sections = {}
+            for title in COMPARATIVE_STATEMENT_LOADERS:
+                sections[title] = st.container()
+                sections[title].header(title)
+
+            with st.spinner("Fetching data..."):
+                for title, data in load_statements_concurrently(selected_periods, COMPARATIVE_STATEMENT_LOADERS):
+                    with sections[title]:
+                        matrix_df = pivot_statement_by_period(data_to_dataframe(data), selected_periods)
+                        display_comparative_statement(matrix_df, title, selected_periods)
 
     # Provide additional information or help sections
     st.sidebar.title("Help & Information")
@@ -53,7 +77,7 @@ def main():
     )
 
     st.sidebar.write(
-        "For more detailed analysis, you can download the financial data as CSV files by clicking the buttons provided under each section."
+        "For more detailed analysis, you can export the financial data as CSV, Parquet or Excel files with the controls provided under each section."
     )
 
 # Run the app
@@ -0,0 +1,64 @@
+from datetime import date
+
+from PIL import Image
+import streamlit as st
+from analytics.salmon import *
+from visuals.graphs import *
+from utils.export import display_export_controls
+
+
+st.set_page_config(
+    page_title="Salmon",
+    page_icon=Image.open("assets/logo.ico"),
+    layout='wide',
+    initial_sidebar_state='auto')
+
+ensure_salmon_index()
+
+GROUP_BY_OPTIONS = {
+    "Week": "week",
+    "Customer": "customer",
+    "Fish size": "fish_size",
+    "Batch": "batch",
+}
+
+st.markdown("# Salmon Procurement")
+st.sidebar.header("Salmon Procurement")
+
+today = date.today()
+start_date = st.sidebar.date_input("Start", value=date(today.year - 1, 1, 1), key="salmon_start")
+end_date = st.sidebar.date_input("End", value=today, key="salmon_end")
+if start_date > end_date:
+    st.toast("Wrong period selected!", icon="🚨")
+
+group_by = st.sidebar.multiselect(
+    "Group by",
+    options=list(GROUP_BY_OPTIONS),
+    default=["Week"],
+    key="salmon_group_by",
+    help="Grouping by batch splits each order over its batches in proportion to the weight packed in each.",
+)
+customers = st.sidebar.multiselect("Customers", options=query_salmon_customers(), key="salmon_customers")
+
+search_btn = st.sidebar.button("Search")
+
+
+@st.experimental_fragment
+def display_salmon_data(df):
+    """Runs as a fragment, so exporting does not rerun the page and clear the results."""
+    st.dataframe(df, use_container_width=True, hide_index=True)
+    display_export_controls(df, "salmon_orders", key="salmon_data")
+
+
+if search_btn:
+    if not group_by:
+        st.warning("Select at least one dimension to group by.")
+    else:
+        dimensions = tuple(GROUP_BY_OPTIONS[option] for option in group_by)
+        df = query_salmon_summary(dimensions, start_date, end_date, customers)
+        st.subheader("Ordered vs. Weighed")
+        fig_tab, data_tab = st.tabs(["Figure", "Data"])
+        with fig_tab:
+            st.plotly_chart(make_salmon_yield_graph(df, group_by=dimensions), use_container_width=True)
+        with data_tab:
+            display_salmon_data(df)
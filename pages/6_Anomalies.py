@@ -0,0 +1,60 @@
+from PIL import Image
+import streamlit as st
+from analytics.anomaly import *
+from analytics.dimensions import location_dimension
+from utils.export import display_export_controls
+
+
+st.set_page_config(
+    page_title="Anomalies",
+    page_icon=Image.open("assets/logo.ico"),
+    layout='wide',
+    initial_sidebar_state='auto')
+
+ALL_DEPARTMENTS = "All departments"
+
+st.markdown("# Posting Anomalies")
+st.sidebar.header("Posting Anomalies")
+
+departments = sorted(location_dimension()['department_name'].dropna().unique().tolist())
+department = st.sidebar.selectbox("Department", options=[ALL_DEPARTMENTS] + departments, key="anomaly_department")
+threshold = st.sidebar.slider(
+    "Robust z-score threshold",
+    min_value=2.0,
+    max_value=10.0,
+    value=ANOMALY_Z_THRESHOLD,
+    step=0.5,
+    key="anomaly_threshold",
+    help=(
+        "Every location's monthly amount on an account is compared with the median of that account at that location "
+        f"over all closed months. Series with fewer than {ANOMALY_MIN_MONTHS} months are not scored."
+    ),
+)
+
+search_btn = st.sidebar.button("Search")
+
+
+@st.experimental_fragment
+def display_anomalies(df):
+    """Runs as a fragment, so exporting does not rerun the page and clear the results."""
+    st.dataframe(
+        df,
+        column_config={
+            'location_id': None,
+            'amount': st.column_config.NumberColumn(format="%.2f"),
+            'median': st.column_config.NumberColumn("Typical amount", format="%.2f"),
+            'z_score': st.column_config.NumberColumn("Robust z-score", format="%.1f"),
+        },
+        use_container_width=True,
+        hide_index=True,
+    )
+    display_export_controls(df, "posting_anomalies", key="anomaly_data")
+
+
+if search_btn:
+    df = query_anomalies(threshold, department_name=None if department == ALL_DEPARTMENTS else department)
+    st.subheader(f"{len(df)} amounts to review")
+    if df.empty:
+        st.info("No amounts above the threshold.")
+    else:
+        display_anomalies(df)
@@ -0,0 +1,46 @@
+import os
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# database.models creates its engine on import, so point it at a scratch SQLite
+# database (one file per schema) before any test imports the app modules.
+os.environ["MYSQL_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='spt-finance-tests-'), 'main.db')}"
+# utils.netsuite_api builds its base URL from the account id on import; tests never call it
+os.environ.setdefault("NETSUITE_ACCOUNT_ID", "test")
+
+DEPARTMENTS = ["Food Kiosk Sushibar", "Restaurant", "Food Plant", "Head Office"]
+ACCOUNTS = [("3000", "sales"), ("4000", "material"), ("5000", "staff"), ("6000", "other cost")]
+
+
+@pytest.fixture(scope="session")
+def seeded_database():
+    """Two years of monthly financial data for eight locations across the four departments."""
+    from database.session import session_scope
+    from database.models import Department, Class, Manager, Location, FinancialAccount
+    from database.ingest import ingest
+
+    with session_scope() as session:
+        for i, name in enumerate(DEPARTMENTS, start=1):
+            session.add(Department(id=i, name=name, active=True))
+        session.add(Class(id=1, name="Standard", active=True))
+        session.add(Manager(id=1, name="Manager"))
+        for i in range(8):
+            session.add(Location(id=i + 1, name=f"L{i}", short_name=f"L{i}", department_id=i % 4 + 1, class_id=1, op_manager_id=1, country="FI", status="active"))
+        for account_id, account_type in ACCOUNTS:
+            session.add(FinancialAccount(account_id=account_id, account_name=account_type, account_type=account_type, std_rate=1, adj_rate=1, adj_coef_rate=1))
+
+    rng = np.random.default_rng(0)
+    rows = [
+        dict(account_id=account_id, location_id=location_id, year=2024 + m // 12, month=m % 12 + 1,
+             amount=round(rng.normal(10000 if account_type == "sales" else -3000, 300), 2))
+        for m in range(24) for location_id in range(1, 9) for account_id, account_type in ACCOUNTS
+    ]
+    ingest(pd.DataFrame(rows), "financial_data")
+    return os.environ["MYSQL_URL"]
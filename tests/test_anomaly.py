@@ -0,0 +1,63 @@
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from analytics.anomaly import ANOMALY_Z_THRESHOLD, last_closed_month, query_anomalies, robust_z_scores
+from analytics.data_version import probe_data_versions
+from database.session import session_scope
+from database.models import FinancialData
+
+
+@pytest.fixture(scope="module")
+def series():
+    """A series with one spike, a flat series with one step, and a series too short to score."""
+    amounts = {
+        (1, "A"): [10, 12, 11, 13, 9, 10, 50],
+        (1, "B"): [5, 5, 5, 5, 5, 5, 8],
+        (2, "A"): [1, 100, 1],
+    }
+    return pd.DataFrame(
+        [(location_id, account_id, float(amount)) for (location_id, account_id), values in amounts.items() for amount in values],
+        columns=['location_id', 'account_id', 'amount'],
+    )
+
+
+def test_robust_z_scores(series):
+    median, z = robust_z_scores(series)
+    assert median.tolist() == [11] * 7 + [5] * 7 + [1] * 3
+    # MAD of the first series is 1
+    assert z[:7].tolist() == pytest.approx([0.6745 * (amount - 11) for amount in [10, 12, 11, 13, 9, 10, 50]])
+    # the flat series has no MAD and is scaled by its mean absolute deviation, 3 / 7
+    assert z[13] == pytest.approx(0.7979 * 3 / (3 / 7))
+    assert (z[7:13] == 0).all()
+    assert z[14:].isna().all()
+
+
+def test_only_the_spike_and_the_step_are_flagged(series):
+    _, z = robust_z_scores(series)
+    flagged = series.loc[z.abs() > ANOMALY_Z_THRESHOLD]
+    assert flagged.index.tolist() == [6, 13]
+
+
+def test_last_closed_month():
+    assert last_closed_month(date(2025, 1, 15)) == "2024-M12"
+    assert last_closed_month(date(2025, 7, 1)) == "2025-M06"
+
+
+def test_a_booked_spike_is_the_top_anomaly(seeded_database):
+    with session_scope() as session:
+        session.add(FinancialData(account_id="6000", location_id=1, year=2025, month=6, amount=-50000))
+    try:
+        probe_data_versions.clear()
+        anomalies = query_anomalies(department_name="Food Kiosk Sushibar")
+        top = anomalies.iloc[0]
+        assert (top['year_month'], top['location_id'], top['account_id']) == ("2025-M06", 1, "6000")
+        assert top['z_score'] < -ANOMALY_Z_THRESHOLD
+        assert (anomalies['department_name'] == "Food Kiosk Sushibar").all()
+        assert np.all(np.diff(anomalies['z_score'].abs().to_numpy()) <= 0)
+    finally:
+        with session_scope() as session:
+            session.query(FinancialData).filter(FinancialData.amount == -50000).delete()
+        probe_data_versions.clear()
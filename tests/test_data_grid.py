@@ -0,0 +1,19 @@
+from streamlit.testing.v1 import AppTest
+
+
+def grid_of_two_locations():
+    import pandas as pd
+
+    from utils.data_grid import display_data_grid
+
+    display_data_grid(pd.DataFrame({'location_name': ['a'] * 250 + ['b'] * 10, 'amount': 1.0}), "grid", key="grid")
+
+
+def test_filter_past_the_last_page_resets_the_page_without_a_warning():
+    at = AppTest.from_function(grid_of_two_locations).run()
+    at.number_input(key="grid_page").set_value(3).run()
+    at.multiselect(key="grid_filter_location_name").select('b').run()
+    assert not at.exception
+    assert not at.warning
+    assert at.number_input(key="grid_page").value == 1
+    assert at.caption[0].value == "Rows 1–10 of 10 (filtered from 260)"
@@ -0,0 +1,46 @@
+from analytics.data_version import data_version, probe_data_versions, probe_master_version
+from analytics.slices import financial_month_rows
+from database.session import session_scope
+from database.models import FinancialAccount, FinancialData
+
+
+def poll():
+    """Drop the probe results, as if VERSION_POLL_SECONDS had passed."""
+    probe_data_versions.clear()
+    probe_master_version.clear()
+
+
+
+def test_rows_written_outside_the_ingest_cli_change_the_version(seeded_database):
+    poll()
+    version = data_version('financial_data', '2024-M03', '2024-M03')
+    other_version = data_version('financial_data', '2024-M04', '2024-Q4')
+    rows = len(financial_month_rows('2024-M03', '2024-M03'))
+    with session_scope() as session:
+        session.add(FinancialData(account_id="3000", location_id=1, year=2024, month=3, amount=1))
+    try:
+        poll()
+        assert data_version('financial_data', '2024-M03', '2024-M03') != version
+        # other months stay cached
+        assert data_version('financial_data', '2024-M04', '2024-Q4') == other_version
+        assert len(financial_month_rows('2024-M03', '2024-M03')) == rows + 1
+    finally:
+        with session_scope() as session:
+            session.query(FinancialData).filter(FinancialData.amount == 1).delete()
+        poll()
+
+
+def test_rate_edits_change_the_version(seeded_database):
+    poll()
+    version = data_version('financial_data', '2024-M03', '2024-M03')
+    with session_scope() as session:
+        session.query(FinancialAccount).filter(FinancialAccount.account_id == "4000").update({'adj_rate': 0.5})
+    try:
+        poll()
+        assert data_version('financial_data', '2024-M03', '2024-M03') != version
+        rows = financial_month_rows('2024-M03', '2024-M03')
+        assert (rows.loc[rows['account_id'] == "4000", 'adj_rate'] == 0.5).all()
+    finally:
+        with session_scope() as session:
+            session.query(FinancialAccount).filter(FinancialAccount.account_id == "4000").update({'adj_rate': 1})
+        poll()
@@ -0,0 +1,26 @@
+import pandas as pd
+
+from analytics.dimensions import attach_location_attributes, location_ids
+
+
+def test_attributes_are_looked_up_by_location_id(seeded_database):
+    df = pd.DataFrame({'location_id': [3, 99, 1, 3], 'amount': [1.0, 2.0, 3.0, 4.0]}, index=[10, 11, 12, 13])
+    result = attach_location_attributes(df, ['location_name', 'department_name'])
+    # the unknown location is dropped, every other row keeps its position and index
+    assert result.index.tolist() == [10, 12, 13]
+    assert result['amount'].tolist() == [1.0, 3.0, 4.0]
+    assert result['location_name'].tolist() == ["L2", "L0", "L2"]
+    assert result['department_name'].tolist() == ["Food Plant", "Food Kiosk Sushibar", "Food Plant"]
+    assert result['location_name'].dtype == object
+
+
+def test_rows_missing_a_required_attribute_are_dropped(seeded_database):
+    df = pd.DataFrame({'location_id': [1, 2]})
+    # the seeded locations have no city
+    assert attach_location_attributes(df, ['location_name'], required=['city']).empty
+    assert len(attach_location_attributes(df, ['location_name'], required=['location_name'])) == 2
+
+
+def test_location_ids_of_a_department(seeded_database):
+    assert location_ids("Restaurant") == [2, 6]
+    assert location_ids("Unknown") == []
@@ -0,0 +1,34 @@
+import os
+import time
+
+import pandas as pd
+
+from utils import export
+
+
+def test_old_and_surplus_exports_are_pruned(tmp_path, monkeypatch):
+    monkeypatch.setattr(export, "EXPORT_DIR", str(tmp_path))
+    now = time.time()
+    for i in range(5):
+        path = tmp_path / f"recent-{i}.csv"
+        path.write_text("a\n")
+        os.utime(path, (now - i, now - i))
+    stale = tmp_path / "stale.csv"
+    stale.write_text("a\n")
+    os.utime(stale, (now - 2 * export.EXPORT_MAX_AGE_SECONDS,) * 2)
+
+    export.prune_exports(max_files=3)
+    assert sorted(os.listdir(tmp_path)) == ["recent-0.csv", "recent-1.csv", "recent-2.csv"]
+
+
+def test_export_prunes_before_writing_and_reuses_unchanged_frames(tmp_path, monkeypatch):
+    monkeypatch.setattr(export, "EXPORT_DIR", str(tmp_path))
+    stale = tmp_path / "stale.csv"
+    stale.write_text("a\n")
+    os.utime(stale, (time.time() - 2 * export.EXPORT_MAX_AGE_SECONDS,) * 2)
+
+    df = pd.DataFrame({"a": [1, 2, 3]})
+    path = export.export_frame(df, "csv", name="test")
+    assert os.listdir(tmp_path) == [os.path.basename(path)]
+    assert export.export_frame(df, "csv", name="test") == path
+    assert pd.read_csv(path).equals(df)
@@ -0,0 +1,26 @@
+import pandas as pd
+import plotly.graph_objects as go
+
+from visuals.figure_cache import cache_figure, clear_figure_cache
+
+
+def test_hits_return_fresh_copies_of_the_first_figure():
+    calls = []
+
+    @cache_figure
+    def bar(df, title=""):
+        calls.append(title)
+        return go.Figure(go.Bar(x=df['x'], y=df['y']), layout={'title': title})
+
+    clear_figure_cache()
+    df = pd.DataFrame({'x': ["a", "b"], 'y': [1, 2]})
+    first = bar(df, title="t")
+    first.update_layout(title="changed")
+    first.data[0].y = [9, 9]
+    second = bar(df.copy(), title="t")
+    assert calls == ["t"]
+    assert second is not first
+    assert second.layout.title.text == "t"
+    assert list(second.data[0].y) == [1, 2]
+    bar(df.assign(y=[1, 3]), title="t")
+    assert calls == ["t", "t"]
@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+
+from analytics.forecast import SEASON_LENGTH, fit_ets, forecast_ets, get_location_forecast
+
+
+def test_flat_daily_series_stays_flat_over_a_long_horizon():
+    rng = np.random.default_rng(0)
+    Y = 500 + rng.normal(0, 50, (20, 400))
+    forecast = forecast_ets(fit_ets(Y, SEASON_LENGTH['day']), 184)
+    assert forecast.min() > 400 and forecast.max() < 600
+
+
+def test_seasonal_monthly_series_stays_within_its_range():
+    rng = np.random.default_rng(1)
+    t = np.arange(48)
+    Y = 1000 + 200 * np.sin(2 * np.pi * t / 12) + rng.normal(0, 30, (10, 48))
+    forecast = forecast_ets(fit_ets(Y, SEASON_LENGTH['month']), 12)
+    assert forecast.min() > 700 and forecast.max() < 1300
+    # the seasonal peak and trough are kept
+    assert forecast[:, 3].mean() - forecast[:, 9].mean() > 250
+
+
+def test_steady_trend_is_followed_in_the_short_term():
+    Y = (100 + 5 * np.arange(36.0))[None, :]
+    forecast = forecast_ets(fit_ets(Y), 3)
+    assert np.allclose(forecast, [[280, 285, 290]], atol=2)
+
+
+def test_periods_the_horizon_ends_in_are_not_drawn(tmp_path):
+    path = str(tmp_path / "store.parquet")
+    # daily projections from 2026-01-01 for 100 days end on April 10th
+    pd.DataFrame({
+        'scope': 'location',
+        'department_name': "Restaurant",
+        'location_name': "L1",
+        'metric': 'amount_calc_sales',
+        'month': ['2026-M01', '2026-M02', '2026-M03', '2026-M04'],
+        'forecast': [31.0, 28.0, 31.0, 10.0],
+        'days': [31, 28, 31, 10],
+    }).to_parquet(path)
+    monthly = get_location_forecast("Restaurant", 'month', path)
+    assert monthly.columns.tolist() == ['location_name', '2026-M01', '2026-M02', '2026-M03']
+    quarterly = get_location_forecast("Restaurant", 'quarter', path)
+    assert quarterly.columns.tolist() == ['location_name', '2026-Q1']
+    assert quarterly['2026-Q1'].iloc[0] == 90.0
@@ -0,0 +1,30 @@
+import numpy as np
+import pandas as pd
+
+from visuals.graphs import LARGE_DATA_TOP_N, OTHER_CATEGORY, is_large_data, make_turnover_structure_graph
+
+
+def turnover_pivot(periods, locations):
+    """Turnover per period (rows) and location (columns), as prepare_turnover_structure_data returns it."""
+    values = np.arange(periods * locations, dtype=float).reshape(periods, locations)
+    pivot = pd.DataFrame(values, columns=pd.Index([f"L{i}" for i in range(locations)], name='location_name'))
+    return pivot.assign(period=[f"{2000 + i // 12}-M{i % 12 + 1:02d}" for i in range(periods)])[['period'] + list(pivot.columns)]
+
+
+def test_large_data_counts_every_series_point():
+    # few periods, but 40 x 12 bars
+    assert is_large_data(turnover_pivot(40, 12))
+    assert not is_large_data(turnover_pivot(20, 12))
+    assert is_large_data(turnover_pivot(4, LARGE_DATA_TOP_N + 1))
+
+
+def test_large_turnover_charts_keep_every_period():
+    df = turnover_pivot(40, 20)
+    figure = make_turnover_structure_graph(df)
+    assert {trace.type for trace in figure.data} == {'scattergl'}
+    assert len(figure.data) == LARGE_DATA_TOP_N
+    assert figure.data[-1].name == OTHER_CATEGORY
+    assert all(len(trace.x) == 40 for trace in figure.data)
+
+    small = make_turnover_structure_graph(turnover_pivot(8, 4))
+    assert {trace.type for trace in small.data} == {'bar'}
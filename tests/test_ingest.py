@@ -0,0 +1,53 @@
+import pandas as pd
+import pytest
+
+from database.ingest import ingest
+from database.session import session_scope
+from database.models import SalesData, DataVersion
+
+
+def stored_versions():
+    with session_scope() as session:
+        return {(row.year, row.month): row.version for row in session.query(DataVersion).filter(DataVersion.table_name == 'sales_data')}
+
+
+def stored_rows():
+    with session_scope() as session:
+        return session.query(SalesData).count()
+
+
+@pytest.fixture
+def sales_export(seeded_database):
+    """Sales rows of two locations on the first day of January and February 2024."""
+    yield pd.DataFrame({
+        'date': ["2024-01-01", "2024-01-01", "2024-02-01", "2024-02-01"],
+        'location_internal_id': [1, 2, 1, 2],
+        'product_internal_id': 1,
+        'unit': "pcs",
+        'quantity': [1, 2, 3, 4],
+        'amount': [10.5, 20.25, 30.0, 40.75],
+    })
+    with session_scope() as session:
+        session.query(SalesData).delete()
+        session.query(DataVersion).filter(DataVersion.table_name == 'sales_data').delete()
+
+
+def test_reingesting_the_same_file_inserts_nothing_and_keeps_the_versions(sales_export):
+    assert ingest(pd.concat([sales_export, sales_export.head(1)]), 'sales_data')['inserted'] == 4
+    versions = stored_versions()
+    assert versions == {(2024, 1): 1, (2024, 2): 1}
+
+    for on_conflict in ['replace', 'skip']:
+        stats = ingest(sales_export, 'sales_data', on_conflict=on_conflict)
+        assert (stats['inserted'], stats['replaced'], stats['skipped'], stats['unchanged']) == (0, 0, 0, 4)
+        assert stored_rows() == 4
+        assert stored_versions() == versions
+
+
+def test_changed_rows_bump_only_their_month(sales_export):
+    ingest(sales_export, 'sales_data')
+    changed = sales_export.assign(amount=[10.5, 20.25, 30.0, 41.0])
+    stats = ingest(changed, 'sales_data')
+    assert (stats['inserted'], stats['replaced'], stats['unchanged']) == (1, 1, 3)
+    assert stored_rows() == 4
+    assert stored_versions() == {(2024, 1): 1, (2024, 2): 2}
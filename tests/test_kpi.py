@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from analytics.kpi import prepare_kpi_data
+
+
+@pytest.fixture(scope="module")
+def monthly_rows():
+    """18 months from 2023-M01: department A sells 100 * n in month n, B 50 a month from month 7."""
+    rows = []
+    for n in range(1, 19):
+        year_month = f"{2023 + (n - 1) // 12}-M{(n - 1) % 12 + 1:02d}"
+        rows += [('A', year_month, 'sales', 100.0 * n), ('A', year_month, 'material', -10.0)]
+        if n >= 7:
+            rows += [('B', year_month, 'sales', 50.0), ('B', year_month, 'material', -5.0)]
+    return pd.DataFrame(rows, columns=['department_name', 'year_month', 'account_type', 'amount_calc'])
+
+
+def test_last_year_and_ttm_of_the_total(monthly_rows):
+    kpi = prepare_kpi_data(monthly_rows, "Month", "2024-M01").set_index('period')
+    assert kpi.index.tolist() == [f"2024-M{month:02d}" for month in range(1, 7)]
+    january = kpi.loc["2024-M01"]
+    assert january['sales'] == 1300 + 50
+    assert january['sales_last_year'] == 100
+    assert january['sales_yoy'] == pytest.approx(1350 / 100 - 1)
+    # months 2..13: A's 100 * (2 + ... + 13) and seven months of B
+    assert january['ttm_sales'] == 100 * 90 + 50 * 7
+    assert january['ttm_material_rate'] == pytest.approx((10 * 12 + 5 * 7) / (100 * 90 + 50 * 7))
+
+
+def test_partial_windows_are_not_reported(monthly_rows):
+    kpi = prepare_kpi_data(monthly_rows, "Quarter", "2024-Q1", keys=('department_name',)).set_index(['department_name', 'period'])
+    a = kpi.loc[('A', "2024-Q1")]
+    assert a['sales'] == 100 * (13 + 14 + 15)
+    assert a['sales_last_year'] == 100 * (1 + 2 + 3)
+    assert a['ttm_sales'] == 100 * sum(range(4, 16))
+    # B has no rows a year before 2024 and its window is only complete in June
+    b_q1, b_q2 = kpi.loc[('B', "2024-Q1")], kpi.loc[('B', "2024-Q2")]
+    assert b_q1['sales'] == 150
+    assert np.isnan(b_q1['sales_last_year']) and np.isnan(b_q1['sales_yoy'])
+    assert np.isnan(b_q1['ttm_sales']) and np.isnan(b_q1['ttm_profit_rate'])
+    assert np.isnan(b_q2['sales_last_year'])
+    assert b_q2['ttm_sales'] == 50 * 12
+    assert b_q2['ttm_profit'] == 45 * 12
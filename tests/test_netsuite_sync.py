@@ -0,0 +1,73 @@
+import pytest
+
+from utils import netsuite_sync
+
+STAMP = "2024-01-01 00:00:00"
+
+
+@pytest.fixture
+def netsuite(monkeypatch):
+    """SuiteQL responses per table, served to the sync instead of the NetSuite API."""
+    tables = {
+        'account': [{'id': '1', 'name': "Cash", 'number': "1000", 'type': "Bank", 'lastmodifieddate': STAMP}],
+        'accountingperiod': [
+            {'id': '10', 'periodname': "FY2023", 'parent': None, 'lastmodifieddate': STAMP},
+            {'id': '11', 'periodname': "Q1 FY2023", 'parent': '10', 'lastmodifieddate': STAMP},
+            {'id': '12', 'periodname': "Jan 2023", 'parent': '11', 'lastmodifieddate': STAMP},
+            {'id': '13', 'periodname': "Feb 2023", 'parent': '11', 'lastmodifieddate': STAMP},
+        ],
+        'transaction': [
+            {'id': '100', 'account': '1', 'amount': 5, 'postingperiod': '12', 'lastmodifieddate': STAMP},
+            {'id': '101', 'account': '1', 'amount': 7, 'postingperiod': '13', 'lastmodifieddate': STAMP},
+        ],
+        'DeletedRecord': [],
+    }
+
+    def iter_pages(query, page_size=1000):
+        table_name = next(name for name in tables if f"FROM {name} " in query)
+        yield tables[table_name]
+
+    monkeypatch.setattr(netsuite_sync, "iter_suiteql_pages", iter_pages)
+    return tables
+
+
+def amounts(data):
+    return {item.get('postingperiod'): item['amount'] for item in data['items']}
+
+
+def test_periods_are_resolved_by_name_including_child_periods(netsuite, tmp_path):
+    path = str(tmp_path / "mirror.sqlite")
+    netsuite_sync.sync_mirror(path)
+    assert amounts(netsuite_sync.aggregate_statement(("Bank",), "Q1 FY2023", path=path)) == {None: 12}
+    by_period = netsuite_sync.aggregate_statement(("Bank",), ("Jan 2023", "FY2023"), by_period=True, path=path)
+    assert amounts(by_period) == {"Jan 2023": 5, "FY2023": 12}
+
+
+def test_deleted_transactions_are_removed(netsuite, tmp_path):
+    path = str(tmp_path / "mirror.sqlite")
+    netsuite_sync.sync_mirror(path)
+    netsuite['DeletedRecord'] = [{'recordtype': "journalentry", 'recordid': '101', 'deleteddate': "2024-02-01 00:00:00"}]
+    assert netsuite_sync.sync_mirror(path)[netsuite_sync.DELETED_RECORDS] == 1
+    assert amounts(netsuite_sync.aggregate_statement(("Bank",), "Q1 FY2023", path=path)) == {None: 5}
+
+
+def test_mirror_staleness(netsuite, tmp_path):
+    path = str(tmp_path / "mirror.sqlite")
+    assert netsuite_sync.mirror_version(path) is None
+    netsuite_sync.sync_mirror(path)
+    assert netsuite_sync.mirror_version(path) is not None
+    assert not netsuite_sync.mirror_is_stale(path)
+    assert netsuite_sync.mirror_is_stale(path, max_age=-1)
+
+
+def test_open_periods_are_queried_live(monkeypatch):
+    from analytics import data_processing
+
+    calls = []
+    monkeypatch.setattr(data_processing, "mirror_version", lambda: "synced")
+    monkeypatch.setattr(data_processing, "refresh_stale_mirror", lambda: None)
+    monkeypatch.setattr(data_processing, "run_statement_query", lambda *args, **kwargs: calls.append(args) or "live")
+    monkeypatch.setattr(data_processing, "get_mirrored_statement_data", lambda *args: "mirror")
+    assert data_processing.get_statement_data(("Bank",), "CURRENT_ACCOUNTING_PERIOD") == "live"
+    assert data_processing.get_statement_data(("Bank",), "Q1 FY2023") == "mirror"
+    assert len(calls) == 1
@@ -0,0 +1,12 @@
+from utils.palette import CATEGORY_PALETTE, category_colors
+
+
+def test_categories_of_a_dimension_get_distinct_colors():
+    colors = category_colors([f"Location {i}" for i in range(len(CATEGORY_PALETTE) + 12)], dimension="test_location")
+    assert len(set(colors.values())) == len(colors)
+
+
+def test_colors_are_stable_per_dimension():
+    first = category_colors(["A", "B", "C"], dimension="test_manager")
+    category_colors([f"Class {i}" for i in range(30)], dimension="test_class")
+    assert category_colors(["C", "B", "A"], dimension="test_manager") == first
@@ -0,0 +1,22 @@
+import os
+import sys
+import subprocess
+
+import pandas as pd
+
+from analytics.report_job import render_department
+
+
+def test_timeframe_sets_the_period_of_every_table(seeded_database, tmp_path):
+    entry = render_department(None, "2025-Q1", "2025-Q2", timeframe="month", out_dir=str(tmp_path))
+    performance = pd.read_parquet(tmp_path / entry['directory'] / "performance.parquet")
+    kpi = pd.read_parquet(tmp_path / entry['directory'] / "kpi.parquet")
+    months = [f"2025-M{month:02d}" for month in range(1, 7)]
+    assert sorted(performance['period']) == months
+    assert sorted(kpi['period']) == months
+
+
+def test_report_job_runs_without_streamlit(seeded_database):
+    script = "import sys, analytics.report_job; print(sorted(m for m in sys.modules if m.split('.')[0] == 'streamlit'))"
+    result = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, env=os.environ, cwd=os.path.dirname(os.path.dirname(__file__)), check=True)
+    assert result.stdout.strip() == "[]"
@@ -0,0 +1,39 @@
+from datetime import date
+
+import pytest
+
+from analytics.salmon import query_salmon_summary, to_excel_serial
+
+
+@pytest.fixture(scope="module")
+def salmon_orders():
+    """Two March orders of customer A, one weighed in two batches and one at 18:00 on
+    March 31 not weighed yet, and an April order of customer B."""
+    from database.session import session_scope
+    from database.models import SalmonOrders, SalmonOrderWeight
+
+    with session_scope() as session:
+        session.add_all([
+            SalmonOrders(id=1, customer="A", date=to_excel_serial("2025-03-03") + 0.25, price=2, quantity=9, fish_size="3-4"),
+            SalmonOrders(id=2, customer="A", date=to_excel_serial("2025-03-31") + 0.75, price=2, quantity=5, fish_size="3-4"),
+            SalmonOrders(id=3, customer="B", date=to_excel_serial("2025-04-01"), price=2, quantity=7, fish_size="3-4"),
+        ])
+        session.flush()
+        session.add_all([
+            SalmonOrderWeight(id=1, order_id=1, quantity=6, batch_number=1),
+            SalmonOrderWeight(id=2, order_id=1, quantity=3, batch_number=2),
+        ])
+
+
+def test_range_includes_orders_later_on_the_end_date(salmon_orders):
+    df = query_salmon_summary(['customer'], date(2025, 3, 1), date(2025, 3, 31))
+    assert df['customer'].tolist() == ["A"]
+    assert df['orders'].tolist() == [2]
+    assert df['ordered_quantity'].tolist() == [14]
+
+
+def test_batches_keep_orders_not_weighed_yet(salmon_orders):
+    df = query_salmon_summary(['batch'], date(2025, 3, 1), date(2025, 3, 31))
+    by_batch = dict(zip(df['batch'].fillna(0).astype(int), df['ordered_quantity']))
+    assert by_batch == pytest.approx({1: 6, 2: 3, 0: 5})
+    assert df['order_value'].sum() == pytest.approx(28)
@@ -0,0 +1,40 @@
+import pandas as pd
+import pytest
+
+from analytics.scorecard import prepare_location_scorecard
+
+
+@pytest.fixture(scope="module")
+def two_quarters():
+    """Sales per quarter and one cost per location, chosen so that ranks tie and rates differ."""
+    rows = [
+        (1, "2025-Q1", 'sales', 400), (1, "2025-Q2", 'sales', 600), (1, "2025-Q1", 'material', -300),
+        (2, "2025-Q1", 'sales', 1000), (2, "2025-Q2", 'sales', 1000), (2, "2025-Q2", 'material', -1600),
+        (3, "2025-Q1", 'sales', 250), (3, "2025-Q2", 'sales', 250), (3, "2025-Q1", 'staff', -100),
+        (4, "2025-Q1", 'sales', 1200), (4, "2025-Q2", 'sales', 800), (4, "2025-Q2", 'other cost', -1000),
+    ]
+    df = pd.DataFrame(rows, columns=['location_id', 'period', 'account_type', 'amount_calc'])
+    return df.assign(location_name="L" + df['location_id'].astype(str), department_name="Restaurant", amount_calc=df['amount_calc'].astype(float))
+
+
+def test_ranks_and_percentiles(two_quarters):
+    scorecard = prepare_location_scorecard(two_quarters)
+    # ties on sales share the best rank and are ordered by name
+    assert scorecard['location_name'].tolist() == ["L2", "L4", "L1", "L3"]
+    card = scorecard.set_index('location_id')
+    assert card['sales'].to_dict() == {2: 2000, 4: 2000, 1: 1000, 3: 500}
+    assert card['sales_rank'].to_dict() == {2: 1, 4: 1, 1: 3, 3: 4}
+    assert card['sales_percentile'].to_dict() == {2: 0.875, 4: 0.875, 1: 0.5, 3: 0.25}
+    assert card['profit_rate'].to_dict() == pytest.approx({2: 0.2, 4: 0.5, 1: 0.7, 3: 0.8})
+    assert card['profit_rate_rank'].to_dict() == {2: 4, 4: 3, 1: 2, 3: 1}
+    assert card['profit_rate_percentile'].to_dict() == {2: 0.25, 4: 0.5, 1: 0.75, 3: 1.0}
+    # lower cost ratios rank first
+    assert card['material_rate_rank'].to_dict() == {2: 4, 4: 1, 1: 3, 3: 1}
+
+
+def test_last_period_deltas_and_trend(two_quarters):
+    card = prepare_location_scorecard(two_quarters).set_index('location_id')
+    assert card['sales_change'].to_dict() == pytest.approx({2: 0.0, 4: -1 / 3, 1: 0.5, 3: 0.0})
+    # L2's material cost all falls in Q2
+    assert card.loc[2, 'profit_rate_change'] == pytest.approx(-0.6 - 1.0)
+    assert card.loc[1, 'sales_trend'] == [400, 600]
@@ -0,0 +1,39 @@
+import threading
+
+from analytics import slices
+
+
+def test_fetches_run_outside_the_lock_and_are_not_repeated(seeded_database, monkeypatch):
+    slices.financial_slice_store.clear()
+    slices.financial_month_rows('2024-Q2', '2024-Q2')
+
+    fetch = slices.fetch_financial_months
+    fetched = []
+    started, release = threading.Event(), threading.Event()
+
+    def slow_fetch(months):
+        fetched.append(list(months))
+        started.set()
+        release.wait(10)
+        return fetch(months)
+
+    monkeypatch.setattr(slices, "fetch_financial_months", slow_fetch)
+    results = {}
+    first = threading.Thread(target=lambda: results.setdefault('first', slices.financial_month_rows('2024-Q1', '2024-Q1')))
+    first.start()
+    assert started.wait(10)
+    second = threading.Thread(target=lambda: results.setdefault('second', slices.financial_month_rows('2024-Q1', '2024-Q2')))
+    second.start()
+
+    # cached months are served while another session's fetch is running
+    cached = threading.Thread(target=lambda: results.setdefault('cached', slices.financial_month_rows('2024-Q2', '2024-Q2')))
+    cached.start()
+    cached.join(2)
+    served_while_fetching = not cached.is_alive()
+    release.set()
+    first.join(10)
+    second.join(10)
+    cached.join(10)
+    assert served_while_fetching
+    assert fetched == [[(2024, 1), (2024, 2), (2024, 3)]]
+    assert len(results['second']) == len(results['first']) + len(slices.financial_month_rows('2024-Q2', '2024-Q2'))
@@ -0,0 +1,63 @@
+import pytest
+
+from utils import suiteql
+from utils.suiteql import (
+    CLOSED_PERIOD_TTL,
+    OPEN_PERIOD_TTL,
+    build_statement_query,
+    normalize_query,
+    period_ttl,
+    query_cache_key,
+    run_cached_suiteql,
+)
+
+
+def test_queries_are_normalized():
+    assert normalize_query("  SELECT\n\tid ,  name\n  FROM   account \n") == "SELECT id , name FROM account"
+    query = build_statement_query(['Income'], "'Jan 2025'")
+    assert "\n" not in query and "  " not in query
+    # quotes in period names are escaped
+    assert "trx.postingperiod = '''Jan 2025'''" in query
+
+
+def test_equivalent_requests_share_a_cache_key():
+    key = query_cache_key(build_statement_query(['Income', 'Expense'], ['Jan 2025', 'Feb 2025']))
+    assert query_cache_key(build_statement_query(['Expense', 'Income', 'Income'], ['Jan 2025', 'Feb 2025', 'Jan 2025'])) == key
+    assert query_cache_key("SELECT 1\n  FROM dual") == query_cache_key("SELECT 1 FROM dual")
+    # periods keep their order, and grouping by period is a different statement
+    assert query_cache_key(build_statement_query(['Income', 'Expense'], ['Feb 2025', 'Jan 2025'])) != key
+    assert query_cache_key(build_statement_query(['Income', 'Expense'], ['Jan 2025', 'Feb 2025'], by_period=True)) != key
+    assert build_statement_query(['Income'], 'Jan 2025') == build_statement_query(['Income'], ['Jan 2025'])
+
+
+def test_open_periods_get_the_short_ttl():
+    assert period_ttl('Jan 2025') == CLOSED_PERIOD_TTL
+    assert period_ttl(['Jan 2025', 'Feb 2025']) == CLOSED_PERIOD_TTL
+    assert period_ttl('CURRENT_ACCOUNTING_PERIOD') == OPEN_PERIOD_TTL
+    assert period_ttl(['Jan 2025', 'CURRENT_ACCOUNTING_PERIOD']) == OPEN_PERIOD_TTL
+
+
+@pytest.fixture
+def responses(monkeypatch):
+    """Queries sent to NetSuite; each response names the call that produced it."""
+    sent = []
+
+    def fetch(query):
+        sent.append(query)
+        return {'items': [{'call': len(sent)}]}
+
+    monkeypatch.setattr(suiteql, "fetch_suiteql", fetch)
+    return sent
+
+
+def test_responses_are_reused_until_the_ttl_passes(responses, tmp_path):
+    first = run_cached_suiteql("SELECT 1\nFROM dual", ttl=60, cache_dir=str(tmp_path))
+    assert run_cached_suiteql("SELECT 1 FROM dual", ttl=60, cache_dir=str(tmp_path)) == first
+    assert responses == ["SELECT 1 FROM dual"]
+    assert run_cached_suiteql("SELECT 1 FROM dual", ttl=0, cache_dir=str(tmp_path)) == {'items': [{'call': 2}]}
+
+
+def test_failed_requests_are_not_cached(monkeypatch, tmp_path):
+    monkeypatch.setattr(suiteql, "fetch_suiteql", lambda query: None)
+    assert run_cached_suiteql("SELECT 1 FROM dual", ttl=60, cache_dir=str(tmp_path)) is None
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,98 @@
+from streamlit.testing.v1 import AppTest
+
+
+def warm_then_search():
+    import streamlit as st
+    from sqlalchemy import event
+
+    from database.models import engine
+    from analytics.kpi import query_kpi_data
+    from analytics.query import query_performance_overview_data
+    from analytics.warmup import WARMED, DEFAULT_REPORT_TYPE, DEFAULT_TIMEFRAME, default_range, start_cache_warmer
+
+    start_cache_warmer(poll_seconds=3600)
+    if not WARMED.wait(60):
+        raise TimeoutError("the cache warmer did not finish a pass")
+
+    fact_reads = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if "financial_data.amount" in statement:
+            fact_reads.append(statement)
+
+    start_str, end_str = default_range()
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        df = query_performance_overview_data(
+            department_name=None,
+            report_type=DEFAULT_REPORT_TYPE,
+            start_str=start_str,
+            end_str=end_str,
+            timeframe=DEFAULT_TIMEFRAME,
+            custom_adjustment=True,
+            split_office_cost=False,
+        )
+        # As `display_kpis` asks for it
+        query_kpi_data(None, DEFAULT_REPORT_TYPE, start_str, end_str, True, False)
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    st.write(f"{len(df)} rows, {len(fact_reads)} fact reads")
+
+
+def test_default_search_is_served_from_the_warmed_cache(seeded_database):
+    at = AppTest.from_function(warm_then_search, default_timeout=90).run()
+    assert not at.exception
+    rows, reads = at.markdown[0].value.split(", ")
+    assert int(rows.split()[0]) > 0
+    assert reads == "0 fact reads"
+
+
+def warm_and_record_messages():
+    import threading
+    import streamlit as st
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+    from analytics.warmup import WARMED, start_cache_warmer
+
+    ctx = get_script_run_ctx()
+    senders = []
+    enqueue = ctx._enqueue
+
+    def record(msg):
+        senders.append(threading.current_thread().name)
+        enqueue(msg)
+
+    ctx._enqueue = record
+    start_cache_warmer(poll_seconds=3600)
+    if not WARMED.wait(60):
+        raise TimeoutError("the cache warmer did not finish a pass")
+    st.write(f"{senders.count('cache-warmer')} warmer messages")
+
+
+def test_warmer_sends_nothing_to_the_starting_page(seeded_database):
+    at = AppTest.from_function(warm_and_record_messages, default_timeout=90).run()
+    assert not at.exception
+    assert at.markdown[0].value == "0 warmer messages"
+
+
+def detach_on_unchecked_version():
+    import streamlit as st
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+    from utils.concurrency import detached_script_run_ctx
+
+    ctx = get_script_run_ctx()
+    checked = detached_script_run_ctx(ctx) is not None
+    version = st.__version__
+    st.__version__ = "99.0.0"
+    try:
+        unchecked = detached_script_run_ctx(ctx) is not None
+    finally:
+        st.__version__ = version
+    st.write(f"{checked} {unchecked}")
+
+
+def test_context_is_only_detached_on_checked_streamlit_versions():
+    at = AppTest.from_function(detach_on_unchecked_version).run()
+    assert not at.exception
+    assert at.markdown[0].value == "True False"
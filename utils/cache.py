@@ -0,0 +1,98 @@
+"""Caching decorators for code that runs both in the app and in batch jobs.
+
+Inside a running Streamlit server `cache_data` and `cache_resource` are
+`st.cache_data` and `st.cache_resource`, so every session shares the server's
+cache. Without a Streamlit runtime (CLIs, scheduled jobs, worker processes)
+results are kept in a process-local LRU keyed by the `fingerprint` of each
+argument. Values from the local cache are shared, not copied, so callers must
+not modify them in place. Streamlit is only imported by the server, so batch
+code that caches through this module never loads it.
+"""
+import sys
+import time
+import threading
+from functools import wraps
+from collections import OrderedDict
+
+from utils.fingerprint import fingerprint
+
+
+def runtime_exists():
+    """True inside a running Streamlit server, which has always imported `streamlit.runtime`."""
+    runtime = sys.modules.get("streamlit.runtime")
+    return runtime is not None and runtime.exists()
+
+
+def local_cache(func, ttl=None, max_entries=None):
+    """Memoize `func` in-process, keeping at most `max_entries` results for at most `ttl` seconds."""
+    entries = OrderedDict()
+    lock = threading.Lock()
+
+    def call(*args, **kwargs):
+        key = (
+            tuple(fingerprint(arg) for arg in args),
+            tuple(sorted((name, fingerprint(value)) for name, value in kwargs.items())),
+        )
+        now = time.monotonic()
+        with lock:
+            entry = entries.get(key)
+            if entry is not None and (ttl is None or now - entry[0] < ttl):
+                entries.move_to_end(key)
+                return entry[1]
+        value = func(*args, **kwargs)
+        with lock:
+            entries[key] = (now, value)
+            entries.move_to_end(key)
+            while max_entries is not None and len(entries) > max_entries:
+                entries.popitem(last=False)
+        return value
+
+    def clear():
+        with lock:
+            entries.clear()
+
+    call.clear = clear
+    return call
+
+
+def runtime_cache(st_decorator_name, func, **options):
+    """`func` cached by `st.<st_decorator_name>` in a runtime, built on the first call there."""
+    st_cached = None
+    lock = threading.Lock()
+    local_cached = local_cache(func, **options)
+
+    def st_cache():
+        nonlocal st_cached
+        with lock:
+            if st_cached is None:
+                import streamlit as st
+                st_cached = getattr(st, st_decorator_name)(func, **options)
+            return st_cached
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        if runtime_exists():
+            return st_cache()(*args, **kwargs)
+        return local_cached(*args, **kwargs)
+
+    def clear():
+        if runtime_exists():
+            st_cache().clear()
+        local_cached.clear()
+
+    wrapper.clear = clear
+    return wrapper
+
+
+def cache_data(func=None, *, ttl=None, max_entries=None):
+    """`st.cache_data` in the app, an in-process LRU elsewhere. Usable with or without arguments."""
+    if func is None:
+        return lambda func: cache_data(func, ttl=ttl, max_entries=max_entries)
+    return runtime_cache("cache_data", func, ttl=ttl, max_entries=max_entries)
+
+
+def cache_resource(func=None, *, ttl=None, max_entries=None):
+    """`st.cache_resource` in the app, an in-process LRU elsewhere. Usable with or without arguments."""
+    if func is None:
+        return lambda func: cache_resource(func, ttl=ttl, max_entries=max_entries)
+    return runtime_cache("cache_resource", func, ttl=ttl, max_entries=max_entries)
@@ -0,0 +1,46 @@
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import dataclasses
+
+from utils.cache import runtime_exists
+
+# Streamlit releases whose ScriptRunContext `detached_script_run_ctx` was checked against
+DETACHED_CTX_STREAMLIT_VERSIONS = ("1.33",)
+DETACHED_CTX_FIELDS = {"_enqueue", "cursors", "tracked_commands"}
+
+
+def script_run_executor(max_workers=None):
+    """ThreadPoolExecutor whose worker threads share the current Streamlit script context,
+    so cached functions and `st` calls work inside them. A plain pool outside Streamlit."""
+    if not runtime_exists():
+        return ThreadPoolExecutor(max_workers=max_workers)
+    from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+
+    ctx = get_script_run_ctx()
+
+    def attach_ctx():
+        if ctx is not None:
+            add_script_run_ctx(threading.current_thread(), ctx)
+
+    return ThreadPoolExecutor(max_workers=max_workers, initializer=attach_ctx)
+
+
+def detached_script_run_ctx(ctx):
+    """Copy of `ctx` for a thread that outlives the script run, or None if there is none.
+
+    Streamlit's caches neither read nor write without a script context. The copy
+    drops the messages (cache spinners) the thread would otherwise send to the
+    session's page long after its run, and keeps its own element cursors. It
+    replaces private ScriptRunContext fields, so it is only made on the Streamlit
+    versions in DETACHED_CTX_STREAMLIT_VERSIONS.
+    """
+    if ctx is None:
+        return None
+    import streamlit
+
+    version = ".".join(streamlit.__version__.split(".")[:2])
+    if version not in DETACHED_CTX_STREAMLIT_VERSIONS:
+        return None
+    if not DETACHED_CTX_FIELDS <= {field.name for field in dataclasses.fields(ctx)}:
+        return None
+    return dataclasses.replace(ctx, _enqueue=lambda msg: None, cursors={}, tracked_commands=[])
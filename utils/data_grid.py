@@ -0,0 +1,80 @@
+import math
+
+import pandas as pd
+import streamlit as st
+
+from utils.export import display_export_controls
+
+GRID_DIMENSIONS = ['location_name', 'account_name', 'period']
+GRID_PAGE_SIZE = 100
+
+
+def filter_frame(df, filters):
+    """Keep rows whose column values are in the selected values; empty selections are ignored."""
+    mask = pd.Series(True, index=df.index)
+    for column, values in filters.items():
+        if values:
+            mask &= df[column].isin(values)
+    return df if mask.all() else df.loc[mask]
+
+
+def group_frame(df, group_by):
+    """Sum the numeric amount columns per group and count the rows behind each group."""
+    if not group_by:
+        return df
+    value_columns = [col for col in df.columns if col.startswith('amount')]
+    grouped = df.groupby(group_by, sort=False)
+    result = grouped[value_columns].sum() if value_columns else pd.DataFrame(index=grouped.size().index)
+    return result.assign(rows=grouped.size()).reset_index()
+
+
+def sort_frame(df, sort_by, ascending=True):
+    if sort_by not in df.columns:
+        return df
+    return df.sort_values(by=sort_by, ascending=ascending, kind='mergesort')
+
+
+def page_of(df, page, page_size=GRID_PAGE_SIZE):
+    start = (page - 1) * page_size
+    return df.iloc[start:start + page_size]
+
+
+@st.experimental_fragment
+def display_data_grid(df, name, key, page_size=GRID_PAGE_SIZE):
+    """Paginated grid with server-side filter, group-by and sort: only the visible page
+    is serialized to the browser. Runs as a fragment, so interacting with it does not
+    rerun the page or its queries."""
+    dimensions = [col for col in GRID_DIMENSIONS if col in df.columns]
+
+    filter_cols = st.columns(max(len(dimensions), 1))
+    filters = {}
+    for col, dimension in zip(filter_cols, dimensions):
+        filters[dimension] = col.multiselect(
+            f"Filter {dimension.replace('_', ' ')}",
+            options=sorted(df[dimension].dropna().unique().tolist()),
+            key=f"{key}_filter_{dimension}",
+        )
+
+    group_col, sort_col, order_col = st.columns([2, 2, 1])
+    group_by = group_col.multiselect("Group by", options=dimensions, key=f"{key}_group_by")
+    view = group_frame(filter_frame(df, filters), group_by)
+    sort_by = sort_col.selectbox("Sort by", options=[None] + list(view.columns), key=f"{key}_sort_by")
+    ascending = order_col.radio("Order", ["Asc", "Desc"], horizontal=True, key=f"{key}_order") == "Asc"
+    view = sort_frame(view, sort_by, ascending)
+
+    pages = max(math.ceil(len(view) / page_size), 1)
+    if st.session_state.get(f"{key}_page", 1) > pages:
+        # filters shrank the view below the selected page
+        st.session_state[f"{key}_page"] = 1
+    page = st.number_input("Page", min_value=1, max_value=pages, step=1, key=f"{key}_page")
+    st.dataframe(page_of(view, page, page_size), use_container_width=True, hide_index=True)
+
+    start = (page - 1) * page_size
+    caption = f"Rows {min(start + 1, len(view)):,}–{min(start + page_size, len(view)):,} of {len(view):,}"
+    if group_by:
+        caption += f" groups ({int(view['rows'].sum()):,} of {len(df):,} rows)"
+    elif len(view) != len(df):
+        caption += f" (filtered from {len(df):,})"
+    st.caption(caption)
+
+    display_export_controls(view, name, key)
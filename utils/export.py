@@ -0,0 +1,134 @@
+"""Chunked export of large frames to CSV, Parquet or XLSX files.
+
+Exports are written chunk by chunk to a file in a temp directory instead of
+being built in memory, and the file name is derived from the frame's content
+hash so an unchanged frame is only written once. Files older than
+EXPORT_MAX_AGE_SECONDS, or beyond the newest EXPORT_MAX_FILES, are removed
+before each new export.
+
+`st.download_button` reads the file into Streamlit's in-memory media store to
+serve it, so a download still holds the whole file in server memory for the
+session; only building it is chunked.
+"""
+import os
+import time
+import tempfile
+
+from utils.fingerprint import fingerprint
+
+EXPORT_DIR = os.path.join(tempfile.gettempdir(), "spt-finance-exports")
+EXPORT_CHUNK_ROWS = 50_000
+XLSX_MAX_ROWS = 1_048_575  # one row is used by the header
+EXPORT_MAX_AGE_SECONDS = 24 * 3600
+EXPORT_MAX_FILES = 50
+
+EXPORT_FORMATS = {
+    "CSV": ("csv", "text/csv"),
+    "Parquet": ("parquet", "application/vnd.apache.parquet"),
+    "Excel": ("xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+}
+
+
+def iter_chunks(df, chunk_rows=EXPORT_CHUNK_ROWS):
+    for start in range(0, len(df), chunk_rows):
+        yield df.iloc[start:start + chunk_rows]
+
+
+def write_csv(df, path, chunk_rows=EXPORT_CHUNK_ROWS):
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        df.head(0).to_csv(f, index=False)
+        for chunk in iter_chunks(df, chunk_rows):
+            chunk.to_csv(f, index=False, header=False)
+
+
+def write_parquet(df, path, chunk_rows=EXPORT_CHUNK_ROWS):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    # Infer the schema once from the whole frame so every chunk gets the same types
+    schema = pa.Schema.from_pandas(df, preserve_index=False)
+    with pq.ParquetWriter(path, schema) as writer:
+        for chunk in iter_chunks(df, chunk_rows):
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+
+
+def write_xlsx(df, path, chunk_rows=EXPORT_CHUNK_ROWS):
+    from openpyxl import Workbook
+
+    if len(df) > XLSX_MAX_ROWS:
+        raise ValueError(f"Excel supports at most {XLSX_MAX_ROWS:,} rows, the data has {len(df):,}.")
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    sheet.append([str(col) for col in df.columns])
+    for chunk in iter_chunks(df, chunk_rows):
+        for row in chunk.astype(object).where(chunk.notna(), None).itertuples(index=False, name=None):
+            sheet.append(row)
+    workbook.save(path)
+
+
+WRITERS = {
+    "csv": write_csv,
+    "parquet": write_parquet,
+    "xlsx": write_xlsx,
+}
+
+
+def prune_exports(max_age=EXPORT_MAX_AGE_SECONDS, max_files=EXPORT_MAX_FILES):
+    """Remove exports older than `max_age` seconds and all but the newest `max_files`."""
+    entries = []
+    for entry in os.scandir(EXPORT_DIR):
+        try:
+            entries.append((entry.stat().st_mtime, entry.path))
+        except FileNotFoundError:
+            continue
+    entries.sort(reverse=True)
+    cutoff = time.time() - max_age
+    for i, (mtime, path) in enumerate(entries):
+        if mtime < cutoff or (i >= max_files and not path.endswith(".tmp")):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                # removed by a concurrent prune
+                pass
+
+
+def export_frame(df, extension, name="export", chunk_rows=EXPORT_CHUNK_ROWS):
+    """Write `df` to EXPORT_DIR in the given format and return the file path."""
+    os.makedirs(EXPORT_DIR, exist_ok=True)
+    path = os.path.join(EXPORT_DIR, f"{name}-{fingerprint(df)[:16]}.{extension}")
+    try:
+        # a reused export counts as new, so pruning keeps it
+        os.utime(path)
+    except FileNotFoundError:
+        prune_exports()
+        fd, tmp_path = tempfile.mkstemp(dir=EXPORT_DIR, suffix=f".{extension}.tmp")
+        os.close(fd)
+        try:
+            WRITERS[extension](df, tmp_path, chunk_rows)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+    return path
+
+
+def display_export_controls(df, name, key):
+    import streamlit as st
+
+    file_format = st.selectbox("Export format", list(EXPORT_FORMATS), key=f"{key}_format")
+    extension, mime = EXPORT_FORMATS[file_format]
+    if st.button(f"Prepare {file_format} export", key=f"{key}_prepare"):
+        try:
+            path = export_frame(df, extension, name=name)
+        except (ImportError, ValueError) as e:
+            st.error(f"{file_format} export is not available: {e}")
+            return
+        with open(path, "rb") as f:
+            st.download_button(
+                label=f"Download as {file_format}",
+                data=f,
+                file_name=f"{name}.{extension}",
+                mime=mime,
+                key=f"{key}_download",
+            )
+
@@ -0,0 +1,28 @@
+import json
+import pickle
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+
+def fingerprint(obj):
+    """Stable content hash of a DataFrame, Series, array, dict or plain value."""
+    digest = hashlib.sha256()
+    if isinstance(obj, (pd.DataFrame, pd.Series)):
+        columns = obj.columns if isinstance(obj, pd.DataFrame) else [obj.name]
+        digest.update(repr(list(columns)).encode())
+        digest.update(repr(list(obj.dtypes) if isinstance(obj, pd.DataFrame) else obj.dtype).encode())
+        try:
+            digest.update(pd.util.hash_pandas_object(obj, index=True).values.tobytes())
+        except TypeError:
+            # unhashable cells (e.g. lists); fall back to the pickled frame
+            digest.update(pickle.dumps(obj))
+    elif isinstance(obj, np.ndarray):
+        digest.update(repr((obj.dtype.str, obj.shape)).encode())
+        digest.update(np.ascontiguousarray(obj).tobytes())
+    elif isinstance(obj, dict):
+        digest.update(json.dumps(obj, sort_keys=True, default=str).encode())
+    else:
+        digest.update(repr(obj).encode())
+    return digest.hexdigest()
@@ -29,8 +29,7 @@ def create_netsuite_session():
         logging.error(f"Error in create_netsuite_session: {e}")
         return None
 
-@st.cache_data
-def run_suiteql(query, limit=None, offset=None):
+def fetch_suiteql(query, limit=None, offset=None):
     session = create_netsuite_session()
     if not session:
         return None
@@ -56,4 +55,23 @@ def run_suiteql(query, limit=None, offset=None):
     except Exception as e:
         st.error("Error fetching data from NetSuite.")
         logging.error(f"Error in run_suiteql: {e}")
-        return None
\ No newline at end of file
+        return None
+
+
+@st.cache_data
+def run_suiteql(query, limit=None, offset=None):
+    return fetch_suiteql(query, limit=limit, offset=offset)
+
+
+def iter_suiteql_pages(query, page_size=1000):
+    """Yield the items of a SuiteQL query page by page (uncached)."""
+    offset = 0
+    while True:
+        data = fetch_suiteql(query, limit=page_size, offset=offset)
+        if not data:
+            return
+        items = data.get("items", [])
+        yield items
+        if not data.get("hasMore") or not items:
+            return
+        offset += len(items)
@@ -0,0 +1,236 @@
+"""Local mirror of the NetSuite `transaction`, `account` and `accountingperiod` tables.
+
+Rows are pulled incrementally using `lastmodifieddate` as a watermark and
+upserted into a SQLite file, so financial statements can be aggregated
+locally instead of through SuiteQL on every period switch. Records deleted in
+NetSuite are removed using `DeletedRecord`. Transactions keep the internal id
+of their posting period; statements are requested by period name and resolved
+through the mirrored `accountingperiod` tree, so a quarter or year includes
+the months under it.
+
+Run a sync with:
+    python -m utils.netsuite_sync
+"""
+import os
+import sqlite3
+import logging
+import argparse
+from contextlib import closing
+from datetime import datetime, timedelta
+
+from utils.netsuite_api import iter_suiteql_pages
+
+MIRROR_PATH = os.getenv("NETSUITE_MIRROR_PATH", "netsuite_mirror.sqlite")
+WATERMARK_FORMAT = "YYYY-MM-DD HH24:MI:SS"
+INITIAL_WATERMARK = "1970-01-01 00:00:00"
+# A mirror not synced for longer is synced again before it is read
+MIRROR_MAX_AGE_SECONDS = 3600
+
+# Columns mirrored per NetSuite table, in the order they are selected.
+MIRRORED_TABLES = {
+    'account': ['id', 'name', 'number', 'type', 'lastmodifieddate'],
+    'accountingperiod': ['id', 'periodname', 'parent', 'lastmodifieddate'],
+    'transaction': ['id', 'account', 'amount', 'postingperiod', 'lastmodifieddate'],
+}
+# Sync state key of the deletion watermark
+DELETED_RECORDS = 'deletedrecord'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS account (
+    id INTEGER PRIMARY KEY,
+    name TEXT,
+    number TEXT,
+    type TEXT,
+    lastmodifieddate TEXT
+);
+CREATE TABLE IF NOT EXISTS accountingperiod (
+    id INTEGER PRIMARY KEY,
+    periodname TEXT,
+    parent INTEGER,
+    lastmodifieddate TEXT
+);
+CREATE INDEX IF NOT EXISTS ix_accountingperiod_parent ON accountingperiod (parent);
+CREATE TABLE IF NOT EXISTS "transaction" (
+    id INTEGER PRIMARY KEY,
+    account INTEGER,
+    amount REAL,
+    postingperiod TEXT,
+    lastmodifieddate TEXT
+);
+CREATE INDEX IF NOT EXISTS ix_transaction_period_account ON "transaction" (postingperiod, account);
+CREATE TABLE IF NOT EXISTS sync_state (
+    table_name TEXT PRIMARY KEY,
+    watermark TEXT,
+    synced_at TEXT
+);
+"""
+
+
+def connect_mirror(path=MIRROR_PATH):
+    conn = sqlite3.connect(path)
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def get_watermark(conn, table_name):
+    row = conn.execute("SELECT watermark FROM sync_state WHERE table_name = ?", (table_name,)).fetchone()
+    return row[0] if row else INITIAL_WATERMARK
+
+
+def build_incremental_query(table_name, watermark):
+    columns = [
+        f"TO_CHAR({col}, '{WATERMARK_FORMAT}') AS {col}" if col == 'lastmodifieddate' else col
+        for col in MIRRORED_TABLES[table_name]
+    ]
+    return (
+        f"SELECT {', '.join(columns)} FROM {table_name} "
+        f"WHERE lastmodifieddate >= TO_TIMESTAMP('{watermark}', '{WATERMARK_FORMAT}') "
+        f"ORDER BY lastmodifieddate, id"
+    )
+
+
+def sync_table(conn, table_name, page_size=1000):
+    """Pull rows modified since the last watermark and upsert them. Returns the row count."""
+    columns = MIRRORED_TABLES[table_name]
+    watermark = get_watermark(conn, table_name)
+    query = build_incremental_query(table_name, watermark)
+    placeholders = ", ".join("?" for _ in columns)
+    statement = f'INSERT OR REPLACE INTO "{table_name}" ({", ".join(columns)}) VALUES ({placeholders})'
+
+    synced = 0
+    for items in iter_suiteql_pages(query, page_size=page_size):
+        rows = [tuple(item.get(col) for col in columns) for item in items]
+        with conn:
+            conn.executemany(statement, rows)
+        synced += len(rows)
+        # pages are ordered by lastmodifieddate, so the last row holds the newest stamp
+        if rows and rows[-1][-1]:
+            watermark = max(watermark, rows[-1][-1])
+
+    with conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO sync_state (table_name, watermark, synced_at) VALUES (?, ?, ?)",
+            (table_name, watermark, datetime.now().isoformat()),
+        )
+    logging.info(f"Synced {synced} {table_name} rows up to {watermark}")
+    return synced
+
+
+def build_deleted_records_query(watermark):
+    return (
+        f"SELECT recordtype, recordid, TO_CHAR(deleteddate, '{WATERMARK_FORMAT}') AS deleteddate FROM DeletedRecord "
+        f"WHERE deleteddate >= TO_TIMESTAMP('{watermark}', '{WATERMARK_FORMAT}') "
+        f"ORDER BY deleteddate, recordid"
+    )
+
+
+def deleted_record_table(record_type):
+    """Mirrored table a deleted record belongs to; every other record type is a transaction."""
+    record_type = (record_type or "").lower()
+    return record_type if record_type in ('account', 'accountingperiod') else 'transaction'
+
+
+def sync_deleted_records(conn, page_size=1000):
+    """Remove mirrored rows deleted in NetSuite since the last deletion watermark. Returns the count."""
+    watermark = get_watermark(conn, DELETED_RECORDS)
+    deleted = 0
+    for items in iter_suiteql_pages(build_deleted_records_query(watermark), page_size=page_size):
+        with conn:
+            for item in items:
+                table_name = deleted_record_table(item.get('recordtype'))
+                deleted += conn.execute(f'DELETE FROM "{table_name}" WHERE id = ?', (item.get('recordid'),)).rowcount
+        if items and items[-1].get('deleteddate'):
+            watermark = max(watermark, items[-1]['deleteddate'])
+
+    with conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO sync_state (table_name, watermark, synced_at) VALUES (?, ?, ?)",
+            (DELETED_RECORDS, watermark, datetime.now().isoformat()),
+        )
+    logging.info(f"Removed {deleted} mirrored rows deleted up to {watermark}")
+    return deleted
+
+
+def sync_mirror(path=MIRROR_PATH, page_size=1000):
+    with closing(connect_mirror(path)) as conn:
+        synced = {table_name: sync_table(conn, table_name, page_size) for table_name in MIRRORED_TABLES}
+        synced[DELETED_RECORDS] = sync_deleted_records(conn, page_size)
+        return synced
+
+
+def mirror_sync_times(path=MIRROR_PATH):
+    """{table_name: synced_at} of a complete mirror, or None if it was never fully synced."""
+    if not os.path.exists(path):
+        return None
+    with closing(connect_mirror(path)) as conn:
+        rows = dict(conn.execute("SELECT table_name, synced_at FROM sync_state ORDER BY table_name").fetchall())
+    if not set(MIRRORED_TABLES) | {DELETED_RECORDS} <= set(rows):
+        return None
+    return rows
+
+
+def mirror_synced_at(path=MIRROR_PATH):
+    """When the least recently synced table of the mirror was synced, or None without a mirror."""
+    times = mirror_sync_times(path)
+    return min(datetime.fromisoformat(synced_at) for synced_at in times.values()) if times else None
+
+
+def mirror_is_stale(path=MIRROR_PATH, max_age=MIRROR_MAX_AGE_SECONDS):
+    synced_at = mirror_synced_at(path)
+    return synced_at is not None and datetime.now() - synced_at > timedelta(seconds=max_age)
+
+
+def mirror_version(path=MIRROR_PATH):
+    """Return a token that changes after every sync, or None if the mirror was never synced."""
+    times = mirror_sync_times(path)
+    if times is None:
+        return None
+    return "|".join(f"{table_name}:{synced_at}" for table_name, synced_at in sorted(times.items()))
+
+
+def aggregate_statement(account_types, periods, by_period=False, path=MIRROR_PATH):
+    """Aggregate mirrored transactions per account (and per requested period name if
+    `by_period`), shaped like a SuiteQL response. A period includes its child periods."""
+    if isinstance(periods, str):
+        periods = (periods,)
+    type_placeholders = ", ".join("?" for _ in account_types)
+    period_placeholders = ", ".join("?" for _ in periods)
+    period_column = "requested.periodname AS postingperiod,\n        " if by_period else ""
+    period_group = "requested.periodname, " if by_period else ""
+    query = f"""
+    WITH RECURSIVE requested(id, periodname) AS (
+        SELECT id, periodname FROM accountingperiod WHERE periodname IN ({period_placeholders})
+        UNION
+        SELECT child.id, requested.periodname FROM accountingperiod child JOIN requested ON (child.parent = requested.id)
+    )
+    SELECT
+        {period_column}acct.name AS account_name,
+        acct.number AS account_number,
+        SUM(trx.amount) AS amount
+    FROM
+        "transaction" trx
+    JOIN
+        requested ON (trx.postingperiod = requested.id)
+    JOIN
+        account acct ON (trx.account = acct.id)
+    WHERE
+        acct.type IN ({type_placeholders})
+    GROUP BY
+        {period_group}acct.name, acct.number
+    ORDER BY
+        acct.number
+    """
+    with closing(connect_mirror(path)) as conn:
+        cursor = conn.execute(query, (*periods, *account_types))
+        columns = [col[0] for col in cursor.description]
+        items = [dict(zip(columns, row)) for row in cursor.fetchall()]
+    return {"items": items, "count": len(items), "hasMore": False}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Incrementally mirror NetSuite transactions and accounts.")
+    parser.add_argument("--path", default=MIRROR_PATH, help="SQLite mirror file")
+    parser.add_argument("--page-size", type=int, default=1000)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    print(sync_mirror(args.path, args.page_size))
@@ -0,0 +1,93 @@
+import zlib
+import threading
+from functools import lru_cache
+from colorsys import rgb_to_hsv, hsv_to_rgb
+
+import numpy as np
+from plotly.colors import qualitative
+
+DEFAULT_START_HEX = "#2E4748"
+DEFAULT_FINISH_HEX = "#00C1CB"
+DEFAULT_ALPHA = 0.9
+
+# Qualitative colors categories (locations, managers, ...) are spread over; a dimension
+# with more categories gets generated hues past the end of the list.
+CATEGORY_PALETTE = tuple(qualitative.Dark24 + qualitative.Light24)
+# Hue step of the generated colors (golden ratio), so consecutive ones stay apart
+GENERATED_HUE_STEP = 0.618033988749895
+
+
+def hex_to_rgb(hex_color):
+    return tuple(int(hex_color[i:i+2], 16) for i in (1, 3, 5))
+
+
+def hsv_to_rgb_array(hsv):
+    """Vectorized colorsys.hsv_to_rgb over an (n, 3) array."""
+    h, s, v = hsv[:, 0], hsv[:, 1], hsv[:, 2]
+    i = np.floor(h * 6.0)
+    f = h * 6.0 - i
+    p = v * (1.0 - s)
+    q = v * (1.0 - s * f)
+    t = v * (1.0 - s * (1.0 - f))
+    i = i.astype(int) % 6
+    r = np.choose(i, [v, q, p, p, t, v])
+    g = np.choose(i, [t, v, v, q, p, p])
+    b = np.choose(i, [p, p, t, v, v, q])
+    rgb = np.stack([r, g, b], axis=-1)
+    # colorsys returns (v, v, v) for zero saturation
+    rgb[s == 0.0] = np.stack([v, v, v], axis=-1)[s == 0.0]
+    return rgb
+
+
+@lru_cache(maxsize=256)
+def gradient(start_hex=DEFAULT_START_HEX, finish_hex=DEFAULT_FINISH_HEX, n=4, alpha=DEFAULT_ALPHA):
+    """Tuple of (n) "rgba(r, g, b, a)" strings interpolated in HSV space between two hex colors."""
+    start_rgb = hex_to_rgb(start_hex)
+    if n <= 0:
+        return ()
+    if n == 1:
+        return (f"rgba({start_rgb[0]}, {start_rgb[1]}, {start_rgb[2]}, {alpha})",)
+    start_hsv = np.array(rgb_to_hsv(*start_rgb))
+    finish_hsv = np.array(rgb_to_hsv(*hex_to_rgb(finish_hex)))
+    hsv = start_hsv + np.arange(n)[:, None] * (finish_hsv - start_hsv) / (n - 1)
+    rgb = hsv_to_rgb_array(hsv).astype(int)
+    return tuple(f"rgba({r}, {g}, {b}, {alpha})" for r, g, b in rgb.tolist())
+
+
+_category_slots = {}
+_category_lock = threading.Lock()
+
+
+def category_slot(category, dimension=None):
+    """Palette slot of a category within its dimension: derived from a hash of its name,
+    probing to the next free slot on collision, so no two categories of a dimension share
+    a color. Assignments never change for the life of the process."""
+    with _category_lock:
+        slots = _category_slots.setdefault(dimension, {})
+        slot = slots.get(category)
+        if slot is None:
+            taken = set(slots.values())
+            if len(taken) < len(CATEGORY_PALETTE):
+                slot = zlib.crc32(str(category).encode("utf-8")) % len(CATEGORY_PALETTE)
+                while slot in taken:
+                    slot = (slot + 1) % len(CATEGORY_PALETTE)
+            else:
+                slot = len(taken)
+            slots[category] = slot
+        return slot
+
+
+@lru_cache(maxsize=1024)
+def slot_color(slot, alpha=DEFAULT_ALPHA):
+    """"rgba(r, g, b, a)" of a palette slot; slots past the palette get generated hues."""
+    if slot < len(CATEGORY_PALETTE):
+        r, g, b = hex_to_rgb(CATEGORY_PALETTE[slot])
+    else:
+        hue = ((slot - len(CATEGORY_PALETTE)) * GENERATED_HUE_STEP) % 1.0
+        r, g, b = (int(c * 255) for c in hsv_to_rgb(hue, 0.65, 0.85))
+    return f"rgba({r}, {g}, {b}, {alpha})"
+
+
+def category_colors(categories, dimension=None, alpha=DEFAULT_ALPHA):
+    """Map each category to a color that stays the same across charts of the same dimension."""
+    return {category: slot_color(category_slot(category, dimension), alpha) for category in categories}
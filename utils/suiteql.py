@@ -0,0 +1,104 @@
+"""Small SuiteQL query builder with a disk cache keyed by normalized query text.
+
+Queries built here are deterministic: account types are de-duplicated and
+sorted, periods keep their given order, and whitespace is collapsed, so the
+same statement request always maps to the same cache key.
+"""
+import os
+import re
+import json
+import time
+import hashlib
+
+from utils.netsuite_api import fetch_suiteql
+
+BALANCE_SHEET_ACCOUNT_TYPES = (
+    'Bank', 'AccountsReceivable', 'OtherCurrentAsset', 'FixedAsset',
+    'OtherAsset', 'AccountsPayable', 'CreditCard', 'OtherCurrentLiability',
+    'LongTermLiability', 'Equity',
+)
+INCOME_STATEMENT_ACCOUNT_TYPES = (
+    'Income', 'Expense', 'OtherIncome', 'OtherExpense',
+)
+
+OPEN_PERIODS = {'CURRENT_ACCOUNTING_PERIOD'}
+CACHE_DIR = os.getenv("SUITEQL_CACHE_DIR", os.path.join(".cache", "suiteql"))
+OPEN_PERIOD_TTL = 5 * 60            # seconds; open periods still receive postings
+CLOSED_PERIOD_TTL = 30 * 24 * 3600  # closed periods only change on reopen
+
+
+def quote(value):
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def normalize_query(query):
+    return re.sub(r"\s+", " ", query).strip()
+
+
+def query_cache_key(query):
+    return hashlib.sha256(normalize_query(query).encode("utf-8")).hexdigest()
+
+
+def normalize_periods(periods):
+    if isinstance(periods, str):
+        periods = (periods,)
+    return tuple(dict.fromkeys(periods))
+
+
+def period_ttl(periods):
+    """Short TTL if any period is still open, long otherwise."""
+    if any(period in OPEN_PERIODS for period in normalize_periods(periods)):
+        return OPEN_PERIOD_TTL
+    return CLOSED_PERIOD_TTL
+
+
+def build_statement_query(account_types, periods, by_period=False):
+    """SUM(amount) per account for the given account types and posting periods,
+    optionally grouped by posting period as well."""
+    account_types = sorted(set(account_types))
+    periods = normalize_periods(periods)
+    period_column = "trx.postingperiod AS postingperiod, " if by_period else ""
+    period_group = "trx.postingperiod, " if by_period else ""
+    if len(periods) == 1:
+        period_filter = f"trx.postingperiod = {quote(periods[0])}"
+    else:
+        period_filter = f"trx.postingperiod IN ({', '.join(quote(period) for period in periods)})"
+    query = f"""
+    SELECT
+        {period_column}acct.name AS account_name,
+        acct.number AS account_number,
+        SUM(trx.amount) AS amount
+    FROM
+        transaction trx
+    JOIN
+        account acct ON (trx.account = acct.id)
+    WHERE
+        acct.type IN ({', '.join(quote(account_type) for account_type in account_types)})
+        AND {period_filter}
+    GROUP BY
+        {period_group}acct.name, acct.number
+    ORDER BY
+        acct.number
+    """
+    return normalize_query(query)
+
+
+def run_cached_suiteql(query, ttl, cache_dir=CACHE_DIR):
+    """Run a SuiteQL query, reusing a response stored on disk if it is younger than `ttl` seconds."""
+    path = os.path.join(cache_dir, f"{query_cache_key(query)}.json")
+    if os.path.exists(path) and time.time() - os.path.getmtime(path) < ttl:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+
+    data = fetch_suiteql(normalize_query(query))
+    if data is not None:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+    return data
+
+
+def run_statement_query(account_types, periods, by_period=False):
+    return run_cached_suiteql(build_statement_query(account_types, periods, by_period), period_ttl(periods))
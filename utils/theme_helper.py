@@ -1,12 +1,13 @@
 import inspect
 import textwrap
-from colorsys import hsv_to_rgb, rgb_to_hsv
 
-import streamlit as st
+from utils.palette import gradient, category_colors
 
 
 def show_code(demo):
     """Showing the code of the demo."""
+    import streamlit as st
+
     show_code = st.sidebar.checkbox("Show code", True)
     if show_code:
         # Showing the code of the demo.
@@ -21,28 +22,5 @@ def color_gradient(start_hex="#2E4748", finish_hex="#00C1CB", n=4, alpha=0.9):
     two hex colors. start_hex and finish_hex
     should be the full six-digit color string,
     including the number sign ("#FFFFFF") """
-
-    # Starting and ending colors in RGB form
-    s = start_hex
-    f = finish_hex
-    # Convert hex colors to RGB
-    start_rgb = tuple(int(s[i:i+2], 16) for i in (1, 3, 5))
-    finish_rgb = tuple(int(f[i:i+2], 16) for i in (1, 3, 5))
-
-    if n == 1:
-        return [f"rgba({start_rgb[0]}, {start_rgb[1]}, {start_rgb[2]}, {alpha})"]
-    # Convert RGB to HSV
-    start_hsv = rgb_to_hsv(*start_rgb)
-    finish_hsv = rgb_to_hsv(*finish_rgb)
-    # Generate a list of HSV tuples between start and end
-    hsv_tuples = [(start_hsv[0] + (i * (finish_hsv[0] - start_hsv[0]) / (n-1)),
-                start_hsv[1] + (i * (finish_hsv[1] - start_hsv[1]) / (n-1)),
-                start_hsv[2] + (i * (finish_hsv[2] - start_hsv[2]) / (n-1)))
-                for i in range(n)]
-    # Convert the HSV tuples to RGB tuples and scale to 0-255
-    rgb_tuples = [(int(rgb[0]), int(rgb[1]), int(rgb[2])) for rgb in [hsv_to_rgb(*hsv) for hsv in hsv_tuples]]
-    # Add the alpha value to the RGB tuples to create RGBA tuples
-    rgba_tuples = [(rgb[0], rgb[1], rgb[2], alpha) for rgb in rgb_tuples]
-    # Create a list of strings in the format "rgba(r, g, b, a)"
-    return ["rgba({}, {}, {}, {})".format(rgba[0], rgba[1], rgba[2], rgba[3]) for rgba in rgba_tuples]
-
+    # Palettes are computed with NumPy and memoized; return a fresh list so callers can modify it
+    return list(gradient(start_hex, finish_hex, n, alpha))
@@ -0,0 +1,44 @@
+import threading
+from functools import wraps
+from collections import OrderedDict
+
+import plotly.graph_objects as go
+
+from utils.fingerprint import fingerprint
+
+# Figures are small compared to the frames behind them, but bound the cache anyway.
+MAX_CACHED_FIGURES = 256
+
+_figure_cache = OrderedDict()
+_figure_cache_lock = threading.Lock()
+
+
+def cache_figure(builder):
+    """Cache the figure dict of a graph builder, keyed by the fingerprint of its
+    data and parameters. Each call returns a fresh figure object built from the
+    dict, which skips the JSON round trip (see benchmarks/figure_cache.py)."""
+    @wraps(builder)
+    def wrapper(*args, **kwargs):
+        key = (
+            builder.__name__,
+            tuple(fingerprint(arg) for arg in args),
+            tuple(sorted((name, fingerprint(value)) for name, value in kwargs.items())),
+        )
+        with _figure_cache_lock:
+            figure_dict = _figure_cache.get(key)
+            if figure_dict is not None:
+                _figure_cache.move_to_end(key)
+        if figure_dict is None:
+            figure_dict = builder(*args, **kwargs).to_dict()
+            with _figure_cache_lock:
+                _figure_cache[key] = figure_dict
+                while len(_figure_cache) > MAX_CACHED_FIGURES:
+                    _figure_cache.popitem(last=False)
+        # go.Figure copies the dict, so callers cannot change the cached entry
+        return go.Figure(figure_dict)
+    return wrapper
+
+
+def clear_figure_cache():
+    with _figure_cache_lock:
+        _figure_cache.clear()
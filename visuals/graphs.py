@@ -1,17 +1,16 @@
 import os
 import numpy as np
+import pandas as pd
 import plotly.graph_objects as go
 import plotly.express as px
 from plotly.subplots import make_subplots
 from utils.theme_helper import *
 from analytics.query import *
+from visuals.figure_cache import cache_figure
 
-def make_performance_overview_graph(df, group_by="period"):
-    df = df.copy()
-    df['material_rate'] = df['material_rate']*100
-    df['staff_rate'] = df['staff_rate']*100
-    df['other_rate'] = df['other_rate']*100
-    df['profit_rate'] = df['profit_rate']*100
+@cache_figure
+def make_performance_overview_graph(df, group_by="period", forecast_df=None):
+    df = df.assign(**{rate: df[rate]*100 for rate in ['material_rate', 'staff_rate', 'other_rate', 'profit_rate']})
 
     COLOR_4 = color_gradient(n=4)
 
@@ -83,6 +82,21 @@ def make_performance_overview_graph(df, group_by="period"):
         ),
     )
 
+    if forecast_df is not None:
+        # precomputed by analytics.forecast_job, drawn after the actual periods
+        for column, name, color in [('amount_calc_sales', 'Projected sales', COLOR_4[0]), ('amount_calc', 'Projected profit', COLOR_4[-1])]:
+            figure.add_trace(
+                go.Scatter(
+                    x=forecast_df[group_by],
+                    y=forecast_df[column],
+                    mode='lines+markers',
+                    name=name,
+                    line=dict(color=color, dash='dot'),
+                    hovertemplate=f"{name}"+": %{y:.2f} €",
+                ),
+                secondary_y=False,
+            )
+
     figure.update_yaxes(
         title_text=f"<b>Amount</b> (€)",
         titlefont=dict(color=COLOR_4[0]),
@@ -104,23 +118,67 @@ def make_performance_overview_graph(df, group_by="period"):
     return figure
 
 
-def make_turnover_structure_graph(df, group_by="period", department_name=None):
-    df = df.copy()
+# Large-data rendering mode: beyond these limits charts switch to WebGL lines and
+# fold the smallest categories into "Other". Points are periods x series drawn;
+# every period is always kept.
+LARGE_DATA_TOP_N = 15
+LARGE_DATA_MAX_POINTS = 400
+OTHER_CATEGORY = "Other"
+
+
+def collapse_tail_columns(df, group_by="period", top_n=LARGE_DATA_TOP_N):
+    """Keep the `top_n` largest value columns and sum the rest into one "Other" column."""
+    value_columns = [col for col in df.columns if col != group_by]
+    if len(value_columns) <= top_n:
+        return df
+    values = df[value_columns].astype(float)
+    ranked = values.abs().sum().sort_values(ascending=False, kind='mergesort').index
+    head, tail = list(ranked[:top_n - 1]), list(ranked[top_n - 1:])
+    result = df[[group_by]].join(values[head])
+    result[OTHER_CATEGORY] = values[tail].sum(axis=1, min_count=1)
+    return result
+
+
+def is_large_data(df, group_by="period", top_n=LARGE_DATA_TOP_N, max_points=LARGE_DATA_MAX_POINTS):
+    """More than `top_n` series, or more than `max_points` points over all of them."""
+    series = len([col for col in df.columns if col != group_by])
+    return series > top_n or len(df) * series > max_points
+
+
+@cache_figure
+def make_turnover_structure_graph(df, group_by="period", department_name=None, large_data=None, top_n=LARGE_DATA_TOP_N, max_points=LARGE_DATA_MAX_POINTS):
+    # the pivot's columns are named after the dimension (location, manager, ...) it is split by
+    dimension = df.columns.name
+    if large_data is None:
+        large_data = is_large_data(df, group_by, top_n, max_points)
+    if large_data:
+        df = collapse_tail_columns(df, group_by, top_n)
     columns_to_display = [col for col in df.columns if col != group_by]
 
-    COLOR = color_gradient(n=len(columns_to_display))
+    # Same category keeps the same color across charts of its dimension and reruns
+    CATEGORY_COLOR = category_colors(columns_to_display, dimension=dimension)
+    COLOR = [CATEGORY_COLOR[col] for col in columns_to_display]
     figure = make_subplots(specs=[[{"secondary_y": True}]])
 
     for i in range(len(columns_to_display)):
-        figure.add_trace(
-            go.Bar(
+        if large_data:
+            trace = go.Scattergl(
+                x=df[group_by],
+                y=df[f"{columns_to_display[i]}"],
+                mode='lines',
+                hovertemplate=f"{columns_to_display[i]}"+": %{y:.2f} €",
+                line_color=COLOR[i],
+                name=columns_to_display[i],
+            )
+        else:
+            trace = go.Bar(
                 x=df[group_by],
                 y=df[f"{columns_to_display[i]}"],
                 hovertemplate=f"{columns_to_display[i]}"+": %{y:.2f} €",
                 marker_color=COLOR[i],
                 name=columns_to_display[i],
-            ),
-        )
+            )
+        figure.add_trace(trace)
 
     figure.update_yaxes(
         title_text=f"<b>Turnover</b> (€)",
@@ -139,13 +197,19 @@ def make_turnover_structure_graph(df, group_by="period", department_name=None):
     return figure
 
 
-def make_avg_sales_graph(df):
+@cache_figure
+def make_avg_sales_graph(df, large_data=None, max_points=LARGE_DATA_MAX_POINTS):
+    if large_data is None:
+        # two series: sushi and the number of sushibars
+        large_data = 2 * len(df) > max_points
     COLOR_2 = color_gradient(n=2)
     figure = make_subplots(specs=[[{"secondary_y": True}]])
 
-    # Adding the bar trace for average daily sushi
+    # Adding the bar trace for average daily sushi (WebGL line in large-data mode)
+    sushi_trace = go.Scattergl if large_data else go.Bar
+    sushi_style = dict(mode='lines', line=dict(color=COLOR_2[0])) if large_data else dict(marker=dict(color=COLOR_2[0]))
     figure.add_trace(
-        go.Bar(
+        sushi_trace(
             x=df['period'], 
             y=df['average_daily_sushi'], 
             name='Average daily sushi',
@@ -156,12 +220,12 @@ def make_avg_sales_graph(df):
                 "Operational days: %{customdata[0]} days<br>" +
                 "Average daily sales: %{customdata[1]:.2f} €"),  # Formatting for currency
             # text=[df['operational_days'], df['average_daily_sales']],
-            marker=dict(color=COLOR_2[0])),
+            **sushi_style),
         secondary_y=False)
 
     # Adding the scatter trace for number of sushibars
     figure.add_trace(
-        go.Scatter(
+        (go.Scattergl if large_data else go.Scatter)(
             x=df['period'],
             y=df['unique_locations'].round(1), 
             opacity=0.9,
@@ -199,12 +263,9 @@ def make_avg_sales_graph(df):
 
 
 
+@cache_figure
 def make_cost_structure_graph(df, group_by="period", denominator="sales"):
-    df = df.copy()
-    df['material_rate'] = df['material_rate']*100
-    df['staff_rate'] = df['staff_rate']*100
-    df['other_rate'] = df['other_rate']*100
-    df['profit_rate'] = df['profit_rate']*100
+    df = df.assign(**{rate: df[rate]*100 for rate in ['material_rate', 'staff_rate', 'other_rate', 'profit_rate']})
 
     COLOR_4 = color_gradient(n=4)
     # Determine the bar mode based on the value of 'denominator'
@@ -278,18 +339,20 @@ def make_cost_structure_graph(df, group_by="period", denominator="sales"):
 
 
 
+@cache_figure
 def make_cost_structure_breakdown_by_department_graph(df, group_by="period"):
-    df = df.copy()
+    """`df` is the output of prepare_performance_by_department_data."""
     departments = sorted(df['department_name'].unique().tolist())
+    rows = max(len(departments), 1)
     COLOR_4 = color_gradient(n=4)
-    figure = make_subplots(rows=4, cols=1,
+    figure = make_subplots(rows=rows, cols=1,
                         shared_xaxes=True,
-                        vertical_spacing=0.1,
+                        vertical_spacing=min(0.1, 1/rows),
                         subplot_titles=departments,
                         )
 
     for i in range(len(departments)):
-        filtered_df = prepare_cost_structure_breakdown(df, department_name=departments[i])
+        filtered_df = df.loc[df['department_name']==departments[i]]
         figure.add_trace(
             go.Bar(
                 x=filtered_df[group_by],
@@ -344,12 +407,12 @@ def make_cost_structure_breakdown_by_department_graph(df, group_by="period"):
 
         )
 
-        figure.update_yaxes(
-            title_text=f"<b>Amount</b> (€)",
-            titlefont=dict(color=COLOR_4[0]),
-            tickfont=dict(color=COLOR_4[0]),
-            secondary_y=False,
-        )
+    figure.update_yaxes(
+        title_text=f"<b>Amount</b> (€)",
+        titlefont=dict(color=COLOR_4[0]),
+        tickfont=dict(color=COLOR_4[0]),
+        secondary_y=False,
+    )
 
 
     figure.update_layout(
@@ -365,6 +428,7 @@ def make_cost_structure_breakdown_by_department_graph(df, group_by="period"):
     return figure
 
 
+# Built from a small summary: cheaper than a cache hit (benchmarks/figure_cache.py)
 def make_cost_structure_cumulative_by_department_graph(data):
     labels = data['departments']
     COLOR_4 = color_gradient(n=4)
@@ -431,6 +495,7 @@ def make_cost_structure_cumulative_by_department_graph(data):
     return figure
 
 
+# Built from a small summary: cheaper than a cache hit (benchmarks/figure_cache.py)
 def make_cost_structure_cumulative_icicle_graph(df):
     custom_color_scale = [
         [0.0, color_gradient(n=2)[0]],  # Blue at the lowest end of the scale
@@ -455,4 +520,62 @@ def make_cost_structure_cumulative_icicle_graph(df):
         ), 1, 1)
 
     figure.update_layout(height=700,)
-    return figure
\ No newline at end of file
+    return figure
+
+@cache_figure
+def make_salmon_yield_graph(df, group_by=("week",)):
+    COLOR_3 = color_gradient(n=3)
+    labels = df[list(group_by)].astype(str).agg(' / '.join, axis=1)
+    figure = make_subplots(specs=[[{"secondary_y": True}]])
+
+    figure.add_trace(
+        go.Bar(
+            x=labels,
+            y=df['ordered_quantity'],
+            name='Ordered',
+            customdata=df['avg_price'],
+            hovertemplate="Ordered: %{y:.1f} kg<br>Average price: %{customdata:.2f} €/kg",
+            marker_color=COLOR_3[0],
+        ),
+        secondary_y=False)
+
+    figure.add_trace(
+        go.Bar(
+            x=labels,
+            y=df['weighed_quantity'],
+            name='Weighed',
+            hovertemplate="Weighed: %{y:.1f} kg",
+            marker_color=COLOR_3[1],
+        ),
+        secondary_y=False)
+
+    figure.add_trace(
+        go.Scatter(
+            x=labels,
+            y=df['yield_rate']*100,
+            mode='lines+markers',
+            name='Yield',
+            hovertemplate="Yield: %{y:.1f} %",
+            marker=dict(color=COLOR_3[2]),
+        ),
+        secondary_y=True)
+
+    figure.update_yaxes(
+        title_text="<b>Quantity</b> (kg)",
+        titlefont=dict(color=COLOR_3[0]),
+        tickfont=dict(color=COLOR_3[0]),
+        secondary_y=False)
+
+    figure.update_yaxes(
+        title_text="<b>Yield</b> (%)",
+        titlefont=dict(color=COLOR_3[2]),
+        tickfont=dict(color=COLOR_3[2]),
+        showgrid=False,
+        secondary_y=True)
+
+    figure.update_layout(
+        hovermode='x unified',
+        barmode='group',
+        xaxis_title=f"<b>{' / '.join(group_by).replace('_', ' ').capitalize()}",
+    )
+    return figure